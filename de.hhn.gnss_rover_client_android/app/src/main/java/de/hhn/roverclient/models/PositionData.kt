@@ -1,24 +1,26 @@
 package de.hhn.roverclient.models
 
-data class PositionData(var time: String,
-                       var lat: String,
-                       var lon: String,
-                       var elev: String,
+// time: milliseconds since midnight (UTC), lat/lon: decimal degrees, elev: meters, hAcc/vAcc: mm
+// values which are not available are null
+data class PositionData(var time: Long?,
+                       var lat: Double?,
+                       var lon: Double?,
+                       var elev: Double?,
                        var fixType: Int)
 
-data class Accuracy( var hAcc: String, var vAcc: String)
+data class Accuracy( var hAcc: Int?, var vAcc: Int?)
 
 data class UpdateRate(var updateRate: Int)
 data class Ntrip(var enabled: Boolean)
 
 data class SatSystems(var bds: Int, var gps: Int, var glo: Int, var gal: Int)
 
-data class RealTimeMessage(var exception: String,
-                            var time: String,
+data class RealTimeMessage(var exception: String?,
+                            var time: Long?,
                             var fixType: Int,
-                            var lat: String,
-                            var lon: String,
-                            var elev: String,
-                            var hAcc: String,
-                            var vAcc: String,
+                            var lat: Double?,
+                            var lon: Double?,
+                            var elev: Double?,
+                            var hAcc: Int?,
+                            var vAcc: Int?,
                             var rtcmEnabled: Boolean)
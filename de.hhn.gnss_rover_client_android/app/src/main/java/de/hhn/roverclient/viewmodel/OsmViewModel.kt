@@ -23,7 +23,6 @@ import java.io.File
 import java.io.FileOutputStream
 import java.io.IOException
 import java.math.BigDecimal
-import java.math.RoundingMode
 import java.net.InetAddress
 import java.time.LocalTime
 import java.time.ZonedDateTime
@@ -139,13 +138,12 @@ class OsmViewModel constructor(
         })
     }
 
-    private fun formatElevation(locationDM: String): String {
-        if (locationDM == "") {
+    private fun formatElevation(elevation: Double?): String {
+        if (elevation == null) {
             return "No Data available"
         }
         else {
-            var asDecimal = locationDM.toBigDecimal()
-            val formatted = "%.2f".format(asDecimal)
+            val formatted = "%.2f".format(elevation)
             return formatted.toString()
         }
     }
@@ -173,97 +171,65 @@ class OsmViewModel constructor(
         }
     }
 
-    private fun formatAccuracy(accuracy: String): String {
-        if(accuracy == "") {
+    private fun formatAccuracy(accuracy: Int?): String {
+        if(accuracy == null) {
             return "No Data available"
         }
         else {
-            var acc = accuracy.toBigDecimal()
+            var acc = BigDecimal(accuracy)
             var formattedAcc = acc.divide(BigDecimal(10.0))
             return formattedAcc.toString()
         }
     }
+
+    @RequiresApi(Build.VERSION_CODES.O)
+    private fun toLocalTime(millisOfDay: Long): LocalTime {
+        var gnssTime = LocalTime.ofNanoOfDay(millisOfDay * 1000000)
+        var currentHour = ZonedDateTime.now().hour
+        return gnssTime.withHour(currentHour)
+    }
+
     @RequiresApi(Build.VERSION_CODES.O)
-    private fun formatTime(timeString: String): String {
-        if(timeString == "") {
+    private fun formatTime(millisOfDay: Long?): String {
+        if(millisOfDay == null) {
             return "No Data available"
         }
         else {
-            var inputFormatter = DateTimeFormatter.ofPattern("HHmmss.SS")
             var outputFormatter = DateTimeFormatter.ofPattern("HH:mm:ss.SS")
-            var nmeaTime = LocalTime.parse(timeString, inputFormatter)
-            var currentHour = ZonedDateTime.now().hour
-            nmeaTime = nmeaTime.withHour(currentHour)
-            var formattedTime = nmeaTime.format(outputFormatter)
+            var formattedTime = toLocalTime(millisOfDay).format(outputFormatter)
             return formattedTime.toString()
         }
     }
 
     @RequiresApi(Build.VERSION_CODES.O)
-    private fun getLatency(timeString: String): String {
-        if(timeString == "") {
+    private fun getLatency(millisOfDay: Long?): String {
+        if(millisOfDay == null) {
             return "No Data available"
         }
         else {
-            var inputFormatter = DateTimeFormatter.ofPattern("HHmmss.SS")
-            var outputFormatter = DateTimeFormatter.ofPattern("HH:mm:ss.SS")
-            var nmeaTime = LocalTime.parse(timeString, inputFormatter)
-            var currentHour = ZonedDateTime.now().hour
-            nmeaTime = nmeaTime.withHour(currentHour)
-
-            var latency = ChronoUnit.MILLIS.between(nmeaTime, LocalTime.now())
+            var latency = ChronoUnit.MILLIS.between(toLocalTime(millisOfDay), LocalTime.now())
             return latency.toString()
         }
     }
 
-    private fun formatGeoPoint(lat: String, lon: String): GeoPoint {
-        if(lat == "")
+    private fun formatGeoPoint(lat: Double?, lon: Double?): GeoPoint {
+        if(lat == null || lon == null)
             return GeoPoint(49.1218934023163, 9.20657878456699)
         else {
-            var latDecimal = toDecimal(lat.toDouble())
-            var lonDecimal = toDecimal(lon.toDouble())
-            return GeoPoint(latDecimal, lonDecimal)
+            return GeoPoint(lat, lon)
         }
     }
 
-    private fun formatLocation(locationDM: String): String {
-        if (locationDM == "") {
+    private fun formatLocation(degrees: Double?): String {
+        if (degrees == null) {
             return "No Data available"
         }
         else {
-            var asDecimal = toDecimal(locationDM.toDouble())
-            val formatted = "%.7f".format(asDecimal)
+            val formatted = "%.7f".format(degrees)
             return formatted.toString()
         }
     }
 
-    private fun toDecimal(d: Double): Double {
-        var bd = BigDecimal(d)
-        bd = bd.movePointLeft(2)
-        val degrees = getDegrees(d)
-        val minutesAndSeconds = getMinutes(d)
-        val decimal: BigDecimal = degrees.add(minutesAndSeconds).setScale(
-            8,
-            RoundingMode.HALF_EVEN
-        )
-        return decimal.toDouble()
-    }
-    private fun getMinutes(d: Double): BigDecimal {
-        var bd = BigDecimal(d)
-        bd = bd.movePointLeft(2)
-        var minutesBd = bd.subtract(BigDecimal(bd.toInt()))
-        minutesBd = minutesBd.movePointRight(2)
-        return BigDecimal(
-            minutesBd.toDouble() * 100 / 60
-        ).movePointLeft(2)
-    }
-
-    private fun getDegrees(d: Double): BigDecimal {
-        var bd = BigDecimal(d)
-        bd = bd.movePointLeft(2)
-        return BigDecimal(bd.toInt())
-    }
-
     private fun resetAllFields() {
         connectionStatus.postValue("Nicht Verbunden")
         fixType.postValue("")
@@ -282,7 +248,7 @@ class OsmViewModel constructor(
         var fixType = realTimeMessage.fixType.toString()
         var lat = formatLocation(realTimeMessage.lat)
         var lon = formatLocation(realTimeMessage.lon)
-        var elev =formatLocation(realTimeMessage.lat)
+        var elev = formatElevation(realTimeMessage.elev)
         var time = formatTime(realTimeMessage.time)
         var latency = getLatency(realTimeMessage.time)
 
@@ -11,13 +11,16 @@ Created on 4 Sep 2022
 import gc
 
 import uasyncio
-from gnss.message_types import PositionData, Accuracy
-from utils.mem_debug import debug_gc
+from gnss.message_types import PositionData, Accuracy, NavSolution
 import utime
-from utils.queue import Queue
+from utils.broadcast import Broadcast, Subscriber
 from gnss.ubx_message import UBXMessage
-from gnss.msg_dictionaries.ubxtypes_configdb import SET_LAYER_RAM, POLL_LAYER_RAM
-from gnss.msg_dictionaries.ubxtypes_core import SET, GET, UBX_MSGIDS
+from serial_communication.ubx_dispatcher import UbxDispatcher
+from serial_communication.uart_reader import UartReader, INGEST_NMEA, INGEST_UBX
+from gnss.msg_dictionaries.ubxtypes_configdb import SET_LAYER_RAM, POLL_LAYER_RAM, UBX_CONFIG_DATABASE
+from gnss.msg_dictionaries.ubxhelpers import cfgkey2name
+from gnss.msg_dictionaries.ubxtypes_core import GET
+from gnss.rtcm_filter import RTCMFilter
 gc.collect()
 
 
@@ -26,12 +29,8 @@ class GnssHandler:
     GnssHandler class.
     """
     _app = None
-    _gga_q = None
-    _cfg_response_q = None
-    _nav_msg_q = None
-    _ack_nack_q = None
-    _msg_q = None
-    _pos_q = None
+    _pos_bus = None
+    _nav_bus = None
 
     rtcm_enabled = None
     ntrip_lock = None
@@ -41,10 +40,25 @@ class GnssHandler:
     _last_pos_time = None
     _last_acc_time = None
     _last_ntrip_time = None
+    _nav_pvt_periodic = None  # receiver pushes NAV-PVT every epoch
+    _nav_max_age = None  # max age in ms of a pushed NAV-PVT, before get_precision polls again
+
+    # update rate control
+    _rate_steps = (50, 100, 200, 250, 500, 1000, 2000, 5000)  # ms between measurements
+    _rate = None  # current update rate in ms
+    _rate_auto = None  # rate is chosen by run_rate_control()
+    _rate_min = None  # fastest rate in ms the controller may choose
+    _rate_max = None  # slowest rate in ms the controller may choose
+    _rate_reason = None  # why the current rate was chosen
+    _rate_good = None  # number of control periods in a row with headroom
+    _rate_drops = None  # dropped epochs / frames at the last control period
+    _send_latency = None  # max websocket send latency in ms in the current control period
 
     # cache variables to save uart requests
     _position: PositionData
     _accuracy: Accuracy
+    _config: dict = None  # receiver configuration (RAM layer): keyname -> value, None = invalid
+    _config_resets: int = None  # UartReader.receiver_resets when the cache was loaded
 
     # predefined strings
     _config_key_gps = "CFG_SIGNAL_GPS_ENA"
@@ -53,43 +67,37 @@ class GnssHandler:
     _config_key_bds = "CFG_SIGNAL_BDS_ENA"
     _config_key_hpm = "CFG-NMEA-HIGHPREC"
     _config_key_uart2_baud = "CFG_UART2_BAUDRATE"
+    _config_key_meas_rate = "CFG_RATE_MEAS"
+    _config_key_nav_rate = "CFG_RATE_NAV"
+    _config_key_time_ref = "CFG_RATE_TIMEREF"
+    _config_key_out_gga = "CFG_MSGOUT_NMEA_ID_GGA_UART1"
+    _config_key_out_pvt = "CFG_MSGOUT_UBX_NAV_PVT_UART1"
+    _config_key_out_hpposllh = "CFG_MSGOUT_UBX_NAV_HPPOSLLH_UART1"
+    _signals = ("GPS", "GAL", "GLO", "BDS", "QZSS", "SBAS")  # CFG_SIGNAL_<gnss>_ENA
+    _nmea_msgs = ("DTM", "GBS", "GGA", "GLL", "GNS", "GRS", "GSA", "GST", "GSV", "RMC", "VLW", "VTG", "ZDA")
 
     _nav_cls = "NAV"
-    _cfg_cls = "CFG"
-    _cfg_rate = "CFG-RATE"
-    _cfg_msg = "CFG-MSG"
     _nav_pvt = "NAV-PVT"
     _nav_sat = "NAV-SAT"
 
     @classmethod
     def initialize(cls,
                    app: object,
-                   gga_q: Queue,
-                   cfg_resp_q: Queue,
-                   nav_pvt_q: Queue,
-                   ack_nack_q: Queue,
-                   msg_q: Queue,
-                   pos_q: Queue,
+                   pos_bus: Broadcast,
+                   nav_bus: Broadcast,
                    ntrip_lock: uasyncio.Lock,
                    stop_event: uasyncio.Event):
         """Initialization method.
+        The UBX requests are sent through the UbxDispatcher, which has to be initialized first.
         :param object app: The calling app
-        :param primitives.queue.Queue gga_q: queue for incoming gga messages
-        :param primitives.queue.Queue cfg_resp_q: queue for ubx responses to configuration messages
-        :param primitives.queue.Queue nav_pvt_q: queue for incoming ubx NAV-PVT get messaged
-        :param primitives.queue.Queue ack_nack_q: queue for incoming ubx ACK-NACK messages
-        :param primitives.queue.Queue msg_q: queue for outgoing ubx messages
-        :param primitives.queue.Queue pos_q: queue for the main position data
+        :param Broadcast pos_bus: bus publishing the main position data
+        :param Broadcast nav_bus: bus publishing the NAV-PVT snapshot
         :param uasyncio.Lock ntrip_lock: lock for reading the rtcm_enabled flag
         :param uasyncio.Event stop_event: handling the ntrip client (stop/resume)
         """
         cls._app = app
-        cls._gga_q = gga_q
-        cls._cfg_response_q = cfg_resp_q
-        cls._nav_msg_q = nav_pvt_q
-        cls._ack_nack_q = ack_nack_q
-        cls._msg_q = msg_q
-        cls._pos_q = pos_q
+        cls._pos_bus = pos_bus
+        cls._nav_bus = nav_bus
         cls.rtcm_enabled = False
         cls.ntrip_lock = ntrip_lock
         cls.ntrip_stop_event = stop_event
@@ -98,8 +106,20 @@ class GnssHandler:
         cls._last_pos_time = utime.ticks_ms()
         cls._last_acc_time = utime.ticks_ms()
         cls._last_ntrip_time = utime.ticks_ms()
+        cls._nav_pvt_periodic = False
+        cls._nav_max_age = 3000
 
-        cls._accuracy = Accuracy(0, 0)
+        cls._accuracy = Accuracy()
+        cls._config = None
+
+        cls._rate = None
+        cls._rate_auto = False
+        cls._rate_min = 100
+        cls._rate_max = 1000
+        cls._rate_reason = "manual"
+        cls._rate_good = 0
+        cls._rate_drops = 0
+        cls._send_latency = 0
 
         gc.collect()
 
@@ -113,48 +133,159 @@ class GnssHandler:
         :rtype: bool
         """
 
-        await cls._flush_receive_qs()
         if update_rate < 50:
             update_rate = 50
         if update_rate > 5000:
             update_rate = 5000
 
-        msg = UBXMessage(
-            cls._cfg_cls,
-            cls._cfg_rate,
-            SET,
-            measRate=update_rate,
-            navRate=1,
-            timeRef=1
-        )
-        await cls._msg_q.put(msg.serialize())
-        ack = await cls._ack_nack_q.get()
-        if ack.msg_id == b'\x01':  # ACK-ACK
-            gc.collect()
-            return True
-        else:
-            gc.collect()
-            return False  # ACK-NACK
+        cfg_data = [(cls._config_key_meas_rate, update_rate),
+                    (cls._config_key_nav_rate, 1),
+                    (cls._config_key_time_ref, 1)]  # GPS time
+        result = await cls.configure(cfg_data)
+        if result:
+            cls._rate = update_rate
+        return result
 
     @classmethod
     async def get_update_rate(cls) -> int:
         """
         ASYNC: Gets the update rate of the GNSS receiver(how often a GGA sentence is sent over UART1)
+        Served from the configuration cache.
 
-        :return: number representing ms between updates
+        :return: number representing ms between updates, None if failed
         :rtype: int
         """
-        await cls._flush_receive_qs()
-        msg = UBXMessage(
-            cls._cfg_cls,
-            cls._cfg_rate,
-            GET,
-        )
-        await cls._msg_q.put(msg.serialize())
-        cfg = await cls._cfg_response_q.get()
-        result = cfg.__dict__["measRate"]
-        gc.collect()
-        return int(result)
+        return await cls.get_config(cls._config_key_meas_rate)
+
+    @classmethod
+    def set_rate_control(cls, auto: bool, min_rate: int = None, max_rate: int = None):
+        """
+        Let run_rate_control() choose the update rate within bounds, or switch back to manual.
+
+        :param bool auto: True = adaptive rate, False = manual (set_update_rate)
+        :param int min_rate: fastest rate in ms (default: unchanged)
+        :param int max_rate: slowest rate in ms (default: unchanged)
+        """
+        if min_rate is not None:
+            cls._rate_min = max(50, min(5000, min_rate))
+        if max_rate is not None:
+            cls._rate_max = max(50, min(5000, max_rate))
+        if cls._rate_min > cls._rate_max:
+            cls._rate_min, cls._rate_max = cls._rate_max, cls._rate_min
+        cls._rate_auto = auto
+        cls._rate_good = 0
+        cls._rate_reason = "auto" if auto else "manual"
+
+    @classmethod
+    def get_rate_state(cls) -> dict:
+        """
+        Get the update rate and why it was chosen, e.g.:
+        {
+            "updateRate": 200,
+            "auto": True,
+            "minRate": 100,
+            "maxRate": 1000,
+            "reason": "send latency 180 ms"
+        }
+        :return: Dictionary with the state of the rate control
+        :rtype: dict
+        """
+        return {
+            "updateRate": cls._rate,
+            "auto": cls._rate_auto,
+            "minRate": cls._rate_min,
+            "maxRate": cls._rate_max,
+            "reason": cls._rate_reason,
+        }
+
+    @classmethod
+    def report_send_latency(cls, latency: int):
+        """
+        Report how long a position frame took to send to a websocket client.
+
+        :param int latency: send duration in ms
+        """
+        if latency > cls._send_latency:
+            cls._send_latency = latency
+
+    @classmethod
+    async def run_rate_control(cls, period: int = 5000):
+        """
+        ASYNC: Adapt the update rate to the load, every control period.
+        Steps to a slower rate as soon as the UartReader falls behind, epochs are dropped or
+        sending to the websocket clients takes most of the epoch, and to a faster rate after
+        three periods in a row with headroom. Without clients the slowest rate is used.
+
+        :param int period: control period in ms
+        """
+        if cls._rate is None:
+            cls._rate = await cls.get_update_rate()
+        _, _, errors = UartReader.take_backlog()
+        cls._rate_drops = errors + cls._pos_bus.skipped
+        while True:
+            await uasyncio.sleep_ms(period)
+            rate, reason = cls._rate_decision()
+            if not cls._rate_auto:
+                continue
+            cls._rate_reason = reason
+            if rate != cls._rate and not await cls.set_update_rate(rate):
+                cls._rate_reason = "receiver rejected %d ms" % rate
+
+    @classmethod
+    def _rate_decision(cls) -> tuple:
+        """
+        Evaluate the load indicators of the last control period and start a new period.
+
+        :return: tuple of (update rate in ms, reason)
+        :rtype: tuple
+        """
+        backlog, bufsize, errors = UartReader.take_backlog()
+        drops = errors + cls._pos_bus.skipped
+        dropped = drops - cls._rate_drops
+        cls._rate_drops = drops
+        latency = cls._send_latency
+        cls._send_latency = 0
+        clients = cls._pos_bus.subscribers
+        rate = cls._rate or 1000
+        if clients == 0:
+            cls._rate_good = 0
+            return cls._rate_max, "no clients"
+        if dropped > 0:
+            reason = "%d epochs dropped" % dropped
+        elif latency * 4 > rate * 3:
+            reason = "send latency %d ms" % latency
+        elif backlog * 2 > bufsize:
+            reason = "uart backlog %d bytes" % backlog
+        else:
+            reason = None
+        if reason is not None:  # overloaded
+            cls._rate_good = 0
+            return cls._rate_step(rate, 1), reason
+        if latency * 4 < rate and backlog * 4 < bufsize:
+            cls._rate_good += 1
+            if cls._rate_good >= 3:
+                cls._rate_good = 0
+                return cls._rate_step(rate, -1), "headroom, %d clients" % clients
+        else:
+            cls._rate_good = 0
+        return cls._rate_step(rate, 0), "steady, %d clients" % clients
+
+    @classmethod
+    def _rate_step(cls, rate: int, direction: int) -> int:
+        """
+        :param int rate: current update rate in ms
+        :param int direction: -1 = next faster rate, 1 = next slower rate, 0 = same rate
+        :return: the rate in ms, within the bounds of the rate control
+        :rtype: int
+        """
+        steps = cls._rate_steps
+        if direction < 0:
+            faster = [step for step in steps if step < rate]
+            rate = faster[-1] if faster else steps[0]
+        elif direction > 0:
+            slower = [step for step in steps if step > rate]
+            rate = slower[0] if slower else steps[-1]
+        return max(cls._rate_min, min(cls._rate_max, rate))
 
     @classmethod
     async def set_satellite_systems(cls,
@@ -172,27 +303,17 @@ class GnssHandler:
         :return: True if successful, False if failed
         :rtype: bool
         """
-        await cls._flush_receive_qs()
-        layer = SET_LAYER_RAM  # volatile memory
-        transaction = 0
         cfg_data = [(cls._config_key_gps, gps),
                     (cls._config_key_gal, gal),
                     (cls._config_key_glo, glo),
                     (cls._config_key_bds, bds)]
-        msg = UBXMessage.config_set(layer, transaction, cfg_data)
-        await cls._msg_q.put(msg.serialize())
-        ack = await cls._ack_nack_q.get()
-        if ack.msg_id == b'\x01':  # ACK-ACK
-            gc.collect()
-            return True
-        else:
-            gc.collect()
-            return False  # ACK-NACK
+        return await cls.configure(cfg_data)
 
     @classmethod
     async def get_satellite_systems(cls) -> dict:
         """
         ASYNC: Get the satellite systems the GNSS receiver uses in his navigation computing
+        Served from the configuration cache.
         e.g.:
         {
             "gps": 1,
@@ -204,74 +325,295 @@ class GnssHandler:
         :rtype: dict if successful, None if failed
         """
 
-        await cls._flush_receive_qs()
-        layer = POLL_LAYER_RAM  # volatile memory
-        position = 0
-        keys = [cls._config_key_gps, cls._config_key_gal, cls._config_key_glo, cls._config_key_bds]
-        msg = UBXMessage.config_poll(layer, position, keys)
-        await cls._msg_q.put(msg.serialize())
-        cfg = await cls._cfg_response_q.get()
-        val_gps = cfg.__dict__[cls._config_key_gps]
-        val_glo = cfg.__dict__[cls._config_key_glo]
-        val_gal = cfg.__dict__[cls._config_key_gal]
-        val_bds = cfg.__dict__[cls._config_key_bds]
-        result = {
-            "gps": int(val_gps),
-            "glo": int(val_glo),
-            "gal": int(val_gal),
-            "bds": int(val_bds),
-        }
+        config = await cls._valid_config()
+        if config is None:
+            return None
+        try:
+            return {
+                "gps": int(config[cls._config_key_gps]),
+                "glo": int(config[cls._config_key_glo]),
+                "gal": int(config[cls._config_key_gal]),
+                "bds": int(config[cls._config_key_bds]),
+            }
+        except KeyError:  # not reported by the receiver
+            return None
+
+    @classmethod
+    async def load_config(cls) -> bool:
+        """
+        ASYNC: Fill the configuration cache with the values of all keys of the configuration
+        database (RAM layer), 64 keys per CFG-VALGET.
+
+        :return: True if successful, False if failed (the cache stays invalid)
+        :rtype: bool
+        """
+        cls._config = None
+        resets = UartReader.receiver_resets
+        keys = list(UBX_CONFIG_DATABASE)
+        config = {}
+        for start in range(0, len(keys), 64):
+            chunk = keys[start: start + 64]
+            msg = UBXMessage.config_poll(POLL_LAYER_RAM, 0, chunk)
+            cfg = await UbxDispatcher.request(msg)
+            if not cls._is_response(cfg):
+                gc.collect()
+                return False
+            for key in chunk:
+                try:
+                    config[key] = getattr(cfg, key)
+                except AttributeError:  # key not supported by the receiver
+                    pass
+        cls._config = config
+        cls._config_resets = resets
+        cls._sync_rtcm_filter()
         gc.collect()
-        return result
+        return True
+
+    @classmethod
+    async def get_config(cls, key: str) -> object:
+        """
+        ASYNC: Get a configuration value from the cache, the cache is (re)loaded if necessary
+
+        :param str key: keyname e.g. 'CFG_RATE_MEAS'
+        :return: the value, None if failed or not supported by the receiver
+        :rtype: object
+        """
+        config = await cls._valid_config()
+        if config is None:
+            return None
+        return config.get(key)
+
+    @classmethod
+    def _config_valid(cls) -> bool:
+        """
+        :return: True if the cache is loaded and the receiver wasn't restarted since
+        :rtype: bool
+        """
+        return cls._config is not None and cls._config_resets == UartReader.receiver_resets
+
+    @classmethod
+    async def _valid_config(cls) -> dict:
+        """
+        ASYNC: Get the configuration cache, (re)load it if it's invalid
+
+        :return: keyname -> value, None if the receiver didn't answer
+        :rtype: dict
+        """
+        if not cls._config_valid():
+            await cls.load_config()
+        return cls._config
+
+    @staticmethod
+    def _keyname(key) -> str:
+        """
+        :param key: keyname or keyID
+        :return: keyname
+        :rtype: str
+        """
+        if isinstance(key, int):
+            return cfgkey2name(key)[0]
+        return key
 
     @classmethod
     async def get_precision(cls, realtime: bool) -> Accuracy:
         """
         ASYNC: Gets precision of measurement
+        If the receiver pushes NAV-PVT (see set_periodic_nav_pvt), the accuracy of the
+        latest epoch is returned without a UART request.
 
-        :return: hAcc, Vacc
-        :rtype: int, int
+        :param bool realtime: poll the receiver even if the cached value is recent
+        :return: the (reused) accuracy record with hAcc, vAcc in mm,
+                 the last known values if the receiver didn't answer
+        :rtype: Accuracy
         """
+        nav = cls.get_nav_solution()
+        if nav is not None:
+            return nav.accuracy
         if utime.ticks_diff(utime.ticks_ms(), cls._last_acc_time) < cls._update_interval:
             if not realtime:
                 return cls._accuracy
 
-        await cls._flush_receive_qs()
         msg = UBXMessage(
             cls._nav_cls,
             cls._nav_pvt,
             GET
         )
-        await cls._msg_q.put(msg.serialize())
-        nav = await cls._nav_msg_q.get()
-        # if ack.msg_id == b'\x01':  # ACK-ACK
-        h_acc = nav.__dict__["hAcc"]
-        v_acc = nav.__dict__["vAcc"]
-        cls._accuracy = Accuracy(h_acc, v_acc)
+        nav = await UbxDispatcher.request(msg)
+        if not cls._is_response(nav):
+            return cls._accuracy
+        cls._accuracy.hAcc = nav.hAcc
+        cls._accuracy.vAcc = nav.vAcc
         cls._last_acc_time = utime.ticks_ms()
         gc.collect()
         return cls._accuracy
 
+    @classmethod
+    def get_nav_solution(cls) -> NavSolution:
+        """
+        Gets the snapshot of the latest NAV-PVT pushed by the receiver
+
+        :return: the (reused) snapshot, None if NAV-PVT is not pushed or the last one is too old
+        :rtype: NavSolution
+        """
+        if not cls._nav_pvt_periodic or not cls._nav_bus.seq:
+            return None
+        nav = cls._nav_bus.value
+        if utime.ticks_diff(utime.ticks_ms(), nav.received) > cls._nav_max_age:
+            return None
+        return nav
+
+    @classmethod
+    async def set_periodic_nav_pvt(cls, rate: int) -> bool:
+        """
+        ASYNC: Let the receiver push NAV-PVT on UART1, so accuracy, fix and speed are
+        kept up to date by the UartReader instead of being polled
+
+        :param int rate: send NAV-PVT every n-th navigation epoch, 0 = off (poll on demand)
+        :return: True if successful, False if failed
+        :rtype: bool
+        """
+        result = await cls.configure([(cls._config_key_out_pvt, rate)])
+        if result:
+            cls._nav_pvt_periodic = rate > 0
+        return result
+
+    @classmethod
+    async def set_ubx_ingest(cls, enable: bool) -> bool:
+        """
+        ASYNC: Take the position from the binary NAV-PVT / NAV-HPPOSLLH messages instead of NMEA-GGA.
+        Enables both UBX messages every epoch and disables NMEA-GGA on UART1 (and vice versa),
+        the GGA sentence for the NTRIP caster is then built from the position on demand.
+
+        :param bool enable: True = UBX messages, False = NMEA-GGA
+        :return: True if successful, False if failed
+        :rtype: bool
+        """
+        # turn on the new source before the old one is turned off
+        if enable:
+            new = [(cls._config_key_out_pvt, 1), (cls._config_key_out_hpposllh, 1)]
+            old = [(cls._config_key_out_gga, 0)]
+        else:
+            new = [(cls._config_key_out_gga, 1)]
+            old = [(cls._config_key_out_hpposllh, 0)]
+        result = await cls.configure(new)
+        UartReader.set_ingest(INGEST_UBX if enable else INGEST_NMEA)
+        result = await cls.configure(old) and result
+        cls._nav_pvt_periodic = cls._nav_pvt_periodic or enable
+        return result
+
+    @classmethod
+    async def configure(cls, cfg_data: list, layers: int = SET_LAYER_RAM, force: bool = False) -> bool:
+        """
+        ASYNC: Set any number of configuration database values.
+        Up to 64 values are sent in one CFG-VALSET, more as a transaction of several
+        CFG-VALSET which is applied by the receiver at once, after the last one was acknowledged.
+        If the configuration cache is valid, only the values which differ from the cache
+        are sent to the RAM layer, the cache is updated when they are acknowledged.
+
+        :param list cfg_data: list of tuples (key, value), key as keyname or keyID
+        :param int layers: memory layer(s) (1=RAM, 2=BBR, 4=Flash)
+        :param bool force: send all values, even if they are already set
+        :return: True if all values were set, False if the receiver rejected (or didn't acknowledge) them
+        :rtype: bool
+        """
+        cached = layers == SET_LAYER_RAM and cls._config_valid()
+        if cached and not force:
+            config = cls._config
+            cfg_data = [(key, val) for (key, val) in cfg_data if config.get(cls._keyname(key)) != val]
+            if not cfg_data:
+                return True
+        for msg in UBXMessage.config_set_batch(layers, cfg_data):
+            ack = await UbxDispatcher.request(msg, ack=True)
+            if not cls._is_ack(ack):  # a rejected chunk aborts the transaction
+                gc.collect()
+                return False
+        if cached and cls._config_valid():
+            for (key, val) in cfg_data:
+                cls._config[cls._keyname(key)] = val
+            cls._sync_rtcm_filter()
+        gc.collect()
+        return True
+
+    @classmethod
+    def _sync_rtcm_filter(cls):
+        """
+        Let the RTCMFilter drop the corrections of the constellations disabled in the cached configuration.
+        """
+        config = cls._config
+        RTCMFilter.set_constellations(
+            {gnss: config.get("CFG_SIGNAL_" + gnss + "_ENA", 1) for gnss in cls._signals}
+        )
+
+    @classmethod
+    async def apply_profile(cls, profile: dict, layers: int = SET_LAYER_RAM) -> bool:
+        """
+        ASYNC: Configure the receiver from a declarative profile in one transaction, e.g.:
+        {
+            "measRate": 1000,  # ms between measurements
+            "navRate": 1,  # measurements per navigation solution
+            "signals": {"GPS": 1, "GAL": 1, "GLO": 0, "BDS": 1},
+            "nmea": {"GGA": 1},  # output rates on UART1, all other NMEA messages are turned off
+            "ubx": {"NAV-PVT": 1},  # output rates on UART1
+            "highprec": 1,  # NMEA high precision mode
+            "uart2Baud": 38400,  # RTCM input
+        }
+        All entries are optional.
+
+        :param dict profile: the configuration profile
+        :param int layers: memory layer(s) (1=RAM, 2=BBR, 4=Flash)
+        :return: True if successful, False if failed
+        :rtype: bool
+        """
+        result = await cls.configure(cls._profile_cfg_data(profile), layers)
+        if result and "ubx" in profile:
+            cls._nav_pvt_periodic = profile["ubx"].get("NAV-PVT", 0) > 0
+        return result
+
+    @classmethod
+    def _profile_cfg_data(cls, profile: dict) -> list:
+        """
+        :param dict profile: configuration profile, see apply_profile()
+        :return: list of tuples (keyname, value)
+        :rtype: list
+        """
+        cfg_data = []
+        if "measRate" in profile:
+            cfg_data.append((cls._config_key_meas_rate, profile["measRate"]))
+        if "navRate" in profile:
+            cfg_data.append((cls._config_key_nav_rate, profile["navRate"]))
+        for (gnss, enable) in profile.get("signals", {}).items():
+            cfg_data.append(("CFG_SIGNAL_" + gnss + "_ENA", enable))
+        if "nmea" in profile:
+            rates = profile["nmea"]
+            for nmea in cls._nmea_msgs:
+                cfg_data.append(("CFG_MSGOUT_NMEA_ID_" + nmea + "_UART1", rates.get(nmea, 0)))
+        for (name, rate) in profile.get("ubx", {}).items():
+            cfg_data.append(("CFG_MSGOUT_UBX_" + name.replace("-", "_") + "_UART1", rate))
+        if "highprec" in profile:
+            cfg_data.append((cls._config_key_hpm, profile["highprec"]))
+        if "uart2Baud" in profile:
+            cfg_data.append((cls._config_key_uart2_baud, profile["uart2Baud"]))
+        return cfg_data
+
     @classmethod
     async def get_satellites_in_use(cls) -> dict:
         """
-        TODO: funktioniert nicht als ubx-Abfrage, frisst den gesamten heap!!!
         ASYNC: Get the satellites used in navigation
-        ATTENTION: Method does not work yet. Uses to much heap to create NAV-SAT Message!!!!!!!!
-        :return: UBXMessage NAV-SAT containing satellites with details
+        The NAV-SAT response is parsed lazily, so the per satellite attributes
+        (e.g. svId_01, cno_01) are only decoded when they are read.
+        :return: UBXMessage NAV-SAT containing satellites with details, None if failed
         :rtype: UBXMessage
         """
         gc.collect()
-        await cls._flush_receive_qs()
         msg = UBXMessage(
             cls._nav_cls,
             cls._nav_sat,
             GET
         )
-        debug_gc()
-        await cls._msg_q.put(msg.serialize())
-        nav = await cls._nav_msg_q.get()
+        nav = await UbxDispatcher.request(msg)
         gc.collect()
+        if not cls._is_response(nav):
+            return None
         return nav
 
     @classmethod
@@ -279,23 +621,11 @@ class GnssHandler:
         """
         ASYNC: Enable/Disable High Precision mode
 
-        :param int enable: 0 = enable / 1 = disable
+        :param int enable: 1 = enable / 0 = disable
         :return: True if successful, False if failed
         :rtype: bool
         """
-        await cls._flush_receive_qs()
-        layer = SET_LAYER_RAM  # volatile memory
-        transaction = 0
-        cfg_data = [(cls._config_key_hpm, enable)]
-        msg = UBXMessage.config_set(layer, transaction, cfg_data)
-        await cls._msg_q.put(msg.serialize())
-        ack = await cls._ack_nack_q.get()
-        if ack.msg_id == b'\x01':  # ACK-ACK
-            gc.collect()
-            return True
-        else:
-            gc.collect()
-            return False  # ACK-NACK
+        return await cls.configure([(cls._config_key_hpm, enable)])
 
     @classmethod
     def enableNTRIP(cls, enable: int):
@@ -330,54 +660,47 @@ class GnssHandler:
     @classmethod
     async def get_position(cls) -> PositionData:
         """
-        ASYNC: Gets the position dictionary with: time, latitude, longitude, elevation and fixtype
+        ASYNC: Gets the latest position with: time, latitude, longitude, elevation and fixtype
+        Waits for the first position after startup.
 
         :return: Position Data
         :rtype: PositionData
         """
-        await cls._flush_receive_qs()
-        position = await cls._pos_q.get()
-        return position
+        return await cls._pos_bus.latest()
 
     @classmethod
-    async def set_minimum_nmea_msgs(cls):
+    def subscribe_position(cls) -> Subscriber:
         """
-        ASYNC: Deactivate all NMEA messages on UART1, except NMEA-GGA
+        Subscribe to the position of every navigation epoch.
+        Use 'await subscriber.next()' to wait for a newer position
+        and 'subscriber.close()' when done.
+
+        :return: subscriber to the position bus
+        :rtype: Subscriber
         """
-        await cls._flush_receive_qs()
-        count = 0
-        for (msgid, msgname) in UBX_MSGIDS.items():
-            if msgid[0] == 0xf0:  # NMEA
-                if msgid[1] == 0x00:  # NMEA-GGA
-                    rate = 1
-                else:
-                    rate = 0
-                msgnmea = UBXMessage(
-                    cls._cfg_cls,
-                    cls._cfg_msg,
-                    SET,
-                    msgClass=msgid[0],
-                    msgID=msgid[1],
-                    rateUART1=rate,
-                    rateUSB=0,
-                )
-                await cls._msg_q.put(msgnmea.serialize())
-                count = count + 1
-                gc.collect()
-        while not cls._ack_nack_q.empty:
-            await cls._ack_nack_q.get()
-        gc.collect()
+        return cls._pos_bus.subscribe()
 
     @classmethod
-    async def _flush_receive_qs(cls):
+    async def set_minimum_nmea_msgs(cls):
         """
-        ASYNC: Empty all receiving queues
+        ASYNC: Deactivate all NMEA messages on UART1, except NMEA-GGA
         """
-        while not cls._ack_nack_q.empty:
-            await cls._ack_nack_q.get()
-        while not cls._nav_msg_q.empty:
-            await cls._nav_msg_q.get()
-        while not cls._cfg_response_q.empty:
-            await cls._cfg_response_q.get()
+        await cls.apply_profile({"nmea": {"GGA": 1}})
 
+    @staticmethod
+    def _is_ack(ack: UBXMessage) -> bool:
+        """
+        :param UBXMessage ack: result of an acknowledged request
+        :return: True if the receiver answered with ACK-ACK
+        :rtype: bool
+        """
+        return ack is not None and ack.msg_id == b'\x01'  # ACK-ACK
 
+    @staticmethod
+    def _is_response(msg: UBXMessage) -> bool:
+        """
+        :param UBXMessage msg: result of a poll request
+        :return: True if the receiver answered with the polled message (not ACK-NACK or timeout)
+        :rtype: bool
+        """
+        return msg is not None and msg.msg_cls != b'\x05'
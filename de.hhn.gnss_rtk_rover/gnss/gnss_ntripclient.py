@@ -6,27 +6,39 @@ at specified interval
 correction data from NTRIP caster and sending the
 correction data to the ZED-F9P over UART
 
+A lost, refused or stalled connection is re-established with a jittered
+exponential backoff until the client is stopped through the stop event.
+The caster address is resolved once and cached.
+Connect and handshake are non-blocking, the name lookup is not: usocket
+has no asynchronous getaddrinfo, so resolving a host name while DNS is
+unreachable blocks the event loop (UART reading, web server) for up to the
+lwIP DNS timeout of several seconds. This happens only on the first connect
+and after DNS_RETRIES failed connects, never while streaming, and a failed
+lookup keeps the last address and waits for the backoff like a refused
+connect. A caster given as ip address never blocks. the NTRIP 1.0 (ICY) / 2.0 (HTTP)
+response is checked before any data is forwarded and the HTTP chunked
+transfer encoding of NTRIP 2.0 is removed from the stream.
+
 Created on 10 Oct 2022
 :author: vdueck
 """
 from utils.mem_debug import debug_gc
 debug_gc()
-import utils.queue
 from gnss.gnss_handler import GnssHandler
+from serial_communication.uart_reader import UartReader
 from gnss.rtcm_reader import RTCMReader
+from gnss.rtcm_filter import RTCMFilter
 import binascii
 import uasyncio
 from uasyncio import Event
 from machine import UART
 import time
+import uerrno
+import urandom
 from utils.queue import Queue
 import usocket
 from gnss.msg_dictionaries.ubxtypes_core import RTCM3_PROTOCOL, ERR_IGNORE
-from gnss.msg_dictionaries.exceptions import (
-    RTCMParseError,
-    RTCMMessageError,
-    RTCMTypeError,
-)
+from gnss.msg_dictionaries.exceptions import NTRIPResponseError
 from utils.globals import (
     DEFAULT_BUFSIZE,
     OUTPORT_NTRIP,
@@ -35,6 +47,7 @@ from utils.globals import (
     NTRIP_SERVER,
     MOUNTPOINT,
     GGA_INTERVAL,
+    NTRIP_STALL_TIMEOUT,
 )
 
 TIMEOUT = 10
@@ -47,6 +60,64 @@ NTRIP_HEADERS = {
 GGALIVE = 0
 GGAFIXED = 1
 
+# connection states
+NTRIP_IDLE = 0  # stopped through the stop event
+NTRIP_CONNECTING = 1  # connecting, waiting for the first correction
+NTRIP_STREAMING = 2  # corrections are forwarded
+NTRIP_BACKOFF = 3  # waiting before the next connection attempt
+NTRIP_STATES = ("idle", "connecting", "streaming", "backoff")
+
+BACKOFF_MIN = 1000  # ms
+BACKOFF_MAX = 60000  # ms
+GGA_RETRY = 1000  # ms to wait for the first valid position
+DNS_RETRIES = 3  # failed connects (socket error, connect or header timeout) before the address is resolved again
+CONNECT_TIMEOUT = TIMEOUT * 1000  # ms for connecting and sending the request
+HEADER_TIMEOUT = 5000  # ms for the response header of the caster
+HEADER_MAXLINES = 32
+
+
+class ChunkedStream:
+    """
+    Removes the HTTP chunked transfer encoding (NTRIP 2.0) from a stream.
+    """
+
+    def __init__(self, stream: uasyncio.StreamReader):
+        """
+        Constructor.
+
+        :param StreamReader stream: the stream with the chunked data, positioned after the header
+        """
+        self._stream = stream
+        self._left = 0  # bytes left in the current chunk
+
+    async def readinto(self, buf) -> int:
+        """
+        ASYNC: Read the available data of the current chunk into buf.
+
+        :param buf: bytearray or memoryview
+        :return: number of bytes read, 0 at the last chunk or EOF
+        :rtype: int
+        :raises: OSError if the chunk size is invalid
+        """
+        if self._left == 0:
+            line = await self._stream.readline()
+            if line == b"\r\n":  # end of the previous chunk
+                line = await self._stream.readline()
+            if not line:
+                return 0
+            try:
+                self._left = int(line.split(b";")[0].strip(), 16)
+            except ValueError:
+                raise OSError("invalid chunk size")
+            if self._left == 0:  # last chunk
+                return 0
+        if len(buf) > self._left:
+            buf = memoryview(buf)[:self._left]
+        n = await self._stream.readinto(buf)
+        if n:
+            self._left -= n
+        return n
+
 
 class GNSSNTRIPClient:
     """
@@ -55,16 +126,12 @@ class GNSSNTRIPClient:
 
     def __init__(self,
                  rtcmoutput: UART,
-                 app: object,
-                 gga_q: utils.queue.Queue,
-                 ggaevent: uasyncio.Event):
+                 app: object):
         """
         Constructor.
 
         :param object app: application from which this class is invoked (None)
         :param object rtcmoutput: UART connection for rtcm data to ZED-F9P
-        :param object gga_q: The Queue with GGA data from the receiver
-        :param Event ggaevent: event to tell the UartReader to put a GGA sentence on the gga_q
         """
         self.__app = app  # Reference to calling application class (if applicable)
         self._ntripqueue = Queue()
@@ -72,11 +139,26 @@ class GNSSNTRIPClient:
         self._swriter = None
         self._sreader = None
         self._task = None
-        self._read_gga_event = ggaevent
         self._output = uasyncio.StreamWriter(rtcmoutput)
-        self._last_gga = time.ticks_ms()
-        self._gga_queue = gga_q
-        self._first_start = True
+        self._gga_task = None  # sends the position to the caster while connected
+        self._gga_sent = 0
+        self._rtcm_reader = None
+
+        # reconnect engine
+        self._state = NTRIP_IDLE
+        self._addr = None  # cached caster address
+        self._connect_failures = 0  # failed connects in a row
+        self._backoff = BACKOFF_MIN  # upper bound of the next backoff delay in ms
+        self._connect_start = None  # ticks_ms when the current connection was started
+        self._down_since = None  # ticks_ms when the stream was lost, None while streaming
+        self._last_error = None
+        self._connects = 0  # successful TCP connects
+        self._reconnects = 0  # connection attempts after a lost or failed connection
+        self._stalls = 0  # connections without RTCM3 frames for NTRIP_STALL_TIMEOUT
+        self._downtime = 0  # ms without corrections after a lost stream, while enabled
+        self._ttfc = None  # ms from connection start to the first correction, last connection
+        self._response = None  # status line of the last caster response e.g. 'ICY 200 OK'
+        self._chunked = False  # the caster uses the chunked transfer encoding
 
         # persist settings to allow any calling app to retrieve them
         self._settings = {
@@ -102,18 +184,55 @@ class GNSSNTRIPClient:
         """
         return self._settings
 
+    @property
+    def rtcm_stats(self) -> dict:
+        """
+        Getter for the RTCM forwarding counters of the current connection.
+        :return: dict with received, frames, bytes, corrupt and other, None if not connected yet
+        :rtype: dict
+        """
+        if self._rtcm_reader is None:
+            return None
+        return self._rtcm_reader.stats
+
+    @property
+    def status(self) -> dict:
+        """
+        Getter for the state and the counters of the reconnect engine.
+        :return: dict with state, connects, reconnects, stalls, downtime (ms),
+                 ttfc (ms, time to first correction), lastError, response (status line), chunked,
+                 ggaSent and ggaAge (ms since the latest valid position)
+        :rtype: dict
+        """
+        downtime = self._downtime
+        if self._down_since is not None and self._state != NTRIP_IDLE:
+            downtime += time.ticks_diff(time.ticks_ms(), self._down_since)
+        return {
+            "state": NTRIP_STATES[self._state],
+            "connects": self._connects,
+            "reconnects": self._reconnects,
+            "stalls": self._stalls,
+            "downtime": downtime,
+            "ttfc": self._ttfc,
+            "lastError": self._last_error,
+            "response": self._response,
+            "chunked": self._chunked,
+            "ggaSent": self._gga_sent,
+            "ggaAge": UartReader.gga_age(),
+        }
 
     async def run(self, ntrip_lock: uasyncio.Lock, stopevent: uasyncio.Event):
         """
         Open NTRIP server connection.
         Opens socket to NTRIP server and reads incoming data.
+        Reconnects with backoff when the connection is lost, refused or stalls.
         :param Lock ntrip_lock: used to synchronise the RTCMEnabled Flag
         :param Event stopevent: used to start and stop the ntrip-client / is set by GnssHandler and RequestHandler
         """
         self._task = uasyncio.current_task()
         self._settings["server"] = NTRIP_SERVER
         self._settings["port"] = int(OUTPORT_NTRIP)
-        self._settings["mountpoint"] = mountpoint = MOUNTPOINT
+        self._settings["mountpoint"] = MOUNTPOINT
         self._settings["version"] = "2.0"
         self._settings["user"] = NTRIP_USER
         self._settings["password"] = NTRIP_PW
@@ -127,51 +246,182 @@ class GNSSNTRIPClient:
         ggainterval = int(self._settings["ggainterval"])
 
         while True:
-            if not stopevent.is_set():
-                try:
-                    self._socket = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
-                    self._socket.settimeout(TIMEOUT)
-                    addr = usocket.getaddrinfo(server, port)[0][-1]
-                    self._socket.connect(addr)
-                    msg = self._formatGET(self._settings)
-                    print(str(msg))
-                    self._swriter = uasyncio.StreamWriter(self._socket)
-                    self._sreader = uasyncio.StreamReader(self._socket)
-                    self._swriter.write(msg)
-                    await self._swriter.drain()
-                    async with ntrip_lock:
-                        GnssHandler.rtcm_enabled = True
-                    if mountpoint != "":
-                        await self._send_GGA(ggainterval)
-
-                        try:
-                            await self._do_data(self._sreader, stopevent, ggainterval, self._output, ntrip_lock)
-                        except Exception as ex:
-                            print(Exception)
-                            stopevent.set()
-                            await self._swriter.wait_closed()
-                            await self._sreader.wait_closed()
-                            async with ntrip_lock:
-                                GnssHandler.rtcm_enabled = False
-                        else:
-                            await uasyncio.sleep(1)
-                            async with ntrip_lock:
-                                GnssHandler.rtcm_enabled = False
-                except Exception as ex:
-                    print(Exception)
-                    stopevent.set()
-                    await self._swriter.wait_closed()
-                    await self._sreader.wait_closed()
-                    async with ntrip_lock:
-                        GnssHandler.rtcm_enabled = False
-            else:
-                await uasyncio.sleep(1)
+            if stopevent.is_set() or mountpoint == "":
+                self._state = NTRIP_IDLE
+                self._backoff = BACKOFF_MIN
+                self._down_since = None
                 async with ntrip_lock:
                     GnssHandler.rtcm_enabled = False
+                await uasyncio.sleep(1)
+                continue
+            self._state = NTRIP_CONNECTING
+            self._connect_start = time.ticks_ms()
+            try:
+                await self._connect(server, port)
+                self._gga_task = uasyncio.create_task(self._run_gga(ggainterval))
+                stream = ChunkedStream(self._sreader) if self._chunked else self._sreader
+                reason = await self._do_data(stream, stopevent, self._output, ntrip_lock)
+            except uasyncio.TimeoutError:  # connect or response header
+                reason = "timeout"
+            except NTRIPResponseError as ex:  # e.g. wrong credentials or mountpoint, retry slowly
+                reason = str(ex)
+                self._backoff = BACKOFF_MAX
+            except Exception as ex:  # OSError, also on refused / reset connections
+                reason = repr(ex)
+            await self._close()
+            async with ntrip_lock:
+                GnssHandler.rtcm_enabled = False
+            if stopevent.is_set():  # stopped by the user, not a lost connection
+                continue
+            print("gnssntripclient -> connection lost: " + reason)
+            self._last_error = reason
+            if self._down_since is None:
+                self._down_since = time.ticks_ms()
+            self._reconnects += 1
+            self._state = NTRIP_BACKOFF
+            delay = self._next_backoff()
+            while delay > 0 and not stopevent.is_set():
+                await uasyncio.sleep_ms(min(delay, 1000))
+                delay -= 1000
+
+    def _next_backoff(self) -> int:
+        """
+        Get the delay before the next connection attempt and double the backoff.
+        The delay is random between half and the full backoff (equal jitter),
+        so several rovers don't reconnect to the caster at the same time.
+
+        :return: delay in ms
+        :rtype: int
+        """
+        half = self._backoff // 2
+        delay = half + ((urandom.getrandbits(10) * half) >> 10)
+        self._backoff = min(self._backoff * 2, BACKOFF_MAX)
+        return delay
+
+    def _resolve(self, server: str, port: int):
+        """
+        Get the caster address, resolved on the first call and after DNS_RETRIES failed connects.
+        If the lookup fails the last address is kept.
+
+        :param str server: host name or ip of the caster
+        :param int port: port of the caster
+        :return: socket address
+        """
+        if self._addr is None or self._connect_failures >= DNS_RETRIES:
+            self._connect_failures = 0  # next lookup after DNS_RETRIES more failures
+            try:
+                self._addr = usocket.getaddrinfo(server, port)[0][-1]  # blocking, see module docstring
+            except OSError:
+                if self._addr is None:  # nothing to fall back to, retried after the backoff
+                    raise
+        return self._addr
+
+    async def _connect(self, server: str, port: int):
+        """
+        ASYNC: Connect to the caster, send the request for the mountpoint and check the response.
+        The event loop keeps running while connecting.
 
+        :param str server: host name or ip of the caster
+        :param int port: port of the caster
+        :raises: OSError if the connection failed, TimeoutError, NTRIPResponseError if the request was rejected
+        """
+        addr = self._resolve(server, port)
+        try:
+            self._open(addr)
+            self._swriter.write(self._formatGET(self._settings))  # buffered until connected
+            await uasyncio.wait_for_ms(self._swriter.drain(), CONNECT_TIMEOUT)
+            self._connects += 1
+            await uasyncio.wait_for_ms(self._read_header(), HEADER_TIMEOUT)
+        except (OSError, uasyncio.TimeoutError):  # e.g. EHOSTUNREACH, refused, no answer: maybe a stale address
+            self._connect_failures += 1
+            raise
+        self._connect_failures = 0
 
+    def _open(self, addr):
+        """
+        Create a non-blocking socket and start connecting, the connection
+        is established when the first write is drained.
 
+        :param addr: socket address of the caster
+        :raises: OSError if the connection failed
+        """
+        self._socket = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
+        self._socket.setblocking(False)
+        try:
+            self._socket.connect(addr)
+        except OSError as ex:
+            if ex.errno != uerrno.EINPROGRESS:
+                raise
+        self._swriter = uasyncio.StreamWriter(self._socket)
+        self._sreader = uasyncio.StreamReader(self._socket)
 
+    async def _read_header(self):
+        """
+        ASYNC: Read and check the response of the caster.
+        NTRIP 1.0 casters answer 'ICY 200 OK' followed by the data, NTRIP 2.0
+        casters answer with a HTTP status line and header. A sourcetable
+        means the mountpoint doesn't exist.
+
+        :raises: NTRIPResponseError if the request was rejected, OSError if the connection was closed
+        """
+        self._chunked = False
+        line = await self._sreader.readline()
+        if not line:
+            raise OSError("connection closed by caster")
+        status = line.decode().strip()
+        self._response = status
+        parts = status.split(" ", 2)
+        code = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        sourcetable = parts[0] == "SOURCETABLE"
+        if parts[0] != "ICY":  # header lines up to an empty line
+            for _ in range(HEADER_MAXLINES):
+                line = await self._sreader.readline()
+                if not line or line == b"\r\n" or line == b"\n":
+                    break
+                name, _, value = line.decode().partition(":")
+                name = name.strip().lower()
+                value = value.strip().lower()
+                if name == "transfer-encoding":
+                    self._chunked = "chunked" in value
+                elif name == "content-type":
+                    sourcetable = sourcetable or "sourcetable" in value
+        if code != 200 or sourcetable:
+            raise NTRIPResponseError(status)
+
+    async def _close(self):
+        """
+        ASYNC: Close the connection to the caster, if any.
+        """
+        if self._gga_task is not None:
+            self._gga_task.cancel()
+            self._gga_task = None
+        if self._swriter is not None:
+            self._swriter.close()
+            try:
+                await self._swriter.wait_closed()
+            except OSError:  # connection already reset
+                pass
+        elif self._socket is not None:  # never got a stream
+            self._socket.close()
+        self._socket = None
+        self._swriter = None
+        self._sreader = None
+
+    async def _first_correction(self, ntrip_lock: uasyncio.Lock):
+        """
+        ASYNC: Bookkeeping when the first correction of a connection was forwarded.
+
+        :param Lock ntrip_lock: used to synchronise the RTCMEnabled Flag
+        """
+        now = time.ticks_ms()
+        self._state = NTRIP_STREAMING
+        self._ttfc = time.ticks_diff(now, self._connect_start)
+        if self._down_since is not None:
+            self._downtime += time.ticks_diff(now, self._down_since)
+            self._down_since = None
+        self._backoff = BACKOFF_MIN
+        async with ntrip_lock:
+            GnssHandler.rtcm_enabled = True
 
     @staticmethod
     def _formatGET(settings: dict) -> bytes:
@@ -203,38 +453,48 @@ class GNSSNTRIPClient:
         req = reqline1 + reqline2 + reqline3 + reqline4 + reqline5 + "\r\n"  # NECESSARY!!!
         return bytes(req, 'utf-8')
 
-    async def _send_GGA(self, ggainterval: int):
+    async def _run_gga(self, ggainterval: int):
         """
-        THREADED
-        Send NMEA GGA sentence to NTRIP server at prescribed interval.
+        ASYNC: Send the latest valid GGA sentence to the caster every ggainterval ms while connected.
+        Runs as its own task, so the RTCM forwarding never waits for a GGA.
+        The first sentence is sent as soon as there is a valid position.
+        If the connection fails the socket is closed, the forwarding loop
+        fails on it at once and the client reconnects.
 
         :param int ggainterval: tells how often the gga should be send to the ntrip-caster
         """
-        if time.ticks_diff(time.ticks_ms(), self._last_gga) > ggainterval or self._first_start:
-            self._read_gga_event.set()
-            raw_data = await self._gga_queue.get()
-            self._read_gga_event.clear()
-            if raw_data is not None:
+        try:
+            while True:
+                raw_data = UartReader.latest_gga()
+                if raw_data is None:  # no valid position yet
+                    await uasyncio.sleep_ms(GGA_RETRY)
+                    continue
                 self._swriter.write(raw_data)
                 await self._swriter.drain()
-                print("Sending gga to caster: " + str(raw_data))
-            self._last_gga = time.ticks_ms()
-            self._first_start = False
+                self._gga_sent += 1
+                await uasyncio.sleep_ms(ggainterval)
+        except OSError as ex:  # connection lost, wake the forwarding loop waiting for data
+            print("gnssntripclient -> sending gga failed: " + repr(ex))
+            await self._swriter.wait_closed()
 
     async def _do_data(self,
                        sock: uasyncio.StreamReader,
                        stopevent: Event,
-                       ggainterval: int,
                        output: uasyncio.StreamWriter,
-                       ntrip_lock: uasyncio.Lock):
+                       ntrip_lock: uasyncio.Lock) -> str:
         """
         ASYNC
-        Read and parse incoming NTRIP RTCM3 data stream.
+        Forward the incoming NTRIP RTCM3 data stream to the receiver.
+        Returns when the client is stopped, the caster closes the connection or
+        no valid RTCM3 frame arrived for NTRIP_STALL_TIMEOUT seconds. Frames the
+        message filter drops count as arrived, the stream is alive.
 
-        :param StreamReader sock: socket
+        :param StreamReader sock: socket stream, positioned after the response header
         :param Event stopevent: stop event
-        :param int ggainterval: GGA transmission interval seconds
         :param uasyncio.StreamWriter output: output stream for RTCM3 messages
+        :param Lock ntrip_lock: used to synchronise the RTCMEnabled Flag
+        :return: why the stream ended: 'stopped', 'closed' or 'stalled'
+        :rtype: str
         """
         print("ntrip begin do_data " + str(time.ticks_ms()))
         # RTCMReader will wrap socket as SocketStream
@@ -244,32 +504,28 @@ class GNSSNTRIPClient:
             quitonerror=ERR_IGNORE,
             bufsize=DEFAULT_BUFSIZE,
             labelmsm=True,
+            msgfilter=RTCMFilter,
         )
-        raw_data = None
-        async with ntrip_lock:
-            GnssHandler.rtcm_enabled = True
+        self._rtcm_reader = ubr
+        stall_timeout = int(NTRIP_STALL_TIMEOUT * 1000)
+        last_rtcm = time.ticks_ms()
+        first = True
         while not stopevent.is_set():
+            remaining = stall_timeout - time.ticks_diff(time.ticks_ms(), last_rtcm)
             try:
-                raw_data = await ubr.read()
-                if raw_data is not None:
-                    await self._do_write(output, raw_data)
-                await self._send_GGA(ggainterval)
-            except (
-                RTCMMessageError,
-                RTCMParseError,
-                RTCMTypeError,
-            ) as err:
-                print("gnssntripclient -> Error parsing rtcm stream")
-                continue
-
-    async def _do_write(self, output: uasyncio.StreamWriter, raw: bytes):
-        """
-        ASYNC
-        Send RTCM3 data to designated output medium.
-
-
-        :param uasyncio.Streamwriter output: writeable output medium for RTCM3 data
-        :param bytes raw: raw data
-        """
-        output.write(raw)
-        await output.drain()
+                if remaining <= 0:
+                    raise uasyncio.TimeoutError
+                received = ubr.received
+                sent = await uasyncio.wait_for_ms(ubr.forward(output), remaining)
+            except uasyncio.TimeoutError:
+                self._stalls += 1
+                return "stalled"
+            if sent < 0:  # connection closed by caster
+                print("gnssntripclient -> stream closed " + str(ubr.stats))
+                return "closed"
+            if ubr.received != received:
+                last_rtcm = time.ticks_ms()
+            if sent > 0 and first:
+                first = False
+                await self._first_correction(ntrip_lock)
+        return "stopped"
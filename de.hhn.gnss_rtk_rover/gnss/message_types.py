@@ -1,3 +1,74 @@
+"""
+Record classes for position data
+
+The records hold numeric values and are reused across updates:
+- time: milliseconds since midnight (UTC)
+- lat, lon: degrees = lat * 1e-7 + latHp * 1e-9 (as UBX NAV-HPPOSLLH)
+- elev: height above mean sea level in 0.1 mm
+- hAcc, vAcc: accuracy estimates in mm
+Values which are not available are None.
+to_json() renders the degrees and heights as exact decimal numbers,
+so no single precision floats are involved on the device.
+
+Created on 4 Sep 2022
+:author: vdueck
+"""
+import ujson
+
+
+def _fmt_deg(deg7, deghp) -> str:
+    """
+    Format degrees given as 1e-7 and 1e-9 degree parts as decimal number.
+    :param int deg7: degrees * 1e7
+    :param int deghp: high precision part in 1e-9 degrees (-99..99)
+    :return: decimal degrees with 9 decimals e.g. '50.629340682' or 'null'
+    :rtype: str
+    """
+    if deg7 is None:
+        return "null"
+    sign = ""
+    if deg7 < 0 or (deg7 == 0 and deghp < 0):
+        sign = "-"
+        deg7 = -deg7
+        deghp = -deghp
+    deg, frac = divmod(deg7, 10000000)
+    frac = frac * 100 + deghp
+    if frac < 0:
+        deg -= 1
+        frac += 1000000000
+    elif frac >= 1000000000:
+        deg += 1
+        frac -= 1000000000
+    return "%s%d.%09d" % (sign, deg, frac)
+
+
+def _fmt_height(val) -> str:
+    """
+    Format a height given in 0.1 mm as decimal number of meters.
+    :param int val: height in 0.1 mm
+    :return: decimal number e.g. '545.4231' or 'null'
+    :rtype: str
+    """
+    if val is None:
+        return "null"
+    sign = ""
+    if val < 0:
+        sign = "-"
+        val = -val
+    return "%s%d.%04d" % (sign, val // 10000, val % 10000)
+
+
+def _fmt_int(val) -> str:
+    """
+    :param int val: value or None
+    :return: integer as JSON number or 'null'
+    :rtype: str
+    """
+    if val is None:
+        return "null"
+    return "%d" % val
+
+
 """
 PositionData class
 
@@ -5,13 +76,37 @@ Data Class, used to create RealTimeMessage objects
 """
 class PositionData:
 
-    def __init__(self, time, fixType, lat, lon, elev):
+    __slots__ = ("time", "fixType", "lat", "latHp", "lon", "lonHp", "elev")
+
+    def __init__(self, time=None, fixType=0, lat=None, latHp=0, lon=None, lonHp=0, elev=None):
         self.time = time
         self.fixType = fixType
         self.lat = lat
+        self.latHp = latHp
         self.lon = lon
+        self.lonHp = lonHp
         self.elev = elev
 
+    def json_fields(self) -> str:
+        """
+        :return: the fields as JSON object members without braces
+        :rtype: str
+        """
+        return '"time": %s, "fixType": %d, "lat": %s, "lon": %s, "elev": %s' % (
+            _fmt_int(self.time),
+            self.fixType,
+            _fmt_deg(self.lat, self.latHp),
+            _fmt_deg(self.lon, self.lonHp),
+            _fmt_height(self.elev),
+        )
+
+    def to_json(self) -> str:
+        """
+        :return: JSON representation
+        :rtype: str
+        """
+        return "{" + self.json_fields() + "}"
+
 """
 Accuracy class
 
@@ -19,10 +114,65 @@ Data Class, used to create RealTimeMessage objects
 """
 class Accuracy:
 
-    def __init__(self, hAcc, vAcc):
+    __slots__ = ("hAcc", "vAcc")
+
+    def __init__(self, hAcc=None, vAcc=None):
         self.hAcc = hAcc
         self.vAcc = vAcc
 
+    def json_fields(self) -> str:
+        """
+        :return: the fields as JSON object members without braces
+        :rtype: str
+        """
+        return '"hAcc": %s, "vAcc": %s' % (_fmt_int(self.hAcc), _fmt_int(self.vAcc))
+
+    def to_json(self) -> str:
+        """
+        :return: JSON representation
+        :rtype: str
+        """
+        return "{" + self.json_fields() + "}"
+
+"""
+NavSolution class
+
+Data Class, snapshot of the latest UBX NAV-PVT message
+"""
+class NavSolution:
+
+    __slots__ = ("iTOW", "fixType", "carrSoln", "numSV", "gSpeed", "accuracy", "received")
+
+    def __init__(self):
+        self.iTOW = None  # GPS time of week of the epoch in ms
+        self.fixType = 0  # 0 = no fix, 2 = 2D, 3 = 3D
+        self.carrSoln = 0  # 0 = none, 1 = RTK float, 2 = RTK fixed
+        self.numSV = 0
+        self.gSpeed = None  # ground speed in mm/s
+        self.accuracy = Accuracy()
+        self.received = None  # utime.ticks_ms() of the last update
+
+    def json_fields(self) -> str:
+        """
+        :return: the fields as JSON object members without braces
+        :rtype: str
+        """
+        return '"iTOW": %s, "fixType": %d, "carrSoln": %d, "numSV": %d, "gSpeed": %s, %s' % (
+            _fmt_int(self.iTOW),
+            self.fixType,
+            self.carrSoln,
+            self.numSV,
+            _fmt_int(self.gSpeed),
+            self.accuracy.json_fields(),
+        )
+
+    def to_json(self) -> str:
+        """
+        :return: JSON representation
+        :rtype: str
+        """
+        return "{" + self.json_fields() + "}"
+
 """
 RealTimeMessage class
 
@@ -30,13 +180,33 @@ Data Class for WebSocket transmission
 """
 class RealTimeMessage:
 
+    __slots__ = ("exception", "position", "accuracy", "rtcmEnabled")
+
     def __init__(self, positionData: PositionData, accuracy: Accuracy, rtcmEnabled: bool):
         self.exception = None
-        self.time = positionData.time
-        self.fixType = positionData.fixType
-        self.lat = positionData.lat
-        self.lon = positionData.lon
-        self.elev = positionData.elev
-        self.hAcc = accuracy.hAcc
-        self.vAcc = accuracy.vAcc
-        self.rtcmEnabled = rtcmEnabled
\ No newline at end of file
+        self.position = positionData
+        self.accuracy = accuracy
+        self.rtcmEnabled = rtcmEnabled
+
+    def update(self, positionData: PositionData, accuracy: Accuracy, rtcmEnabled: bool):
+        """
+        Reuse the message for the next transmission.
+        :param PositionData positionData: current position
+        :param Accuracy accuracy: current accuracy
+        :param bool rtcmEnabled: state of the NTRIP client
+        """
+        self.position = positionData
+        self.accuracy = accuracy
+        self.rtcmEnabled = rtcmEnabled
+
+    def to_json(self) -> str:
+        """
+        :return: JSON representation, the position and accuracy fields are flattened
+        :rtype: str
+        """
+        return '{"exception": %s, %s, %s, "rtcmEnabled": %s}' % (
+            "null" if self.exception is None else ujson.dumps(str(self.exception)),
+            self.position.json_fields(),
+            self.accuracy.json_fields(),
+            "true" if self.rtcmEnabled else "false",
+        )
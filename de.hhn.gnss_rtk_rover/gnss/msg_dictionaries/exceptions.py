@@ -35,4 +35,7 @@ class RTCMMessageError(Exception):
     """RTCM Undefined message class/id."""
 
 class RTCMTypeError(Exception):
-    """RTCM Undefined payload attribute type."""
\ No newline at end of file
+    """RTCM Undefined payload attribute type."""
+
+class NTRIPResponseError(Exception):
+    """NTRIP caster rejected the request (error status or sourcetable)."""
\ No newline at end of file
@@ -12,6 +12,7 @@ Based on:
 """
 
 import struct
+from array import array
 # from datetime import datetime, timedelta
 from gnss.msg_dictionaries.ubxtypes_core import GNSSLIST, UBX_HDR, NMEA_HDR
 import gnss.msg_dictionaries.ubxtypes_core as ubt
@@ -48,24 +49,79 @@ def att2name(att: str) -> str:
         return att
 
 
-def calc_checksum(content: bytes) -> bytes:
+def _fletcher8_py(content, start: int, end: int, init: int) -> int:
+    """
+    Pure Python 8-bit Fletcher checksum over content[start:end].
+    The sums are masked once per block instead of once per byte,
+    a block is small enough to keep them within small int range.
+    """
+
+    check_a = init & 0xFF
+    check_b = (init >> 8) & 0xFF
+    mv = memoryview(content)
+    while start < end:
+        blk = min(end, start + 2048)
+        for char in mv[start:blk]:
+            check_a += char
+            check_b += check_a
+        check_a &= 0xFF
+        check_b &= 0xFF
+        start = blk
+    return check_a | (check_b << 8)
+
+
+try:
+    import micropython
+
+    @micropython.viper
+    def _fletcher8_viper(content, start: int, end: int, init: int) -> int:
+        """
+        8-bit Fletcher checksum over content[start:end] (viper code emitter).
+        """
+
+        buf = ptr8(content)  # noqa: F821 viper builtin
+        check_a = init & 0xFF
+        check_b = (init >> 8) & 0xFF
+        for i in range(start, end):
+            check_a = (check_a + buf[i]) & 0xFF
+            check_b = (check_b + check_a) & 0xFF
+        return check_a | (check_b << 8)
+
+    _fletcher8 = _fletcher8_viper
+except (ImportError, AttributeError, RuntimeError):  # no viper emitter e.g. CPython
+    _fletcher8 = _fletcher8_py
+
+
+def calc_fletcher8(content, start: int = 0, end: int = -1, init: int = 0) -> int:
+    """
+    Calculate 8-bit Fletcher checksum over a range of a buffer without copying it.
+    The checksum of data split into several parts can be calculated by passing
+    the result of the previous part as init.
+    :param content: bytes, bytearray or memoryview
+    :param int start: index of the first byte
+    :param int end: index after the last byte, -1 for the end of the buffer
+    :param int init: checksum of the preceding data
+    :return: checksum as int, CK_A in the low byte and CK_B in the high byte
+    :rtype: int
+    """
+
+    if end < 0:
+        end = len(content)
+    return _fletcher8(content, start, end, init)
+
+
+def calc_checksum(content, start: int = 0, end: int = -1) -> bytes:
     """
     Calculate checksum using 8-bit Fletcher's algorithm.
     :param bytes content: message content, excluding header and checksum bytes
+    :param int start: index of the first byte of content
+    :param int end: index after the last byte of content, -1 for the end of content
     :return: checksum
     :rtype: bytes
     """
 
-    check_a = 0
-    check_b = 0
-
-    for char in content:
-        check_a += char
-        check_a &= 0xFF
-        check_b += check_a
-        check_b &= 0xFF
-
-    return bytes((check_a, check_b))
+    ckv = calc_fletcher8(content, start, end)
+    return bytes((ckv & 0xFF, ckv >> 8))
 
 
 def isvalid_checksum(message: bytes) -> bool:
@@ -77,7 +133,78 @@ def isvalid_checksum(message: bytes) -> bool:
     """
     lenm = len(message)
     ckm = message[lenm - 2 : lenm]
-    return ckm == calc_checksum(message[2 : lenm - 2])
+    return ckm == calc_checksum(message, 2, lenm - 2)
+
+
+_CRC24Q_TABLE = None
+
+
+def _crc24q_table() -> array:
+    """
+    Build the CRC-24Q lookup table on first use.
+    :return: table of 256 CRC values
+    :rtype: array
+    """
+
+    global _CRC24Q_TABLE
+    if _CRC24Q_TABLE is None:
+        table = array("L", [0] * 256)
+        for i in range(256):
+            crc = i << 16
+            for _ in range(8):
+                crc <<= 1
+                if crc & 0x1000000:
+                    crc ^= 0x1864CFB
+            table[i] = crc & 0xFFFFFF
+        _CRC24Q_TABLE = table
+    return _CRC24Q_TABLE
+
+
+def _crc24q_py(content, start: int, end: int, table) -> int:
+    """
+    Pure Python table driven CRC-24Q over content[start:end].
+    """
+
+    crc = 0
+    for char in memoryview(content)[start:end]:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[(crc >> 16) ^ char]
+    return crc
+
+
+try:
+    import micropython
+
+    @micropython.viper
+    def _crc24q_viper(content, start: int, end: int, table) -> int:
+        """
+        Table driven CRC-24Q over content[start:end] (viper code emitter).
+        """
+
+        buf = ptr8(content)  # noqa: F821 viper builtin
+        tab = ptr32(table)  # noqa: F821 viper builtin
+        crc = 0
+        for i in range(start, end):
+            crc = ((crc << 8) & 0xFFFFFF) ^ tab[((crc >> 16) ^ buf[i]) & 0xFF]
+        return crc
+
+    _crc24q = _crc24q_viper
+except (ImportError, AttributeError, RuntimeError):  # no viper emitter e.g. CPython
+    _crc24q = _crc24q_py
+
+
+def calc_crc24q(content, start: int = 0, end: int = -1) -> int:
+    """
+    Calculate CRC-24Q as used by RTCM3 over a range of a buffer without copying it.
+    :param content: bytes, bytearray or memoryview
+    :param int start: index of the first byte
+    :param int end: index after the last byte, -1 for the end of the buffer
+    :return: crc
+    :rtype: int
+    """
+
+    if end < 0:
+        end = len(content)
+    return _crc24q(content, start, end, _crc24q_table())
 
 
 def atttyp(att: str) -> str:
@@ -340,6 +467,72 @@ def cfgname2key(name: str) -> tuple:
         ) from err
 
 
+_CFGKEY_INDEX = None  # keyID -> name, built on first use
+_CFGKEY_COMPACT = False  # use sorted keyID array instead of dict
+
+
+def use_compact_cfgkey_index(compact: bool = True):
+    """
+    Select the representation of the keyID -> name index used by cfgkey2name.
+    The default is a dict. The compact index is a sorted array of keyIDs and a
+    tuple of names which is binary searched, it needs a fraction of the memory
+    of a dict for large configuration databases.
+    :param bool compact: use the compact index Y/N
+    """
+
+    global _CFGKEY_INDEX, _CFGKEY_COMPACT
+    _CFGKEY_COMPACT = compact
+    _CFGKEY_INDEX = None  # rebuilt on next lookup
+
+
+def _cfgkey_index() -> tuple:
+    """
+    Build the keyID -> name index of the configuration database on first use.
+    The index is rebuilt if keys have been added to the database since.
+    :return: tuple of (database size, dict) or (database size, keyID array, names)
+    :rtype: tuple
+    """
+
+    global _CFGKEY_INDEX
+    cdb = ubcdb.UBX_CONFIG_DATABASE
+    if _CFGKEY_INDEX is None or _CFGKEY_INDEX[0] != len(cdb):
+        if _CFGKEY_COMPACT:
+            items = sorted((kid, key) for key, (kid, _) in cdb.items())
+            _CFGKEY_INDEX = (
+                len(cdb),
+                array("L", [kid for kid, _ in items]),
+                tuple(key for _, key in items),
+            )
+        else:
+            _CFGKEY_INDEX = (len(cdb), {kid: key for key, (kid, _) in cdb.items()})
+    return _CFGKEY_INDEX
+
+
+def _cfgkey_lookup(keyID: int) -> str:
+    """
+    Find the name of a configuration database key in the index.
+    :param int keyID: config key as integer e.g. 0x20930001
+    :return: keyname or None if the key is undocumented
+    :rtype: str
+    """
+
+    index = _cfgkey_index()
+    if len(index) == 2:
+        return index[1].get(keyID)
+    _, kids, names = index
+    lo = 0
+    hi = len(kids)
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if kids[mid] < keyID:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo < len(kids) and kids[lo] == keyID:
+        return names[lo]
+    return None
+
+
 def cfgkey2name(keyID: int) -> tuple:
     """
     Return key name and data type for given
@@ -352,16 +545,14 @@ def cfgkey2name(keyID: int) -> tuple:
 
     try:
 
-        val = None
-        for key, val in ubcdb.UBX_CONFIG_DATABASE.items():
-            (kid, typ) = val
-            if keyID == kid:
-                return (key, typ)
+        key = _cfgkey_lookup(keyID)
+        if key is not None:
+            return (key, ubcdb.UBX_CONFIG_DATABASE[key][1])
 
         # undocumented configuration database key
         # type is derived from keyID
         key = f"CFG_{hex(keyID)}"
-        typ = f"X{ubcdb.UBX_CONFIG_STORSIZE[int(hex(keyID)[2:3])]:03d}"
+        typ = f"X{ubcdb.UBX_CONFIG_STORSIZE[(keyID >> 28) & 0x07]:03d}"
         return (key, typ)
 
     except KeyError:
@@ -0,0 +1,218 @@
+"""
+UBX payload layouts
+
+Compiles the nested OrderedDict payload definitions of the ubxtypes_* modules
+once into flat layouts. A layout holds the offset of every attribute, so a
+lazily parsed UBXMessage only has to look up and decode the attribute that is
+read, and a struct format string, so an eagerly parsed UBXMessage can unpack
+its whole fixed payload part (and each item of a repeating group) in a single
+struct.unpack_from() call.
+
+Format:
+layout = (fields, group, fmt, slots)
+fields = OrderedDict({"name": (offset, type, scale, bitoffset, bitsize, fmt, conv)})
+group = (offset, repeats, group size, fields, fmt, slots) or None
+slots = ((conv, ((name, scale, bitoffset, bitsize), ...)), ...)
+
+bitsize is 0 for plain attributes. For bit flags, type is the type of the
+enclosing bitfield and bitoffset / bitsize locate the flag inside it.
+fmt is the struct format of a single attribute / of all attributes, conv
+says how the unpacked value is converted (see CONV_*).
+Each slot describes one unpacked value and the attribute(s) taken from it.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+from collections import OrderedDict
+import struct
+
+import gnss.msg_dictionaries.ubxtypes_core as ubt
+from gnss.msg_dictionaries.ubxhelpers import attsiz, atttyp
+
+BITFIELDS = (ubt.X1, ubt.X2, ubt.X4, ubt.X6, ubt.X8, ubt.X24)
+
+# conversion of unpacked struct values
+CONV_NONE = 0  # value can be used as unpacked
+CONV_UINT = 1  # bytes -> unsigned int (odd sizes e.g. U3)
+CONV_LIST = 2  # bytes -> list of unsigned ints (type A)
+
+# struct format codes of the fixed size attribute types
+_INT_CODES = {1: "B", 2: "H", 4: "I", 8: "Q"}
+_SINT_CODES = {1: "b", 2: "h", 4: "i", 8: "q"}
+
+_LAYOUTS = {}
+
+
+def attfmt(att: str, bitfield: bool = False) -> tuple:
+    """
+    Get struct format code for given UBX attribute type.
+    :param str att: attribute type e.g. 'U004'
+    :param bool bitfield: attribute is a bitfield which is split into flags
+    :return: tuple of (format code e.g. 'I', conversion)
+    :rtype: tuple
+    :raises: ValueError (if attribute has no fixed size)
+    """
+
+    if att == ubt.CH:
+        raise ValueError("Variable length attribute {}".format(att))
+    atts = attsiz(att)
+    typ = atttyp(att)
+    if typ in ("E", "L", "U") or (typ == "X" and bitfield):
+        if atts in _INT_CODES:
+            return _INT_CODES[atts], CONV_NONE
+        return "{}s".format(atts), CONV_UINT
+    if typ == "I":
+        return _SINT_CODES[atts], CONV_NONE
+    if att == ubt.R4:
+        return "f", CONV_NONE
+    if att == ubt.R8:
+        return "d", CONV_NONE
+    if typ == "A":
+        return "{}s".format(atts), CONV_LIST
+    return "{}s".format(atts), CONV_NONE  # C, X: raw bytes
+
+
+def convert(val, conv: int) -> object:
+    """
+    Apply conversion to an unpacked struct value.
+    :param object val: unpacked value
+    :param int conv: conversion (CONV_*)
+    :return: attribute value
+    :rtype: object
+    """
+
+    if conv == CONV_UINT:
+        return int.from_bytes(val, "little")
+    if conv == CONV_LIST:
+        return list(val)
+    return val
+
+
+def _compile_fields(pdict: dict, offset: int, fields: OrderedDict, slots: list, parsebf: bool) -> tuple:
+    """
+    Add the attributes of a payload definition to a field table.
+
+    :param dict pdict: payload definition
+    :param int offset: payload offset of the first attribute
+    :param OrderedDict fields: field table to add the attributes to
+    :param list slots: list of struct slots to add the attributes to (None if no struct format is possible)
+    :param bool parsebf: split bitfields into their flags Y/N
+    :return: tuple of (offset after the last attribute, struct format, repeating group tuple or None)
+    :rtype: tuple
+    :raises: ValueError (if the definition can't be described by a flat layout)
+    """
+
+    fmt = "<"
+    keys = list(pdict)
+    for n, key in enumerate(keys):
+        att = pdict[key]
+        if isinstance(att, tuple):
+            numr, attd = att
+            if numr in BITFIELDS:
+                if parsebf:
+                    code, conv = attfmt(numr, True)
+                    bfoffset = 0
+                    entries = []
+                    for bkey, batt in attd.items():
+                        bits = attsiz(batt)
+                        if bkey[0:8] != "reserved":  # reserved bits are never set
+                            fields[bkey] = (offset, numr, 1, bfoffset, bits, "<" + code, conv)
+                            entries.append((bkey, 1, bfoffset, bits))
+                        bfoffset += bits
+                else:
+                    code, conv = attfmt(numr)
+                    fields[key] = (offset, numr, 1, 0, 0, "<" + code, conv)
+                    entries = [(key, 1, 0, 0)]
+                fmt += code
+                slots.append((conv, tuple(entries)))
+                offset += attsiz(numr)
+            else:  # repeating group, only supported as last attribute
+                if n != len(keys) - 1:
+                    raise ValueError("Repeating group {} is not the last attribute".format(key))
+                return offset, fmt, att
+        else:
+            scale = 1
+            if isinstance(att, list):
+                att, scale = att
+            if att == ubt.CH:  # variable length string takes the rest of the payload
+                fields[key] = (offset, att, 1, 0, 0, None, CONV_NONE)
+                fmt = None
+                continue
+            code, conv = attfmt(att)
+            fields[key] = (offset, att, scale, 0, 0, "<" + code, conv)
+            if fmt is not None:
+                fmt += code
+            slots.append((conv, ((key, scale, 0, 0),)))
+            offset += attsiz(att)
+    return offset, fmt, None
+
+
+def compile_layout(pdict: dict, parsebf: bool = True) -> tuple:
+    """
+    Compile a payload definition into a flat layout.
+
+    :param dict pdict: payload definition from ubxtypes_get/set/poll
+    :param bool parsebf: split bitfields into their flags Y/N
+    :return: layout tuple of (fields, group, fmt, slots) or None if the definition has nested repeating groups
+    :rtype: tuple
+    """
+
+    try:
+        fields = OrderedDict()
+        slots = []
+        offset, fmt, group = _compile_fields(pdict, 0, fields, slots, parsebf)
+        if group is not None:
+            numr, attd = group
+            gfields = OrderedDict()
+            gslots = []
+            size, gfmt, nested = _compile_fields(attd, 0, gfields, gslots, parsebf)
+            if nested is not None:
+                return None
+            group = (offset, numr, size, gfields, gfmt, tuple(gslots))
+        return fields, group, fmt, tuple(slots)
+    except ValueError:
+        return None
+
+
+def get_layout(pdict: dict, parsebf: bool = True) -> tuple:
+    """
+    Get the (cached) layout of a payload definition.
+
+    :param dict pdict: payload definition from ubxtypes_get/set/poll
+    :param bool parsebf: split bitfields into their flags Y/N
+    :return: layout tuple of (fields, group, fmt, slots) or None if not supported
+    :rtype: tuple
+    """
+
+    key = (id(pdict), parsebf)
+    if key not in _LAYOUTS:
+        _LAYOUTS[key] = compile_layout(pdict, parsebf)
+    return _LAYOUTS[key]
+
+
+def unpack_slots(fmt: str, slots: tuple, payload, offset: int, scaling: bool, suffix: str, setter):
+    """
+    Unpack attributes with a single struct call and pass them to a setter.
+
+    :param str fmt: struct format of the attributes
+    :param tuple slots: slots from the layout
+    :param bytes payload: raw payload
+    :param int offset: payload offset of the first attribute
+    :param bool scaling: apply scale factors Y/N
+    :param str suffix: repeating group suffix appended to the names e.g. '_01'
+    :param setter: function called with (name, value) for every attribute
+    """
+
+    vals = struct.unpack_from(fmt, payload, offset)
+    for k, (conv, entries) in enumerate(slots):
+        raw = vals[k]
+        if conv:
+            raw = convert(raw, conv)
+        for name, scale, bitoffset, bitsize in entries:
+            if bitsize:
+                val = (raw >> bitoffset) & ((1 << bitsize) - 1)
+            elif scale != 1 and scaling:
+                val = round(raw * scale, ubt.SCALROUND)
+            else:
+                val = raw
+            setter(name + suffix, val)
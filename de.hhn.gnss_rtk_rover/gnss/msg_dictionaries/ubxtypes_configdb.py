@@ -17,7 +17,10 @@ Based on:
 # pylint: disable=too-many-lines
 
 from gnss.msg_dictionaries.ubxtypes_core import (
+    E1,
     L,
+    U1,
+    U2,
     U4,
 )
 
@@ -55,6 +58,25 @@ UBX_CONFIG_STORSIZE = {
 # PLEASE KEEP DICT SORTED BY KEY NAME
 #
 UBX_CONFIG_DATABASE = {
+    "CFG_MSGOUT_NMEA_ID_DTM_UART1": (0x209100A7, U1),
+    "CFG_MSGOUT_NMEA_ID_GBS_UART1": (0x209100DE, U1),
+    "CFG_MSGOUT_NMEA_ID_GGA_UART1": (0x209100BB, U1),
+    "CFG_MSGOUT_NMEA_ID_GLL_UART1": (0x209100CA, U1),
+    "CFG_MSGOUT_NMEA_ID_GNS_UART1": (0x209100B6, U1),
+    "CFG_MSGOUT_NMEA_ID_GRS_UART1": (0x209100CF, U1),
+    "CFG_MSGOUT_NMEA_ID_GSA_UART1": (0x209100C0, U1),
+    "CFG_MSGOUT_NMEA_ID_GST_UART1": (0x209100D4, U1),
+    "CFG_MSGOUT_NMEA_ID_GSV_UART1": (0x209100C5, U1),
+    "CFG_MSGOUT_NMEA_ID_RMC_UART1": (0x209100AC, U1),
+    "CFG_MSGOUT_NMEA_ID_VLW_UART1": (0x209100E8, U1),
+    "CFG_MSGOUT_NMEA_ID_VTG_UART1": (0x209100B1, U1),
+    "CFG_MSGOUT_NMEA_ID_ZDA_UART1": (0x209100D9, U1),
+    "CFG_MSGOUT_UBX_NAV_HPPOSLLH_UART1": (0x20910034, U1),
+    "CFG_MSGOUT_UBX_NAV_PVT_UART1": (0x20910007, U1),
+    "CFG_MSGOUT_UBX_NAV_SAT_UART1": (0x20910016, U1),
+    "CFG_RATE_MEAS": (0x30210001, U2),
+    "CFG_RATE_NAV": (0x30210002, U2),
+    "CFG_RATE_TIMEREF": (0x20210003, E1),
     "CFG_SIGNAL_BDS_ENA": (0x10310022, L),
     "CFG_SIGNAL_GAL_ENA": (0x10310021, L),
     "CFG_SIGNAL_GLO_ENA": (0x10310025, L),
@@ -63,5 +85,6 @@ UBX_CONFIG_DATABASE = {
     "CFG_SIGNAL_QZSS_ENA": (0x10310024, L),
     "CFG_SIGNAL_SBAS_ENA": (0x10310020, L),
     "CFG-NMEA-HIGHPREC": (0x10930006, L),
+    "CFG_UART1_BAUDRATE": (0x40520001, U4),
     "CFG_UART2_BAUDRATE": (0x40530001, U4),
 }
@@ -137,6 +137,7 @@ UBX_MSGIDS = {
     b"\x06\x8a": "CFG-VALSET",
 
     # Navigation messages
+    b"\x01\x14": "NAV-HPPOSLLH",
     b"\x01\x07": "NAV-PVT",
     b"\x01\x35": "NAV-SAT",
     b"\x01\x43": "NAV-SIG",
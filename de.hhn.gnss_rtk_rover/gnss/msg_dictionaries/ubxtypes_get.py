@@ -30,6 +30,7 @@ from gnss.msg_dictionaries.ubxtypes_core import (
     X1,
     X2,
     X4,
+    SCAL9,
     SCAL7,
     SCAL5,
     SCAL2,
@@ -173,6 +174,27 @@ UBX_PAYLOADS_GET = OrderedDict({
     # private standard and high precision attributes are
     # combined into a single public attribute in
     # accordance with interface specification
+    "NAV-HPPOSLLH": OrderedDict({
+        "version": U1,
+        "reserved0": U2,
+        "flags": (
+            X1,
+            OrderedDict({
+                "invalidLlh": U1,
+            }),
+        ),
+        "iTOW": U4,
+        "lon": [I4, SCAL7],
+        "lat": [I4, SCAL7],
+        "height": I4,
+        "hMSL": I4,
+        "lonHp": [I1, SCAL9],
+        "latHp": [I1, SCAL9],
+        "heightHp": [I1, SCAL1],
+        "hMSLHp": [I1, SCAL1],
+        "hAcc": [U4, SCAL1],
+        "vAcc": [U4, SCAL1],
+    }),
     "NAV-PVT": OrderedDict({
         "iTOW": U4,
         "year": U2,
@@ -24,6 +24,7 @@ UBX_PAYLOADS_POLL = {
         "position": U2,
         "group": ("None", {"keys": U4}),  # repeating group
     }),
+    "NAV-HPPOSLLH": {},
     "NAV-PVT": {},
     "NAV-SAT": {},
     "NAV-SIG": {},
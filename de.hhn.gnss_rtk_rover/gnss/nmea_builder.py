@@ -0,0 +1,91 @@
+"""
+Build NMEA sentences from the numeric position records.
+
+Used in the UBX ingest mode, where the receiver doesn't output NMEA-GGA,
+to create the GGA sentence for the NTRIP caster on demand.
+All conversions use integer arithmetic. Apart from deg7, which exceeds the
+small int range of MicroPython (2^30 - 1) for longitudes beyond +-107.37
+degrees and then arrives as big int, the values stay small ints.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+from gnss.message_types import PositionData
+
+
+def _fmt_dm(deg7: int, deghp: int, degdigits: int) -> str:
+    """
+    Format degrees as NMEA (d)ddmm.mmmmmmm.
+    :param int deg7: absolute degrees * 1e7
+    :param int deghp: high precision part in 1e-9 degrees (-99..99)
+    :param int degdigits: 2 for latitude, 3 for longitude
+    :return: degrees and decimal minutes with 7 decimals e.g. '5037.7604409'
+    :rtype: str
+    """
+    deg, frac7 = divmod(deg7, 10000000)
+    min7 = frac7 * 60 + (deghp * 60 + 50) // 100  # minutes * 1e7, rounded
+    if min7 >= 600000000:  # rounding of the high precision part
+        deg += 1
+        min7 -= 600000000
+    elif min7 < 0:
+        deg -= 1
+        min7 += 600000000
+    mins, minfrac = divmod(min7, 10000000)
+    if degdigits == 2:
+        return "%02d%02d.%07d" % (deg, mins, minfrac)
+    return "%03d%02d.%07d" % (deg, mins, minfrac)
+
+
+def _fmt_meters(val: int) -> str:
+    """
+    :param int val: height in 0.1 mm
+    :return: height in meters with 4 decimals e.g. '-12.0042'
+    :rtype: str
+    """
+    sign = ""
+    if val < 0:
+        sign = "-"
+        val = -val
+    return "%s%d.%04d" % (sign, val // 10000, val % 10000)
+
+
+def gga_sentence(pos: PositionData, numsv: int = 0, sep: int = None) -> bytes:
+    """
+    Build a NMEA GGA sentence (talker GN) from a position record.
+
+    :param PositionData pos: the position, lat/lon in 1e-7 + 1e-9 degrees, elev in 0.1 mm
+    :param int numsv: number of satellites used
+    :param int sep: geoid separation (ellipsoid - mean sea level) in 0.1 mm, None if unknown
+    :return: complete sentence including checksum and CRLF
+    :rtype: bytes
+    """
+    if pos.time is None:
+        time = ""
+    else:
+        hours, rest = divmod(pos.time, 3600000)
+        mins, rest = divmod(rest, 60000)
+        time = "%02d%02d%02d.%02d" % (hours, mins, rest // 1000, (rest % 1000) // 10)
+    if pos.lat is None or pos.lon is None:
+        lat = ns = lon = ew = ""
+    else:
+        ns = "N"
+        lat, lathp = pos.lat, pos.latHp
+        if lat < 0 or (lat == 0 and lathp < 0):
+            ns = "S"
+            lat, lathp = -lat, -lathp
+        ew = "E"
+        lon, lonhp = pos.lon, pos.lonHp
+        if lon < 0 or (lon == 0 and lonhp < 0):
+            ew = "W"
+            lon, lonhp = -lon, -lonhp
+        lat = _fmt_dm(lat, lathp, 2)
+        lon = _fmt_dm(lon, lonhp, 3)
+    alt = "" if pos.elev is None else _fmt_meters(pos.elev)
+    sepstr = "" if sep is None else _fmt_meters(sep)
+    body = "GNGGA,%s,%s,%s,%s,%s,%d,%02d,,%s,M,%s,M,," % (
+        time, lat, ns, lon, ew, pos.fixType, numsv, alt, sepstr
+    )
+    cksum = 0
+    for char in body:
+        cksum ^= ord(char)
+    return ("$%s*%02X\r\n" % (body, cksum)).encode()
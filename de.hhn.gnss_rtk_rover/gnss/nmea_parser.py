@@ -0,0 +1,386 @@
+"""
+NMEAParser class.
+
+Single pass parser for the NMEA sentences used by the rover (GGA, RMC, GST).
+TXT sentences are only recognized by sentence_type().
+The sentence is scanned once: the field boundaries are recorded in
+preallocated arrays and the XOR checksum is calculated on the way.
+Fields are converted on request directly from the sentence bytes, so
+numeric fields can be read without creating intermediate strings or lists.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+from array import array
+
+# sentence types
+NMEA_OTHER = 0
+NMEA_GGA = 1
+NMEA_RMC = 2
+NMEA_GST = 3
+NMEA_TXT = 4
+
+# GGA field indices
+GGA_TIME = 1
+GGA_LAT = 2
+GGA_NS = 3
+GGA_LON = 4
+GGA_EW = 5
+GGA_QUALITY = 6
+GGA_NUMSV = 7
+GGA_HDOP = 8
+GGA_ALT = 9
+GGA_SEP = 11
+GGA_DIFFAGE = 13
+GGA_DIFFSTATION = 14
+
+# RMC field indices
+RMC_TIME = 1
+RMC_STATUS = 2
+RMC_LAT = 3
+RMC_NS = 4
+RMC_LON = 5
+RMC_EW = 6
+RMC_SPD = 7
+RMC_COG = 8
+RMC_DATE = 9
+
+# GST field indices
+GST_TIME = 1
+GST_RANGERMS = 2
+GST_STDMAJOR = 3
+GST_STDMINOR = 4
+GST_ORIENT = 5
+GST_STDLAT = 6
+GST_STDLONG = 7
+GST_STDALT = 8
+
+MAXFIELDS = 24
+
+_COMMA = 0x2C
+_STAR = 0x2A
+_DOT = 0x2E
+_MINUS = 0x2D
+
+
+def hexval(char: int) -> int:
+    """
+    Convert an ASCII hex digit to its value.
+
+    :param int char: ASCII code e.g. 0x41 ('A')
+    :return: value of the digit or -1 if not a hex digit
+    :rtype: int
+    """
+    if 0x30 <= char <= 0x39:
+        return char - 0x30
+    if 0x41 <= char <= 0x46:
+        return char - 0x37
+    if 0x61 <= char <= 0x66:
+        return char - 0x57
+    return -1
+
+
+def sentence_type(sentence) -> int:
+    """
+    Get the type of a NMEA sentence from its header bytes, e.g. $GNGGA -> NMEA_GGA.
+
+    :param sentence: NMEA sentence as bytes, bytearray or memoryview
+    :return: sentence type (NMEA_GGA, NMEA_RMC, NMEA_GST, NMEA_TXT or NMEA_OTHER)
+    :rtype: int
+    """
+
+    if len(sentence) < 7 or sentence[6] != _COMMA:
+        return NMEA_OTHER
+    char3 = sentence[3]
+    char4 = sentence[4]
+    char5 = sentence[5]
+    if char3 == 0x47 and char4 == 0x47 and char5 == 0x41:  # 'GGA'
+        return NMEA_GGA
+    if char3 == 0x52 and char4 == 0x4D and char5 == 0x43:  # 'RMC'
+        return NMEA_RMC
+    if char3 == 0x47 and char4 == 0x53 and char5 == 0x54:  # 'GST'
+        return NMEA_GST
+    if char3 == 0x54 and char4 == 0x58 and char5 == 0x54:  # 'TXT'
+        return NMEA_TXT
+    return NMEA_OTHER
+
+
+def _scan_py(sentence, end: int, starts: array, ends: array) -> int:
+    """
+    Pure Python scan of a sentence for field boundaries and checksum.
+    :return: index of '*' | checksum << 16 | index of the last field << 24
+    :rtype: int
+    """
+
+    cksum = 0
+    count = 0
+    starts[0] = 1
+    j = 1
+    while j < end:
+        char = sentence[j]
+        if char == _STAR:
+            break
+        cksum ^= char
+        if char == _COMMA:
+            if count + 1 >= MAXFIELDS:
+                break
+            ends[count] = j
+            count += 1
+            starts[count] = j + 1
+        j += 1
+    ends[count] = j
+    return j | (cksum << 16) | (count << 24)
+
+
+try:
+    import micropython
+
+    @micropython.viper
+    def _scan_viper(sentence, end: int, starts, ends) -> int:
+        """
+        Scan a sentence for field boundaries and checksum (viper code emitter).
+        """
+
+        buf = ptr8(sentence)  # noqa: F821 viper builtin
+        fstart = ptr16(starts)  # noqa: F821 viper builtin
+        fend = ptr16(ends)  # noqa: F821 viper builtin
+        cksum = 0
+        count = 0
+        fstart[0] = 1
+        j = 1
+        while j < end:
+            char = buf[j]
+            if char == 0x2A:  # '*'
+                break
+            cksum ^= char
+            if char == 0x2C:  # ','
+                if count + 1 >= 24:  # MAXFIELDS
+                    break
+                fend[count] = j
+                count += 1
+                fstart[count] = j + 1
+            j += 1
+        fend[count] = j
+        return j | (cksum << 16) | (count << 24)
+
+    _scan = _scan_viper
+except (ImportError, AttributeError, RuntimeError):  # no viper emitter e.g. CPython
+    _scan = _scan_py
+
+
+class NMEAParser:
+    """
+    NMEAParser class.
+    """
+
+    def __init__(self):
+        """Constructor."""
+
+        self._sentence = None
+        self._starts = array("H", [0] * MAXFIELDS)
+        self._ends = array("H", [0] * MAXFIELDS)
+        self._count = 0
+        self.msgtype = NMEA_OTHER
+
+    def parse(self, sentence, validate: bool = True) -> int:
+        """
+        Scan a complete NMEA sentence and record its fields.
+        The sentence must stay unchanged as long as its fields are read.
+
+        :param sentence: sentence incl. '$' and checksum as bytes, bytearray or memoryview
+        :param bool validate: validate the checksum Y/N
+        :return: sentence type, NMEA_OTHER if the sentence is not supported or invalid
+        :rtype: int
+        """
+
+        self._count = 0
+        self.msgtype = sentence_type(sentence)
+        if self.msgtype == NMEA_OTHER:
+            return NMEA_OTHER
+        self._sentence = sentence
+        end = len(sentence)
+        res = _scan(sentence, end, self._starts, self._ends)
+        j = res & 0xFFFF
+        cksum = (res >> 16) & 0xFF
+        count = res >> 24
+        if j + 2 >= end or sentence[j] != _STAR:  # no checksum
+            self.msgtype = NMEA_OTHER
+            return NMEA_OTHER
+        self._count = count + 1
+        if validate and cksum != (hexval(sentence[j + 1]) << 4) | hexval(sentence[j + 2]):
+            self._count = 0
+            self.msgtype = NMEA_OTHER
+        return self.msgtype
+
+    def field_count(self) -> int:
+        """
+        Number of fields of the last parsed sentence, the address field included.
+        :return: number of fields
+        :rtype: int
+        """
+        return self._count
+
+    def is_empty(self, n: int) -> bool:
+        """
+        :param int n: field index, 0 is the address field e.g. GNGGA
+        :return: True if the field is empty or doesn't exist
+        :rtype: bool
+        """
+        return n >= self._count or self._starts[n] == self._ends[n]
+
+    def field_bytes(self, n: int) -> bytes:
+        """
+        :param int n: field index, 0 is the address field e.g. GNGGA
+        :return: field content, b"" if the field doesn't exist
+        :rtype: bytes
+        """
+        if n >= self._count:
+            return b""
+        return bytes(self._sentence[self._starts[n]: self._ends[n]])
+
+    def field_str(self, n: int) -> str:
+        """
+        :param int n: field index, 0 is the address field e.g. GNGGA
+        :return: field content, "" if the field doesn't exist
+        :rtype: str
+        """
+        return self.field_bytes(n).decode()
+
+    def field_int(self, n: int, default: int = 0) -> int:
+        """
+        Convert an integer field without creating a string.
+        :param int n: field index
+        :param int default: value of empty fields
+        :return: field value
+        :rtype: int
+        """
+        return self.field_scaled(n, 0, default)
+
+    def field_scaled(self, n: int, decimals: int, default: int = 0) -> int:
+        """
+        Convert a decimal field to an integer scaled by 10 ** decimals without
+        creating a string, e.g. "5037.7604409" with 4 decimals -> 50377604.
+        Surplus decimals are truncated.
+        :param int n: field index
+        :param int decimals: number of decimals to keep
+        :param int default: value of empty or malformed fields
+        :return: field value * 10 ** decimals
+        :rtype: int
+        """
+        if self.is_empty(n):
+            return default
+        sentence = self._sentence
+        j = self._starts[n]
+        end = self._ends[n]
+        sign = 1
+        if sentence[j] == _MINUS:
+            sign = -1
+            j += 1
+        val = 0
+        frac = -1  # number of decimals read, -1 before the decimal point
+        while j < end:
+            char = sentence[j]
+            if char == _DOT:
+                if frac >= 0:
+                    return default
+                frac = 0
+            elif 0x30 <= char <= 0x39:
+                if frac < decimals:
+                    val = val * 10 + char - 0x30
+                    if frac >= 0:
+                        frac += 1
+            else:
+                return default
+            j += 1
+        if frac < 0:
+            frac = 0
+        while frac < decimals:
+            val *= 10
+            frac += 1
+        return sign * val
+
+    def field_byte(self, n: int) -> int:
+        """
+        :param int n: field index
+        :return: first byte of the field e.g. 0x4E ('N'), 0 if the field is empty
+        :rtype: int
+        """
+        if self.is_empty(n):
+            return 0
+        return self._sentence[self._starts[n]]
+
+    def field_time(self, n: int, default: int = -1) -> int:
+        """
+        Convert a hhmmss.ss time field to milliseconds of the day.
+        :param int n: field index
+        :param int default: value of empty or malformed fields
+        :return: milliseconds since midnight
+        :rtype: int
+        """
+        hms = self.field_scaled(n, 3, -1)
+        if hms < 0:
+            return default
+        return (hms // 10000000) * 3600000 + ((hms // 100000) % 100) * 60000 + hms % 100000
+
+    def field_degrees(self, n: int, hemisphere: int) -> tuple:
+        """
+        Convert a (d)ddmm.mmmmmmm latitude / longitude field to degrees as a
+        pair of integers, in the representation of UBX NAV-HPPOSLLH:
+        degrees = deg7 * 1e-7 + degHp * 1e-9.
+        The intermediate values stay within the small int range of MicroPython
+        (2^30 - 1), deg7 itself doesn't for longitudes beyond +-107.37 degrees
+        and is then allocated as big int, like the int32 of NAV-HPPOSLLH.
+        :param int n: field index
+        :param int hemisphere: index of the N/S or E/W field
+        :return: tuple of (deg7, degHp) or None if the field is empty or malformed
+        :rtype: tuple
+        """
+        if self.is_empty(n):
+            return None
+        sentence = self._sentence
+        j = self._starts[n]
+        end = self._ends[n]
+        whole = 0  # dddmm
+        while j < end and sentence[j] != _DOT:
+            char = sentence[j] - 0x30
+            if not 0 <= char <= 9:
+                return None
+            whole = whole * 10 + char
+            j += 1
+        frac = 0  # decimal minutes * 1e7
+        digits = 0
+        j += 1
+        while j < end and digits < 7:
+            char = sentence[j] - 0x30
+            if not 0 <= char <= 9:
+                return None
+            frac = frac * 10 + char
+            digits += 1
+            j += 1
+        while digits < 7:
+            frac *= 10
+            digits += 1
+        deg, minutes = divmod(whole, 100)
+        minutes = minutes * 10000000 + frac
+        # minutes / 60 in units of 1e-9 degrees (< 1e9), without leaving the small int range
+        quot, rem = divmod(minutes, 3)
+        nano = quot * 5 + (rem * 5) // 3
+        deg7 = deg * 10000000 + nano // 100
+        deghp = nano % 100
+        if self.field_byte(hemisphere) in (0x53, 0x57):  # 'S', 'W'
+            return -deg7, -deghp
+        return deg7, deghp
+
+    def field_float(self, n: int, default: float = 0.0) -> float:
+        """
+        :param int n: field index
+        :param float default: value of empty or malformed fields
+        :return: field value
+        :rtype: float
+        """
+        if self.is_empty(n):
+            return default
+        try:
+            return float(self.field_str(n))
+        except ValueError:
+            return default
@@ -0,0 +1,211 @@
+"""
+RTCMFilter class.
+
+Decides by the 12 bit message number whether an RTCM3 frame from the NTRIP
+caster is forwarded to the receiver on UART2: allow / deny list, minimum
+interval per message type and the constellations enabled in the receiver.
+Counts forwarded and dropped bytes to report the UART2 utilisation.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import utime
+from utils.globals import BAUD_UART2
+
+# MSM1..MSM7 message number ranges and their constellation
+_MSM_RANGES = (
+    (1071, 1077, "GPS"),
+    (1081, 1087, "GLO"),
+    (1091, 1097, "GAL"),
+    (1101, 1107, "SBAS"),
+    (1111, 1117, "QZSS"),
+    (1121, 1127, "BDS"),
+)
+# ephemerides and biases and their constellation
+_CONSTELLATION = {
+    1019: "GPS",
+    1020: "GLO",
+    1042: "BDS",
+    1044: "QZSS",
+    1045: "GAL",
+    1046: "GAL",
+    1230: "GLO",  # GLONASS code-phase biases
+}
+
+_DROP = 0
+_PASS = 1
+_TIMED = 2  # pass if the minimum interval elapsed
+
+
+def constellation(num: int) -> str:
+    """
+    :param int num: RTCM3 message number
+    :return: constellation of the message e.g. 'GPS', None if not constellation specific
+    :rtype: str
+    """
+    for (first, last, gnss) in _MSM_RANGES:
+        if first <= num <= last:
+            return gnss
+    return _CONSTELLATION.get(num)
+
+
+class RTCMFilter:
+    """
+    RTCMFilter class.
+    """
+
+    _allow = None  # set of message numbers to forward, None = all
+    _deny = None  # set of message numbers to drop
+    _intervals = None  # message number -> minimum interval in ms
+    _disabled = None  # set of constellations disabled in the receiver
+    _decisions = None  # message number -> _DROP / _PASS / _TIMED, cleared on changes
+    _last = None  # message number -> ticks_ms when it was last forwarded
+
+    _baud = None
+    _passed = None  # forwarded frames
+    _dropped = None  # dropped frames
+    _bytes = None  # forwarded bytes
+    _saved = None  # dropped bytes
+    _window_start = None  # ticks_ms of the last get_stats() call
+    _window_bytes = None  # forwarded bytes since the last get_stats() call
+
+    @classmethod
+    def initialize(cls,
+                   allow: list = None,
+                   deny: list = None,
+                   intervals: dict = None,
+                   baud: int = BAUD_UART2):
+        """Initialization method.
+
+        :param list allow: message numbers to forward, None = all
+        :param list deny: message numbers to drop
+        :param dict intervals: message number -> minimum interval in ms
+        :param int baud: baudrate of UART2 for the utilisation
+        """
+        cls._disabled = set()
+        cls._last = {}
+        cls._baud = baud
+        cls._passed = 0
+        cls._dropped = 0
+        cls._bytes = 0
+        cls._saved = 0
+        cls._window_start = utime.ticks_ms()
+        cls._window_bytes = 0
+        cls.set_filter(allow, deny, intervals)
+
+    @classmethod
+    def set_filter(cls, allow: list = None, deny: list = None, intervals: dict = None):
+        """
+        Replace the allow / deny lists and the minimum intervals.
+
+        :param list allow: message numbers to forward, None = all
+        :param list deny: message numbers to drop
+        :param dict intervals: message number -> minimum interval in ms
+        """
+        cls._allow = None if allow is None else set(int(num) for num in allow)
+        cls._deny = set(int(num) for num in deny or ())
+        cls._intervals = {int(num): int(ms) for (num, ms) in (intervals or {}).items()}
+        cls._decisions = {}
+
+    @classmethod
+    def get_filter(cls) -> dict:
+        """
+        :return: the filter settings {"allow": [...] or None, "deny": [...], "intervals": {...}, "disabled": [...]}
+        :rtype: dict
+        """
+        return {
+            "allow": None if cls._allow is None else sorted(cls._allow),
+            "deny": sorted(cls._deny),
+            "intervals": {str(num): ms for (num, ms) in cls._intervals.items()},
+            "disabled": sorted(cls._disabled),
+        }
+
+    @classmethod
+    def set_constellations(cls, signals: dict):
+        """
+        Drop the corrections of constellations the receiver doesn't use.
+
+        :param dict signals: constellation -> enabled e.g. {"GPS": 1, "GLO": 0}, missing ones are unchanged
+        """
+        disabled = set(cls._disabled or ())
+        for (gnss, enable) in signals.items():
+            if enable:
+                disabled.discard(gnss)
+            else:
+                disabled.add(gnss)
+        if disabled != cls._disabled:
+            cls._disabled = disabled
+            cls._decisions = {}
+
+    @classmethod
+    def _decide(cls, num: int) -> int:
+        """
+        :param int num: RTCM3 message number
+        :return: _DROP, _PASS or _TIMED
+        :rtype: int
+        """
+        if num in cls._deny or (cls._allow is not None and num not in cls._allow):
+            return _DROP
+        if constellation(num) in cls._disabled:
+            return _DROP
+        if num in cls._intervals:
+            return _TIMED
+        return _PASS
+
+    @classmethod
+    def keep(cls, num: int, length: int, now: int) -> bool:
+        """
+        Decide whether a frame is forwarded and count it.
+
+        :param int num: RTCM3 message number
+        :param int length: frame length in bytes
+        :param int now: utime.ticks_ms() of the received chunk
+        :return: True if the frame is forwarded
+        :rtype: bool
+        """
+        decision = cls._decisions.get(num)
+        if decision is None:
+            decision = cls._decisions[num] = cls._decide(num)
+        if decision == _TIMED:
+            last = cls._last.get(num)
+            if last is None or utime.ticks_diff(now, last) >= cls._intervals[num]:
+                cls._last[num] = now
+                decision = _PASS
+        if decision == _PASS:
+            cls._passed += 1
+            cls._bytes += length
+            cls._window_bytes += length
+            return True
+        cls._dropped += 1
+        cls._saved += length
+        return False
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """
+        Get the counters, the UART2 utilisation is measured since the previous call.
+        e.g.:
+        {
+            "passed": 1200,
+            "dropped": 310,
+            "bytes": 498000,
+            "saved": 61000,
+            "uart2Util": 41  # percent of the UART2 capacity
+        }
+        :return: dictionary with the counters
+        :rtype: dict
+        """
+        now = utime.ticks_ms()
+        elapsed = utime.ticks_diff(now, cls._window_start)
+        util = 0
+        if elapsed > 0:  # 10 bits per byte (start, 8 data, stop), in percent
+            util = (cls._window_bytes * 1000 // elapsed) * 1000 // cls._baud
+        cls._window_start = now
+        cls._window_bytes = 0
+        return {
+            "passed": cls._passed,
+            "dropped": cls._dropped,
+            "bytes": cls._bytes,
+            "saved": cls._saved,
+            "uart2Util": util,
+        }
@@ -1,7 +1,10 @@
 """
 RTCM Reader class.
 
-Reads incoming RTCM Data from a Socket and writes it to a given Serial
+Reads incoming RTCM Data from a Socket and writes it to a given Serial.
+forward() validates the frames in place in the receive buffer and writes
+each run of consecutive valid frames with one write, followed by a single
+drain per received chunk.
 
 Created on 4 Sep 2022
 :author: vdueck
@@ -13,8 +16,10 @@ Based on:
 """
 
 import uasyncio
+import utime
 import gnss.msg_dictionaries.ubxtypes_core as ubt
 import gnss.msg_dictionaries.exceptions as ube
+from serial_communication.stream_framer import StreamFramer
 
 
 class RTCMReader:
@@ -26,6 +31,8 @@ class RTCMReader:
         """Constructor.
 
         :param datastream stream: input data stream from ntrip-caster
+        :param int bufsize: (kwarg) size of the receive buffer
+        :param RTCMFilter msgfilter: (kwarg) decides which RTCM3 messages are forwarded, None = all
         :raises: RTCMStreamError (if mode is invalid)
 
         """
@@ -40,107 +47,149 @@ class RTCMReader:
         self._scaling = int(kwargs.get("scaling", True))
         self._labelmsm = int(kwargs.get("labelmsm", True))
         self._msgmode = int(kwargs.get("msgmode", 0))
+        self._framer = StreamFramer(int(kwargs.get("bufsize", 4096)))
+        self._msgfilter = kwargs.get("msgfilter", None)
+        self._received = 0  # valid RTCM3 frames received, before the message filter
+        self._frames = 0  # forwarded frames
+        self._bytes = 0  # forwarded bytes
+        self._other = 0  # frames of other protocols dropped
 
         if self._msgmode not in (0, 1, 2):
             raise ube.UBXStreamError(
                 f"Invalid stream mode {self._msgmode} - must be 0, 1 or 2"
             )
 
-    def __iter__(self):
-        """Iterator."""
+    def __aiter__(self):
+        """Asynchronous iterator."""
 
         return self
 
-    def __next__(self) -> bytes:
+    async def __anext__(self) -> bytes:
         """
-        Return next item in iteration.
+        ASYNC: Return next item in iteration.
 
         :return: raw rtcm data
         :rtype: bytes
-        :raises: StopIteration
+        :raises: StopAsyncIteration
 
         """
 
         raw_data = await self.read()
         if raw_data is not None:
             return raw_data
-        raise StopIteration
+        raise StopAsyncIteration
 
     async def read(self) -> bytes:
         """
-        Reads RTCM3 messages from StremReader
+        ASYNC: Reads the next valid RTCM3 message from the StreamReader
 
-        'protfilter' determines which protocols are parsed.
-        'quitonerror' determines whether to raise, log or ignore parsing errors.
+        'quitonerror' determines whether to raise, log or ignore frames of other protocols.
 
-        :return: raw rtcm rata
+        :return: raw rtcm data or None on EOF
         :rtype: bytes
         :raises: UBXStreamError (if unrecognised protocol in data stream)
         """
 
-        parsing = True
+        while True:
+            frame = self._framer.next_frame()
+            if frame is None:
+                if await self._framer.fill(self._stream) == 0:  # EOF
+                    return None
+                continue
+            protocol, raw = frame
+            if protocol == ubt.RTCM3_PROTOCOL:
+                return bytes(raw)
+            # unexpected protocol in correction stream
+            if self._quitonerror == ubt.ERR_RAISE:
+                raise ube.UBXStreamError("Unknown protocol {}.".format(bytes(raw[0:2])))
+            if self._quitonerror == ubt.ERR_LOG:
+                return bytes(raw[0:2])
+
+    async def forward(self, output: uasyncio.StreamWriter) -> int:
+        """
+        ASYNC: Read the next chunk of the stream and forward all complete RTCM3 frames in it.
 
-        try:
-            while parsing:  # loop until end of valid message or EOF
-                raw_data = None
-                byte1 = await self._read_bytes(1)  # read the first byte
-                # if not UBX, NMEA or RTCM3, discard and continue
-                if byte1 not in (b"\xb5", b"\x24", b"\xd3"):
-                    continue
-                byte2 = await self._read_bytes(1)
-                bytehdr = byte1 + byte2
-                if byte1 == b"\xd3" and (byte2[0] & ~0x03) == 0:
-                    raw_data = await self._read_rtcm3(bytehdr)
-                    # if protocol filter passes RTCM, return message,
-                    # otherwise discard and continue
-                    # if self._protfilter & ubt.RTCM3_PROTOCOL:
-                    parsing = False
-                    # else:
-                    #     continue
-                # unrecognised protocol header
-                else:
-                    if self._quitonerror == ubt.ERR_RAISE:
-                        raise ube.UBXStreamError("Unknown protocol {}.".format(bytehdr))
-                    if self._quitonerror == ubt.ERR_LOG:
-                        return bytehdr
-                    continue
+        Frames are written straight from the receive buffer. Consecutive frames
+        are written as one block, the output is drained once per chunk.
+        Frames of other protocols and RTCM3 messages rejected by the message
+        filter are dropped, incomplete frames stay buffered until the next call.
 
-        except EOFError:
-            return None
+        :param uasyncio.StreamWriter output: output stream for the RTCM3 frames
+        :return: number of bytes forwarded, -1 on EOF
+        :rtype: int
+        """
 
-        return raw_data
+        framer = self._framer
+        if await framer.fill(self._stream) == 0:  # EOF
+            return -1
+        buf = framer.buffer
+        msgfilter = self._msgfilter
+        now = utime.ticks_ms()
+        first = last = 0  # run of consecutive frames not written yet
+        sent = 0
+        while True:
+            protocol = framer.next_span()
+            if protocol == 0:
+                break
+            if protocol != ubt.RTCM3_PROTOCOL:
+                self._other += 1
+                continue
+            self._received += 1
+            start = framer.frame_start
+            end = framer.consumed
+            if msgfilter is not None:
+                # 12 bit message number at the start of the payload
+                num = (buf[start + 3] << 4) | (buf[start + 4] >> 4) if end - start > 7 else 0
+                if not msgfilter.keep(num, end - start, now):
+                    continue
+            if start != last:  # gap, write the previous run
+                if last > first:
+                    output.write(buf[first:last])
+                    sent += last - first
+                first = start
+            last = end
+            self._frames += 1
+        if last > first:
+            output.write(buf[first:last])
+            sent += last - first
+        if sent:
+            await output.drain()  # before the next fill() overwrites the buffer
+            self._bytes += sent
+        return sent
 
-    async def _read_rtcm3(self, hdr: bytes, **kwargs) -> bytes:
+    @property
+    def stats(self) -> dict:
         """
-        Parse any RTCM3 data in the stream (using pyrtcm library).
-
-        :param bytes hdr: first 2 bytes of RTCM3 header
-        :param bool validate: (kwarg) validate crc Y/N
-        :return: tuple of (raw_data as bytes, parsed_stub as RTCMMessage)
-        :rtype: tuple
+        Getter for the forwarding counters.
+        :return: dict with received and forwarded frames, forwarded bytes, corrupt frames and dropped frames of
+                 other protocols
+        :rtype: dict
         """
+        return {
+            "received": self._received,
+            "frames": self._frames,
+            "bytes": self._bytes,
+            "corrupt": self._framer.errors,
+            "other": self._other,
+        }
 
-        hdr3 = await self._read_bytes(1)
-        size = hdr3[0] | (hdr[1] << 8)
-        payload = await self._read_bytes(size)
-        crc = await self._read_bytes(3)
-        raw_data = hdr + hdr3 + payload + crc
-        return raw_data
-
-    async def _read_bytes(self, size: int) -> bytes:
+    @property
+    def received(self) -> int:
         """
-        Read a specified number of bytes from stream.
-
-        :param int size: number of bytes to read
-        :return: bytes
-        :rtype: bytes
-        :raises: EOFError if stream ends prematurely
+        Getter for the number of valid RTCM3 frames received so far, including the ones the message filter dropped.
+        :return: frame count
+        :rtype: int
         """
+        return self._received
 
-        data = await self._stream.read(size)
-        if len(data) < size:  # EOF
-            raise EOFError()
-        return data
+    @property
+    def errors(self) -> int:
+        """
+        Getter for the number of corrupted frames (bad length or crc) skipped so far.
+        :return: error count
+        :rtype: int
+        """
+        return self._framer.errors
 
     @property
     def datastream(self) -> object:
@@ -11,6 +11,7 @@ Based on:
 """
 
 import gc
+import struct
 from collections import OrderedDict
 gc.collect()
 import gnss.msg_dictionaries.exceptions as ube
@@ -18,9 +19,11 @@ import gnss.msg_dictionaries.ubxtypes_core as ubt
 import gnss.msg_dictionaries.ubxtypes_get as ubg
 import gnss.msg_dictionaries.ubxtypes_set as ubs
 import gnss.msg_dictionaries.ubxtypes_poll as ubp
+import gnss.msg_dictionaries.ubxtypes_configdb as ubcdb
 gc.collect()
 from gnss.msg_dictionaries.ubxhelpers import (
     calc_checksum,
+    calc_fletcher8,
     attsiz,
     gnss2str,
     msgclass2bytes,
@@ -30,12 +33,17 @@ from gnss.msg_dictionaries.ubxhelpers import (
     nomval,
     cfgkey2name,
     cfgname2key,
+    att2idx,
+    att2name,
 )
+from gnss.msg_dictionaries.ubxlayouts import get_layout, convert, unpack_slots
 gc.collect()
 
 class UBXMessage:
     """UBX Message Class."""
 
+    _layout = None  # compiled payload layout, only set in lazy mode
+
     def __init__(self, ubxclass, ubxid, msgmode: int, **kwargs):
         """Constructor.
         If no keyword parms are passed, the payload is taken to be empty.
@@ -48,6 +56,8 @@ class UBXMessage:
         :param int msgmode: message mode (0=GET, 1=SET, 2=POLL)
         :param bool parsebitfield: (kwarg) parse bitfields ('X' type attributes) Y/N
         :param bool scaling: (kwarg) apply scale factors Y/N
+        :param bool lazy: (kwarg) keep the raw payload and decode attributes on access Y/N
+            (only applies if 'payload' is passed)
         :param kwargs: optional payload key/value pairs
         :raises: UBXMessageError
         """
@@ -60,6 +70,7 @@ class UBXMessage:
 
         self._parsebf = kwargs.get("parsebitfield", True)  # parsing bitfields Y/N?
         self._scaling = kwargs.get("scaling", True)  # apply scale factors Y/N?
+        lazy = kwargs.pop("lazy", False)  # decode attributes on access Y/N?
 
         if msgmode not in (0, 1, 2):
             raise ube.UBXMessageError(f"Invalid msgmode {msgmode} - must be 0, 1 or 2.")
@@ -75,10 +86,99 @@ class UBXMessage:
             self._ubxClass = ubxclass
             self._ubxID = ubxid
 
-        self._do_attributes(**kwargs)
+        if lazy and "payload" in kwargs:
+            self._do_layout(kwargs["payload"])
+        elif "payload" in kwargs:
+            self._do_unpack(kwargs["payload"])
+        else:
+            self._do_attributes(**kwargs)
 
         self._immutable = True  # once initialised, object is immutable
-        gc.collect()
+        if self._layout is None:
+            gc.collect()
+
+    def _do_layout(self, payload: bytes):
+        """
+        Keep the raw payload and the precompiled layout of its definition, so
+        attributes can be decoded on access instead of all at once.
+        Falls back to eager parsing if the payload definition has no flat layout
+        or the payload is shorter than the layout.
+        :param bytes payload: raw payload
+        :raises: UBXTypeError
+        """
+
+        self._payload = payload
+        self._layout = get_layout(self._get_dict(), self._parsebf)
+        if self._layout is None or not self._layout_fits():
+            self._layout = None
+            self._do_attributes(payload=payload)
+            return
+        self._do_len_checksum()
+
+    def _do_unpack(self, payload: bytes):
+        """
+        Populate UBXMessage from a raw payload using the precompiled struct
+        format of its definition, one struct.unpack_from() call for the fixed
+        part and one per repeating group item.
+        Falls back to parsing attribute by attribute if the payload definition
+        has no struct format or the payload is shorter than the definition.
+        :param bytes payload: raw payload
+        :raises: UBXTypeError
+        """
+
+        layout = get_layout(self._get_dict(), self._parsebf)
+        if layout is None or layout[2] is None or len(payload) < struct.calcsize(layout[2]):
+            self._do_attributes(payload=payload)
+            return
+        _, group, fmt, slots = layout
+        self._payload = payload
+        unpack_slots(fmt, slots, payload, 0, self._scaling, "", self._set_value)
+        if group is not None:
+            goffset, _, gsize, _, gfmt, gslots = group
+            if self._is_cfgvalget():
+                self._set_attribute_cfgval(goffset, payload=payload)
+            else:
+                rng = self._group_repeats(group)
+                if gfmt is None or goffset + rng * gsize > len(payload):
+                    self._do_attributes(payload=payload)  # truncated group, parse as before
+                    return
+                pmv = memoryview(payload)
+                for i in range(rng):
+                    unpack_slots(
+                        gfmt, gslots, pmv, goffset + i * gsize, self._scaling, f"_{i + 1:02d}", self._set_value
+                    )
+        self._do_len_checksum()
+
+    def _layout_fits(self) -> bool:
+        """
+        Check that the payload holds all attributes of the layout,
+        so every attribute can be decoded on access.
+        :return: True if the payload is long enough
+        :rtype: bool
+        """
+
+        fields, group, fmt, _ = self._layout
+        if fmt is not None:
+            size = struct.calcsize(fmt)
+        else:  # variable length string, check the attributes in front of it
+            size = 0
+            for offset, _, _, _, _, ffmt, _ in fields.values():
+                if ffmt is not None:
+                    size = max(size, offset + struct.calcsize(ffmt))
+        if len(self._payload) < size:
+            return False
+        if group is None or self._is_cfgvalget():
+            return True
+        goffset, _, gsize, _, _, _ = group
+        return goffset + self._group_repeats(group) * gsize <= len(self._payload)
+
+    def _set_value(self, name: str, val: object):
+        """
+        Set a decoded payload attribute.
+        :param str name: attribute name
+        :param object val: attribute value
+        """
+        setattr(self, name, val)
 
     def _do_attributes(self, **kwargs):
         """
@@ -386,9 +486,10 @@ class UBXMessage:
             self._checksum = calc_checksum(self._ubxClass + self._ubxID + self._length)
         else:
             self._length = val2bytes(len(self._payload), ubt.U2)
-            self._checksum = calc_checksum(
-                self._ubxClass + self._ubxID + self._length + self._payload
-            )
+            # checksum header and payload in two parts instead of concatenating them
+            ckv = calc_fletcher8(self._ubxClass + self._ubxID + self._length)
+            ckv = calc_fletcher8(self._payload, 0, -1, ckv)
+            self._checksum = bytes((ckv & 0xFF, ckv >> 8))
 
     def _get_dict(self) -> OrderedDict:
         """
@@ -445,6 +546,143 @@ class UBXMessage:
             lengroup += attsiz(val)
         return int(lenpayload / lengroup)
 
+    def __getattr__(self, name: str):
+        """
+        Decode payload attribute on access (lazy mode only).
+        :param str name: attribute name e.g. 'hAcc', 'svId_03' or 'CFG_SIGNAL_GPS_ENA'
+        :return: attribute value
+        :rtype: object
+        :raises: AttributeError
+        """
+
+        if self._layout is None or name[0:1] == "_":
+            raise AttributeError(name)
+        fields, group, _, _ = self._layout
+        if name in fields:
+            return self._decode_field(fields[name], 0)
+        if group is not None:
+            goffset, _, gsize, gfields, _, _ = group
+            if self._is_cfgvalget():
+                return self._decode_cfgval(goffset, name)
+            gname = att2name(name)
+            idx = att2idx(name)
+            if gname in gfields and 0 < idx <= self._group_repeats(group):
+                return self._decode_field(gfields[gname], goffset + (idx - 1) * gsize)
+        raise AttributeError(name)
+
+    def _decode_field(self, field: tuple, base: int) -> object:
+        """
+        Decode a single attribute from the raw payload.
+        :param tuple field: (offset, type, scale, bitoffset, bitsize, fmt, conv) from the layout
+        :param int base: offset of the repeating group item, 0 for plain attributes
+        :return: attribute value
+        :rtype: object
+        """
+
+        offset, att, scale, bitoffset, bitsize, fmt, conv = field
+        offset += base
+        if fmt is None:  # variable length string
+            return bytes2val(self._payload[offset:], att)
+        val = struct.unpack_from(fmt, self._payload, offset)[0]
+        if conv:
+            val = convert(val, conv)
+        if bitsize:  # flag inside a bitfield
+            return (val >> bitoffset) & ((1 << bitsize) - 1)
+        if scale != 1 and self._scaling:
+            val = round(val * scale, ubt.SCALROUND)
+        return val
+
+    def _decode_cfgval(self, offset: int, name: str) -> object:
+        """
+        Find and decode a single configuration value in a CFG-VALGET payload.
+        :param int offset: payload offset of the first key
+        :param str name: configuration key name e.g. 'CFG_SIGNAL_GPS_ENA'
+        :return: configuration value
+        :rtype: object
+        :raises: AttributeError
+        """
+
+        try:
+            if name[0:6] == "CFG_0x":  # undocumented key, see cfgkey2name
+                keyid = int(name[6:], 16)
+                (_, att) = cfgkey2name(keyid)
+            else:
+                (keyid, att) = cfgname2key(name)
+        except (ube.UBXMessageError, ValueError):
+            raise AttributeError(name)
+        payload = self._payload
+        while offset + 4 <= len(payload):
+            key = int.from_bytes(payload[offset: offset + 4], "little", False)
+            atts = self._cfgval_size(key)
+            if key == keyid:
+                return bytes2val(payload[offset + 4: offset + 4 + atts], att)
+            offset += 4 + atts
+        raise AttributeError(name)
+
+    @staticmethod
+    def _cfgval_size(keyid: int) -> int:
+        """
+        Get storage size of a configuration value from bits 28..30 of its keyID.
+        :param int keyid: config key as integer e.g. 0x20930001
+        :return: size in bytes
+        :rtype: int
+        :raises: UBXMessageError
+        """
+
+        try:
+            return ubcdb.UBX_CONFIG_STORSIZE[(keyid >> 28) & 0x07]
+        except KeyError:
+            raise ube.UBXMessageError(f"Invalid configuration database key {hex(keyid)}")
+
+    def _group_repeats(self, group: tuple) -> int:
+        """
+        Get the number of items in the repeating group of the layout.
+        :param tuple group: (offset, repeats, group size, fields, fmt, slots) from the layout
+        :return: number of repeats
+        :rtype: int
+        """
+
+        goffset, numr, gsize = group[0:3]
+        if isinstance(numr, int):  # fixed number of repeats
+            return numr
+        if numr == "None":  # number of repeats 'variable by size'
+            return (len(self._payload) - goffset) // gsize if gsize else 0
+        return getattr(self, numr)  # number of repeats is defined in named attribute
+
+    def _is_cfgvalget(self) -> bool:
+        """
+        CFG-VALGET GET payloads hold configuration key value pairs instead of a repeating group.
+        :return: True if the message is a CFG-VALGET response
+        :rtype: bool
+        """
+        return self._ubxClass == b"\x06" and self._ubxID == b"\x8b" and self._mode == ubt.GET
+
+    def _attribute_names(self) -> list:
+        """
+        Get the names of all public payload attributes.
+        :return: list of attribute names
+        :rtype: list
+        """
+
+        if self._layout is None:
+            return [att for att in self.__dict__ if att[0] != "_"]
+        fields, group, _, _ = self._layout
+        names = list(fields)
+        if group is not None:
+            goffset, _, _, gfields, _, _ = group
+            if self._is_cfgvalget():
+                payload = self._payload
+                offset = goffset
+                while offset + 4 <= len(payload):
+                    key = int.from_bytes(payload[offset: offset + 4], "little", False)
+                    names.append(cfgkey2name(key)[0])
+                    offset += 4 + self._cfgval_size(key)
+            else:
+                for i in range(self._group_repeats(group)):
+                    for gname in gfields:
+                        names.append(f"{gname}_{i + 1:02d}")
+        return names
+
     def __str__(self) -> str:
         """
         Human-readable representation.
@@ -459,34 +697,31 @@ class UBXMessage:
         if self.payload is None:
             return f"<UBX({umsg_name})>"
 
-        varcount = 0
-        for i, att in enumerate(self.__dict__):
-            if att[0] != "_":
-                varcount = varcount + 1
+        names = self._attribute_names()
+        varcount = len(names)
 
         stg = f"<UBX({umsg_name}, "
-        for i, att in enumerate(self.__dict__):
-            if att[0] != "_":  # only show public attributes
-                val = self.__dict__[att]
-                if att[0:6] == "gnssId":  # attribute is a GNSS ID
-                    val = gnss2str(val)  # get string representation e.g. 'GPS'
-                if att == "iTOW":  # attribute is a GPS Time of Week
-                    val = str(val)  # show time in UTC format
-                # if it's an ACK, we show what it's acknowledging in plain text
-                # if it's a CFG-MSG, we show what message class/id it refers to in plain text
-                if self._ubxClass == b"\x05" or (
-                    self._ubxClass == b"\x06" and self._ubxID == b"\x01"
-                ):
-                    if att in ["clsID", "msgClass"]:
-                        clsid = val2bytes(val, ubt.U1)
-                        val = ubt.UBX_CLASSES.get(clsid, clsid)
-                    if att == "msgID" and clsid:
-                        msgid = val2bytes(val, ubt.U1)
-                        val = ubt.UBX_MSGIDS.get(clsid + msgid, clsid + msgid)
-                stg += att + "=" + str(val)
-                varcount = varcount - 1
-                if varcount > 0:
-                    stg += ", "
+        for att in names:  # only public attributes are listed
+            val = getattr(self, att)
+            if att[0:6] == "gnssId":  # attribute is a GNSS ID
+                val = gnss2str(val)  # get string representation e.g. 'GPS'
+            if att == "iTOW":  # attribute is a GPS Time of Week
+                val = str(val)  # show time in UTC format
+            # if it's an ACK, we show what it's acknowledging in plain text
+            # if it's a CFG-MSG, we show what message class/id it refers to in plain text
+            if self._ubxClass == b"\x05" or (
+                self._ubxClass == b"\x06" and self._ubxID == b"\x01"
+            ):
+                if att in ["clsID", "msgClass"]:
+                    clsid = val2bytes(val, ubt.U1)
+                    val = ubt.UBX_CLASSES.get(clsid, clsid)
+                if att == "msgID" and clsid:
+                    msgid = val2bytes(val, ubt.U1)
+                    val = ubt.UBX_MSGIDS.get(clsid + msgid, clsid + msgid)
+            stg += att + "=" + str(val)
+            varcount = varcount - 1
+            if varcount > 0:
+                stg += ", "
         stg += ")>"
         return stg
 
@@ -644,6 +879,38 @@ class UBXMessage:
 
         return UBXMessage("CFG", "CFG-VALSET", ubt.SET, payload=payload + lis)
 
+    @staticmethod
+    def config_set_batch(layers: int, cfg_data: list, chunk: int = 64) -> list:
+        """
+        Construct the CFG-VALSET messages for any number of configuration
+        database (key, value) tuples. More than one chunk are sent as a
+        transaction (TXN_START, TXN_ONGOING..., TXN_COMMIT), so the receiver
+        applies all values at once or none of them.
+
+        :param int layers: memory layer(s) (1=RAM, 2=BBR, 4=Flash)
+        :param list cfg_data: list of tuples (key, value)
+        :param int chunk: max number of tuples per message (1..64)
+        :return: list of UBXMessage CFG-VALSET, to be sent in order
+        :rtype: list
+        :raises: UBXMessageError
+        """
+
+        if not 0 < chunk <= 64:
+            raise ube.UBXMessageError(f"Invalid chunk size {chunk}, must be 1..64")
+        num = len(cfg_data)
+        if num <= chunk:
+            return [UBXMessage.config_set(layers, ubcdb.TXN_NONE, cfg_data)]
+        msgs = []
+        for start in range(0, num, chunk):
+            if start == 0:
+                transaction = ubcdb.TXN_START
+            elif start + chunk >= num:
+                transaction = ubcdb.TXN_COMMIT
+            else:
+                transaction = ubcdb.TXN_ONGOING
+            msgs.append(UBXMessage.config_set(layers, transaction, cfg_data[start: start + chunk]))
+        return msgs
+
     @staticmethod
     def config_del(layers: int, transaction: int, keys: list) -> object:
         """
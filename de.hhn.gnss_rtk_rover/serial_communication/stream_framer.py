@@ -0,0 +1,294 @@
+"""
+StreamFramer class.
+
+Incremental parser for a mixed UBX / NMEA / RTCM3 byte stream.
+Raw bytes are pushed into one preallocated bytearray, either with feed()
+or read in bulk from a stream with fill(). Complete frames are validated
+(UBX checksum, NMEA checksum, RTCM3 CRC-24Q) and handed out as memoryview
+slices of the buffer, so no bytes are copied or concatenated while framing.
+A frame with a bad length, checksum or crc only discards its first byte,
+so the parser resynchronises on the very next byte.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import gnss.msg_dictionaries.ubxtypes_core as ubt
+from gnss.msg_dictionaries.ubxhelpers import calc_fletcher8, calc_crc24q
+from gnss.nmea_parser import hexval
+
+UBX_SYNC1 = 0xB5
+UBX_SYNC2 = 0x62
+NMEA_START = 0x24  # '$'
+NMEA_CKSUM = 0x2A  # '*'
+NMEA_CR = 0x0D
+NMEA_LF = 0x0A
+RTCM3_PREAMBLE = 0xD3
+
+UBX_OVERHEAD = 8  # header(2) + class(1) + id(1) + length(2) + checksum(2)
+RTCM3_OVERHEAD = 6  # preamble(1) + length(2) + crc(3)
+NMEA_MAXLEN = 128  # high precision GGA sentences exceed the standard 82 chars
+
+
+class StreamFramer:
+    """
+    StreamFramer class.
+    """
+
+    def __init__(self, size: int = 4096):
+        """Constructor.
+
+        :param int size: size of the receive buffer in bytes
+        """
+
+        self._buf = bytearray(size)
+        self._mv = memoryview(self._buf)
+        self._size = size
+        self._start = 0  # first byte not yet consumed
+        self._end = 0  # first free byte
+        self._errors = 0  # number of corrupt frames
+        self._synced = False  # the last frame was valid, the next one starts right after it
+        self.frame_start = 0  # position of the frame found by next_span()
+
+    @property
+    def size(self) -> int:
+        """
+        :return: size of the receive buffer in bytes
+        :rtype: int
+        """
+        return self._size
+
+    def _compact(self):
+        """
+        Move the unconsumed bytes to the beginning of the buffer.
+        The bytes are moved once the consumed part is at least as large as the
+        pending part (so source and destination don't overlap) or the buffer is full.
+        """
+
+        pending = self._end - self._start
+        if pending == 0:
+            self._start = 0
+            self._end = 0
+        elif self._start > 0 and (self._start >= pending or self._end == self._size):
+            if self._start >= pending:
+                self._buf[0:pending] = self._mv[self._start:self._end]
+            else:  # overlapping move, only for frames larger than half the buffer
+                self._buf[0:pending] = bytes(self._mv[self._start:self._end])
+            self._start = 0
+            self._end = pending
+
+    def _reserve(self) -> int:
+        """
+        Make room at the end of the buffer.
+        If the buffer is still full after compacting, its content can't be a
+        valid frame and is dropped.
+
+        :return: number of free bytes at the end of the buffer
+        :rtype: int
+        """
+
+        self._compact()
+        if self._end == self._size:
+            self._start = 0
+            self._end = 0
+            self._errors += 1
+            self._synced = False
+        return self._size - self._end
+
+    def feed(self, data) -> int:
+        """
+        Push a chunk of raw data into the buffer.
+        Memoryviews returned by next_frame() are invalid after calling this method.
+
+        :param bytes data: chunk of any size
+        :return: number of bytes accepted, call next_frame() and feed the rest if less than len(data)
+        :rtype: int
+        """
+
+        n = min(len(data), self._reserve())
+        self._buf[self._end:self._end + n] = data[0:n]
+        self._end += n
+        return n
+
+    async def fill(self, sreader) -> int:
+        """
+        ASYNC: Read all available bytes from the stream into the free part of the buffer.
+        Memoryviews returned by next_frame() are invalid after calling this method.
+
+        :param uasyncio.StreamReader sreader: the stream to read from
+        :return: number of bytes read, 0 on EOF
+        :rtype: int
+        """
+
+        self._reserve()
+        n = await sreader.readinto(self._mv[self._end:])
+        if n:
+            self._end += n
+            return n
+        return 0
+
+    def _ubx_len(self, i: int, end: int) -> int:
+        """
+        Validate UBX frame at buffer position i.
+
+        :return: frame length, 0 if more data is needed, -1 if invalid
+        :rtype: int
+        """
+        buf = self._buf
+        if i + 6 > end:
+            return 0
+        if buf[i + 1] != UBX_SYNC2:
+            return -1
+        total = (buf[i + 4] | (buf[i + 5] << 8)) + UBX_OVERHEAD
+        if total > self._size:
+            return -1
+        if i + total > end:
+            return 0
+        ckv = calc_fletcher8(buf, i + 2, i + total - 2)
+        if ckv != buf[i + total - 2] | (buf[i + total - 1] << 8):
+            return -1
+        return total
+
+    def _nmea_len(self, i: int, end: int) -> int:
+        """
+        Validate NMEA sentence at buffer position i.
+        The checksum is calculated while searching for the end of the sentence.
+
+        :return: frame length, 0 if more data is needed, -1 if invalid
+        :rtype: int
+        """
+        buf = self._buf
+        if i + 2 > end:
+            return 0
+        if buf[i + 1] not in (0x47, 0x50):  # 'G' or 'P'
+            return -1
+        limit = min(end, i + NMEA_MAXLEN)
+        cksum = 0
+        j = i + 1
+        while j < limit:
+            char = buf[j]
+            if char == NMEA_CKSUM:
+                break
+            if char == NMEA_START or char == NMEA_LF:  # truncated sentence
+                return -1
+            cksum ^= char
+            j += 1
+        if j + 5 > limit:  # '*', 2 hex digits, CR, LF
+            if limit == end and end - i < NMEA_MAXLEN:
+                return 0
+            return -1
+        if (
+            (hexval(buf[j + 1]) << 4) | hexval(buf[j + 2])
+        ) != cksum or buf[j + 3] != NMEA_CR or buf[j + 4] != NMEA_LF:
+            return -1
+        return j + 5 - i
+
+    def _rtcm3_len(self, i: int, end: int) -> int:
+        """
+        Validate RTCM3 frame at buffer position i.
+
+        :return: frame length, 0 if more data is needed, -1 if invalid
+        :rtype: int
+        """
+        buf = self._buf
+        if i + 3 > end:
+            return 0
+        if (buf[i + 1] & ~0x03) != 0:
+            return -1
+        total = (((buf[i + 1] & 0x03) << 8) | buf[i + 2]) + RTCM3_OVERHEAD
+        if i + total > end:
+            return 0
+        crc = calc_crc24q(buf, i, i + total - 3)
+        if crc != (buf[i + total - 3] << 16) | (buf[i + total - 2] << 8) | buf[i + total - 1]:
+            return -1
+        return total
+
+    def next_span(self) -> int:
+        """
+        Find the next complete and valid frame in the buffer without allocating a view of it.
+        The frame is buffer[frame_start:consumed].
+        Positions are invalid after calling feed() or fill().
+
+        :return: protocol of the frame or 0 if no complete frame is buffered
+        :rtype: int
+        """
+
+        buf = self._buf
+        end = self._end
+        i = self._start
+        while i < end:
+            byte1 = buf[i]
+            if byte1 == UBX_SYNC1:
+                protocol = ubt.UBX_PROTOCOL
+                total = self._ubx_len(i, end)
+            elif byte1 == NMEA_START:
+                protocol = ubt.NMEA_PROTOCOL
+                total = self._nmea_len(i, end)
+            elif byte1 == RTCM3_PREAMBLE:
+                protocol = ubt.RTCM3_PROTOCOL
+                total = self._rtcm3_len(i, end)
+            else:  # not the start of a known frame, discard byte
+                i += 1
+                continue
+            if total > 0:
+                self._synced = True
+                self.frame_start = i
+                self._start = i + total
+                return protocol
+            if total == 0:  # wait for more data
+                break
+            # invalid frame, resynchronise on the next byte
+            if self._synced:  # count once, not every false start while resynchronising
+                self._errors += 1
+                self._synced = False
+            i += 1
+        self._start = i
+        return 0
+
+    def next_frame(self) -> tuple:
+        """
+        Find the next complete and valid frame in the buffer.
+
+        :return: tuple of (protocol, frame as memoryview) or None if no complete frame is buffered
+        :rtype: tuple
+        """
+
+        protocol = self.next_span()
+        if protocol == 0:
+            return None
+        return protocol, self._mv[self.frame_start:self._start]
+
+    @property
+    def consumed(self) -> int:
+        """
+        Position after the last frame returned, i.e. the end of the frame found by next_span().
+        :return: buffer position
+        :rtype: int
+        """
+        return self._start
+
+    @property
+    def buffer(self) -> memoryview:
+        """
+        :return: view of the whole receive buffer, index it with the positions of next_span()
+        :rtype: memoryview
+        """
+        return self._mv
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of buffered bytes that have not been framed yet.
+        :return: number of bytes
+        :rtype: int
+        """
+        return self._end - self._start
+
+    @property
+    def errors(self) -> int:
+        """
+        Number of corrupt frames (bad length, checksum or crc) and buffer overruns.
+        A corrupt frame is counted once, not every false start while resynchronising.
+        :return: error count
+        :rtype: int
+        """
+        return self._errors
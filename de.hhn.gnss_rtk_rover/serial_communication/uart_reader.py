@@ -2,23 +2,60 @@
 UartReader class.
 
 Connects the ucontroller to the GNSS Receiver
-Read messages from the receiver and put it on the corresponding Queue
+Read messages from the receiver, publish the position and pass UBX responses
+to the UbxDispatcher
+
+The position is taken either from NMEA-GGA (INGEST_NMEA) or from the binary
+UBX NAV-PVT and NAV-HPPOSLLH messages of the same epoch (INGEST_UBX). In the
+UBX mode the periodic messages are unpacked straight from the frame buffer
+and the GGA sentence for the NTRIP caster is built on demand.
+The latest valid GGA (or the position to synthesise it from) is kept in a
+slot, which the NTRIP client reads at any time without waiting for an epoch.
 
 Created on 4 Sep 2022
 :author: vdueck
 """
 import gc
+import struct
 import uasyncio
+import utime
 
-import utils.queue
+from utils.broadcast import Broadcast
 import gnss.msg_dictionaries.ubxtypes_core as ubt
 import gnss.msg_dictionaries.exceptions as ube
-from gnss.message_types import PositionData
+from gnss.message_types import PositionData, NavSolution
+from gnss.nmea_builder import gga_sentence
+from gnss.nmea_parser import (
+    NMEAParser,
+    sentence_type,
+    NMEA_GGA,
+    NMEA_TXT,
+    GGA_TIME,
+    GGA_LAT,
+    GGA_NS,
+    GGA_LON,
+    GGA_EW,
+    GGA_QUALITY,
+    GGA_ALT,
+)
 from gnss.ubx_message import UBXMessage
 from gnss.msg_dictionaries.ubxhelpers import calc_checksum, bytes2val
+from serial_communication.stream_framer import StreamFramer, NMEA_MAXLEN
+from serial_communication.ubx_dispatcher import UbxDispatcher
 
 gc.collect()
 
+INGEST_NMEA = 0
+INGEST_UBX = 1
+
+# offsets from the start of the UBX payload
+_NAV_PVT_FMT = "<I4xBBBB4xiBBxB16xII12xi"  # iTOW, hour, min, sec, valid, nano, fixType, flags, numSV, hAcc, vAcc, gSpeed
+_NAV_PVT_LEN = 92
+_NAV_HPPOSLLH_FMT = "<3xBIiiiibbbbII"  # flags, iTOW, lon, lat, height, hMSL, lonHp, latHp, heightHp, hMSLHp, hAcc, vAcc
+_NAV_HPPOSLLH_LEN = 36
+_MS_PER_DAY = 86400000
+
+
 class UartReader:
     """
     UartReader class.
@@ -26,133 +63,158 @@ class UartReader:
 
     _app = None
     _sreader = None
-    _gga_q = None
-    _cfg_resp_q = None
-    _nav_pvt_q = None
-    _ack_nack_q = None
-    _gga_event = None
-    _position_q = None
+    _position_bus = None
     _posision: PositionData = None
+    _nav_bus = None
+    _nav: NavSolution = None
+    _framer: StreamFramer = None
+    _nmea: NMEAParser = None
     _logcount: int
+    _ingest: int = INGEST_NMEA
+    _epoch: PositionData = None  # position of the epoch being collected from NAV-PVT / NAV-HPPOSLLH
+    _pvt_itow: int = -1
+    _hp_itow: int = -1
+    _sep: int = None  # geoid separation in 0.1 mm
+    receiver_resets: int = 0  # number of detected receiver restarts (boot banner or UPD-SOS)
+    _backlog: int = 0  # max number of unprocessed bytes since the last take_backlog()
+    # latest valid GGA: the sentence in NMEA mode, the position to build it from in UBX mode
+    _gga_buf: bytearray = None
+    _gga_len: int = 0  # length of the sentence in _gga_buf, 0 = build it from _gga_pos
+    _gga_pos: PositionData = None
+    _gga_numsv: int = 0
+    _gga_sep: int = None
+    _gga_time: int = None  # ticks_ms when the slot was updated, None = no valid position yet
 
     @classmethod
     def initialize(cls,
                    app: object,
                    sreader: uasyncio.StreamReader,
-                   gga_q: utils.queue.Queue,
-                   cfg_resp_q: utils.queue.Queue,
-                   nav_pvt_q: utils.queue.Queue,
-                   ack_nack_q: utils.queue.Queue,
-                   ggaevent: uasyncio.Event,
-                   position_q: utils.queue.Queue):
+                   position_bus: Broadcast,
+                   nav_bus: Broadcast,
+                   rxbuf: int = 4096):
         """Initialize class variables.
 
         :param object app: The calling app
         :param uasyncio.StreamReader sreader: the serial connection to the GNSS Receiver(UART1)
-        :param primitives.queue.Queue gga_q: queue for gga messages to ntrip client
-        :param primitives.queue.Queue cfg_resp_q: queue for ubx responses to configuration messages
-        :param primitives.queue.Queue nav_pvt_q: queue for ubx NAV-PVT get messaged
-        :param primitives.queue.Queue ack_nack_q: queue for ubx ACK-NACK messages
-        :param primitives.queue.Queue position_q: main queue for position data to web api / client
-        :param uasyncio.Event ggaevent: event to synchronize with NTRIP client
+        :param Broadcast position_bus: bus publishing the position data to web api / client
+        :param Broadcast nav_bus: bus publishing the NAV-PVT snapshot (accuracy, fix, speed)
+        :param int rxbuf: size of the receive buffer for framing the incoming data
         """
 
         cls._app = app
         cls._sreader = sreader
-        cls._gga_q = gga_q
-        cls._cfg_resp_q = cfg_resp_q
-        cls._nav_pvt_q = nav_pvt_q
-        cls._ack_nack_q = ack_nack_q
-        cls._gga_event = ggaevent
-        cls._position_q = position_q
-        cls._posision = PositionData("", 0, "", "", "")
+        cls._position_bus = position_bus
+        cls._posision = PositionData()
+        cls._nav_bus = nav_bus
+        cls._nav = NavSolution()
+        cls._framer = StreamFramer(rxbuf)
+        cls._nmea = NMEAParser()
         cls._logcount = 0
+        cls._ingest = INGEST_NMEA
+        cls._epoch = PositionData()
+        cls._pvt_itow = -1
+        cls._hp_itow = -1
+        cls._sep = None
+        cls.receiver_resets = 0
+        cls._backlog = 0
+        cls._gga_buf = bytearray(NMEA_MAXLEN)
+        cls._gga_len = 0
+        cls._gga_pos = PositionData()
+        cls._gga_numsv = 0
+        cls._gga_sep = None
+        cls._gga_time = None
+
+    @classmethod
+    def set_ingest(cls, mode: int):
+        """
+        Select the messages the position is taken from.
+        The receiver has to be configured accordingly (GnssHandler.set_ubx_ingest).
+
+        :param int mode: INGEST_NMEA (NMEA-GGA) or INGEST_UBX (NAV-PVT + NAV-HPPOSLLH)
+        """
+        cls._ingest = mode
+        cls._pvt_itow = -1
+        cls._hp_itow = -1
+
     @classmethod
     async def run(cls):
         """
         ASYNC: Read incoming data from UART1 and pass it to the corresponding queue
         """
         gcount = 0
+        framer = cls._framer
         while True:
-            if gcount >= 10:
-                gc.collect()
-                gcount = 0
-            byte1 = await cls._sreader.read(1)
-            # if not UBX, NMEA or RTCM3, discard and continue
-            if byte1 not in (b"\xb5", b"\x24", b"\xd3"):
-                continue
-            byte2 = await cls._sreader.read(1)
-            bytehdr = byte1 + byte2
-            gcount += 1 # count 10 message reads to trigger the garbage collector
-            # if it's an NMEA message ('$G' or '$P')
-            if bytehdr in ubt.NMEA_HDR:
-                # read the rest of the NMEA message from the buffer
-                byten = await cls._sreader.readline()  # NMEA protocol is CRLF-terminated
-                if "GGA" not in str(byten):
-                    continue
-                raw_data = bytehdr + byten
-                try:
-                    checksum_valid = cls._isvalid_cksum(raw_data)
-                    if not checksum_valid:
-                        print("uart_reader WARN -> NMEA Sentence corrupted, invalid checksum")
-                        continue
-                except Exception as err:
-                    print("Badly formed message {}".format(raw_data))
-                    continue
-                print("uart_reader -> nmea received: " + str(raw_data))
-                cls._logcount = cls._logcount + 1
-                cls._get_position_dict(raw_data)
-                # if the queue is full then skip. The gga consumer needs to handle messages fast enough otherwise
-                # rxBuffer will overflow
-                if cls._position_q.empty():
-                    await cls._position_q.put(cls._posision)
-                if cls._gga_event.is_set():
-                    await cls._gga_q.put(raw_data)
-                else:
-                    continue
-            # if it's a UBX message (b'\xb5\x62')
-            if bytehdr in ubt.UBX_HDR:
-                msg = await cls._parse_ubx(bytehdr)
-                if msg.msg_cls == b"\x05":  # ACK-ACK or ACK-NACK message
-                    print("uart_reader -> parsed ACK/NACK message: " + str(msg))
-                    if cls._ack_nack_q.full():
-                        continue
-                    await cls._ack_nack_q.put(msg)
-                if msg.msg_cls == b"\x06":  # CFG message
-                    print("uart_reader -> Parsed CFG Message")
-                    if cls._cfg_resp_q.full():
-                        continue
-                    await cls._cfg_resp_q.put(msg)
-                if msg.msg_cls == b"\x01":  # NAV message
-                    print("uart_reader -> Parsed NAV Message")
-                    if cls._cfg_resp_q.full():
-                        continue
-                    await cls._nav_pvt_q.put(msg)
+            await framer.fill(cls._sreader)
+            if framer.pending > cls._backlog:
+                cls._backlog = framer.pending
+            while True:
+                if gcount >= 10:
+                    gc.collect()
+                    gcount = 0
+                frame = framer.next_frame()
+                if frame is None:
+                    break
+                protocol, raw = frame
+                gcount += 1  # count 10 message reads to trigger the garbage collector
+                if protocol == ubt.NMEA_PROTOCOL:
+                    await cls._handle_nmea(raw)
+                elif protocol == ubt.UBX_PROTOCOL:
+                    await cls._handle_ubx(raw)
+                # RTCM3 frames are not expected on UART1 and are discarded
 
     @classmethod
-    async def _parse_ubx(cls, hdr: bytes) -> UBXMessage:
+    async def _handle_nmea(cls, frame: memoryview):
         """
-        Parse remainder of UBX message.
+        ASYNC: Handle a NMEA sentence and pass GGA data on to the consumers
 
-        :param bytes hdr: UBX header (b'\xb5\x62')
-        :return: tuple of (raw_data as bytes, parsed_data as UBXMessage or None)
-        :rtype: tuple
+        :param memoryview frame: complete NMEA sentence including CRLF
         """
+        msgtype = sentence_type(frame)
+        if msgtype == NMEA_TXT:
+            if b"u-blox AG" in bytes(frame):  # first line of the boot banner
+                cls._receiver_reset()
+            return
+        if cls._ingest != INGEST_NMEA or msgtype != NMEA_GGA:
+            return
+        # checksum is already validated by the framer
+        if cls._nmea.parse(frame, False) != NMEA_GGA:
+            return
+        cls._logcount = cls._logcount + 1
+        cls._update_position()
+        # the bus keeps only the latest item, so the reader never blocks on a slow consumer
+        cls._position_bus.publish(cls._posision)
+        if cls._posision.fixType and cls._posision.lat is not None:
+            length = len(frame)
+            cls._gga_buf[0:length] = frame
+            cls._gga_len = length
+            cls._gga_time = utime.ticks_ms()
 
-        # read the rest of the UBX message from the buffer
-        byten = await cls._sreader.read(4)
-        clsid = byten[0:1]
-        msgid = byten[1:2]
-        lenb = byten[2:4]
-        leni = int.from_bytes(lenb, "little", False)
-        byten = await cls._sreader.read(leni + 2)
-        plb = byten[0:leni]
-        cksum = byten[leni: leni + 2]
-        raw_data = hdr + clsid + msgid + lenb + plb + cksum
-        parsed_data = cls.parse(
-            raw_data
-        )
-        return parsed_data
+    @classmethod
+    async def _handle_ubx(cls, frame: memoryview):
+        """
+        ASYNC: Parse a UBX message and pass it to the request waiting for it
+
+        :param memoryview frame: complete UBX message including header and checksum
+        """
+        msg_cls = frame[2]
+        msg_id = frame[3]
+        periodic = False
+        if msg_cls == 0x01:  # NAV, checksum is already validated by the framer
+            if msg_id == 0x07:
+                periodic = cls._handle_nav_pvt(frame)
+            elif msg_id == 0x14:
+                periodic = cls._handle_nav_hpposllh(frame)
+        elif msg_cls == 0x09 and msg_id == 0x14:  # UPD-SOS, sent after a restore from backup
+            cls._receiver_reset()
+        if periodic and not UbxDispatcher.waiting(msg_cls, msg_id):
+            return  # nobody polled the message, no need to parse it
+        try:
+            msg = cls.parse(bytes(frame))
+        except ube.UBXParseError as err:
+            print("uart_reader WARN -> " + str(err))
+            return
+        if not UbxDispatcher.dispatch(msg) and not periodic:
+            print("uart_reader -> unsolicited UBX message: " + str(msg.identity))
 
     @staticmethod
     def parse(message: bytes) -> UBXMessage:
@@ -186,10 +248,7 @@ class UartReader:
             payload = message[6: lenm - 2]
             leni = len(payload)
         ckm = message[lenm - 2: lenm]
-        if payload is not None:
-            ckv = calc_checksum(clsid + msgid + lenb + payload)
-        else:
-            ckv = calc_checksum(clsid + msgid + lenb)
+        ckv = calc_checksum(message, 2, lenm - 2)
         if validate & ubt.VALCKSUM:
             if hdr != ubt.UBX_HDR:
                 raise ube.UBXParseError(
@@ -215,6 +274,7 @@ class UartReader:
                 payload=payload,
                 parsebitfield=parsebf,
                 scaling=scaling,
+                lazy=True,
             )
         except KeyError as err:
             modestr = ["GET", "SET", "POLL"][msgmode]
@@ -223,110 +283,198 @@ class UartReader:
                 Check 'msgmode' keyword argument is appropriate for message category""".format(clsid, msgid, modestr)
             ) from err
 
-    @staticmethod
-    def _int2hexstr(val: int) -> str:
+    @classmethod
+    def _update_position(cls):
+        """
+        Copy the position fields of the last parsed GGA sentence to the (reused) position record
         """
-        Convert integer to hex string representation.
+        nmea = cls._nmea
+        pos = cls._posision
+        pos.time = nmea.field_time(GGA_TIME, None)
+        pos.fixType = nmea.field_int(GGA_QUALITY)
+        lat = nmea.field_degrees(GGA_LAT, GGA_NS)
+        lon = nmea.field_degrees(GGA_LON, GGA_EW)
+        if lat is None or lon is None:
+            pos.lat = pos.lon = None
+            pos.latHp = pos.lonHp = 0
+        else:
+            pos.lat, pos.latHp = lat
+            pos.lon, pos.lonHp = lon
+        pos.elev = nmea.field_scaled(GGA_ALT, 4, None)  # 0.1 mm
 
-        :param int val: integer < 255 e.g. 31
-        :return: hex representation of integer e.g. '1F'
-        :rtype: str
+    @classmethod
+    def take_backlog(cls) -> tuple:
         """
-        raw_hex = str(hex(val)).upper()
-        final_hex = raw_hex[2:]
-        if len(final_hex) < 2:
-            return "0" + final_hex
-        return final_hex
+        Get the load indicators of the reader and start a new measurement.
+
+        :return: tuple of (max number of unprocessed bytes since the last call, receive buffer size,
+                 number of rejected frames and buffer overruns since startup)
+        :rtype: tuple
+        """
+        backlog = cls._backlog
+        cls._backlog = 0
+        return backlog, cls._framer.size, cls._framer.errors
+
+    @classmethod
+    def _receiver_reset(cls):
+        """
+        Count a restart of the receiver, cached receiver state (e.g. the configuration
+        cache of the GnssHandler) compares this counter and is reloaded
+        """
+        cls.receiver_resets += 1
+        print("uart_reader -> receiver restart detected")
 
     @staticmethod
-    def _get_content(message: object) -> str:
+    def _payload_len(frame: memoryview) -> int:
         """
-        Get content of raw NMEA message (everything between "$" and "*").
+        :param memoryview frame: complete UBX message
+        :return: payload length from the UBX header
+        :rtype: int
+        """
+        return frame[4] | (frame[5] << 8)
 
-        :param object message: entire message as bytes or string
-        :return: content as str
-        :rtype: str
+    @staticmethod
+    def _gga_quality(fixtype: int, flags: int) -> int:
         """
+        Map the NAV-PVT fix to the GGA quality indicator.
 
-        if isinstance(message, bytes):
-            message = message.decode("utf-8")
-        content, _ = message.strip("$\r\n").split("*", 1)
-        return content
+        :param int fixtype: NAV-PVT fixType
+        :param int flags: NAV-PVT flags (gnssFixOk, diffSoln, carrSoln)
+        :return: 0 = no fix, 1 = GNSS, 2 = DGNSS, 4 = RTK fixed, 5 = RTK float, 6 = dead reckoning
+        :rtype: int
+        """
+        if not flags & 0x01 or fixtype == 0 or fixtype == 5:  # no valid fix, time only
+            return 0
+        if fixtype == 1:
+            return 6
+        carrsoln = flags >> 6
+        if carrsoln == 2:
+            return 4
+        if carrsoln == 1:
+            return 5
+        if flags & 0x02:
+            return 2
+        return 1
 
     @classmethod
-    def _calc_checksum(cls, message: object) -> str:
+    def _handle_nav_pvt(cls, frame: memoryview) -> bool:
         """
-        Calculate checksum for raw NMEA message.
+        Update the (reused) navigation snapshot from a NAV-PVT message
+        and collect time and fix of the epoch in the UBX ingest mode
 
-        :param object message: entire message as bytes or string
-        :return: checksum as hex string
-        :rtype: str
+        :param memoryview frame: complete NAV-PVT message
+        :return: True if the message was handled
+        :rtype: bool
         """
-
-        content = cls._get_content(message)
-        cksum = 0
-        for sub in content:
-            cksum ^= ord(sub)
-        return cls._int2hexstr(cksum)
+        if cls._payload_len(frame) < _NAV_PVT_LEN:
+            return False
+        (itow, hour, mins, sec, valid, nano, fixtype,
+         flags, numsv, hacc, vacc, gspeed) = struct.unpack_from(_NAV_PVT_FMT, frame, 6)
+        nav = cls._nav
+        nav.iTOW = itow
+        nav.fixType = fixtype
+        nav.carrSoln = flags >> 6
+        nav.numSV = numsv
+        nav.gSpeed = gspeed
+        nav.accuracy.hAcc = hacc
+        nav.accuracy.vAcc = vacc
+        nav.received = utime.ticks_ms()
+        cls._nav_bus.publish(nav)
+        if cls._ingest == INGEST_UBX:
+            epoch = cls._epoch
+            if valid & 0x02:  # validTime
+                epoch.time = (hour * 3600000 + mins * 60000 + sec * 1000 + nano // 1000000) % _MS_PER_DAY
+            else:
+                epoch.time = None
+            epoch.fixType = cls._gga_quality(fixtype, flags)
+            cls._pvt_itow = itow
+            cls._publish_epoch()
+        return True
 
     @classmethod
-    def _isvalid_cksum(cls, message: object) -> bool:
+    def _handle_nav_hpposllh(cls, frame: memoryview) -> bool:
         """
-        Validate raw NMEA message checksum.
+        Collect the high precision position of the epoch in the UBX ingest mode
 
-        :param bytes message: entire message as bytes or string
-        :return: checksum valid flag
+        :param memoryview frame: complete NAV-HPPOSLLH message
+        :return: True if the message was handled
         :rtype: bool
         """
-        _, _, _, cksum = cls._get_parts(message)
-        return cksum == cls._calc_checksum(message)
+        if cls._ingest != INGEST_UBX or cls._payload_len(frame) < _NAV_HPPOSLLH_LEN:
+            return False
+        (flags, itow, lon, lat, height, hmsl, lonhp, lathp,
+         heighthp, hmslhp, hacc, vacc) = struct.unpack_from(_NAV_HPPOSLLH_FMT, frame, 6)
+        epoch = cls._epoch
+        if flags & 0x01:  # invalidLlh
+            epoch.lat = epoch.lon = epoch.elev = None
+            epoch.latHp = epoch.lonHp = 0
+            cls._sep = None
+        else:
+            epoch.lat = lat
+            epoch.latHp = lathp
+            epoch.lon = lon
+            epoch.lonHp = lonhp
+            epoch.elev = hmsl * 10 + hmslhp  # 0.1 mm
+            cls._sep = (height - hmsl) * 10 + heighthp - hmslhp
+        cls._hp_itow = itow
+        cls._publish_epoch()
+        return True
 
-    @staticmethod
-    def _get_parts(message: object) -> tuple:
+    @classmethod
+    def _publish_epoch(cls):
         """
-        Get talker, msgid, payload and checksum of raw NMEA message.
+        Publish the position once NAV-PVT and NAV-HPPOSLLH of the same epoch are received,
+        the order of the two messages doesn't matter
+        """
+        if cls._pvt_itow != cls._hp_itow or cls._pvt_itow < 0:
+            return
+        cls._pvt_itow = cls._hp_itow = -1  # publish every epoch once
+        epoch = cls._epoch
+        pos = cls._posision
+        pos.time = epoch.time
+        pos.fixType = epoch.fixType
+        pos.lat = epoch.lat
+        pos.latHp = epoch.latHp
+        pos.lon = epoch.lon
+        pos.lonHp = epoch.lonHp
+        pos.elev = epoch.elev
+        cls._logcount = cls._logcount + 1
+        cls._position_bus.publish(pos)
+        if pos.fixType and pos.lat is not None:
+            gga = cls._gga_pos
+            gga.time = pos.time
+            gga.fixType = pos.fixType
+            gga.lat = pos.lat
+            gga.latHp = pos.latHp
+            gga.lon = pos.lon
+            gga.lonHp = pos.lonHp
+            gga.elev = pos.elev
+            cls._gga_numsv = cls._nav.numSV
+            cls._gga_sep = cls._sep
+            cls._gga_len = 0
+            cls._gga_time = utime.ticks_ms()
 
-        :param object message: entire message as bytes or string
-        :return: tuple of (talker as str, msgID as str, payload as list, checksum as str)
-        :rtype: tuple
-        :raises: NMEAMessageError (if message is badly formed)
+    @classmethod
+    def latest_gga(cls) -> bytes:
         """
+        Get the GGA sentence of the latest epoch with a valid position, without waiting.
+        In the UBX ingest mode the sentence is built from NAV-PVT / NAV-HPPOSLLH.
 
-        try:
-            if isinstance(message, bytes):
-                message = message.decode("utf-8")
-            content, cksum = message.strip("$\r\n").split("*", 1)
-
-            hdr, payload = content.split(",", 1)
-            payload = payload.split(",")
-            if hdr[0:1] == "P":  # proprietary
-                talker = "P"
-                msgid = hdr[1:]
-            else:  # standard
-                talker = hdr[0:2]
-                msgid = hdr[2:]
-            return talker, msgid, payload, cksum
-        except Exception as err:
-            print("Badly formed message {}".format(message))
+        :return: complete sentence including CRLF, None if there was no valid position yet
+        :rtype: bytes
+        """
+        if cls._gga_time is None:
+            return None
+        if cls._gga_len:
+            return bytes(cls._gga_buf[0:cls._gga_len])
+        return gga_sentence(cls._gga_pos, cls._gga_numsv, cls._gga_sep)
 
     @classmethod
-    def _get_position_dict(cls, message: object):
+    def gga_age(cls) -> int:
         """
-        :param object message: entire message as bytes or string
-        :return: tuple of (talker as str, msgID as str, payload as list, checksum as str)
-        :rtype: tuple
-        :raises: NMEAMessageError (if message is badly formed)
+        :return: ms since the GGA slot was updated, None if there was no valid position yet
+        :rtype: int
         """
-
-        try:
-            if isinstance(message, bytes):
-                message = message.decode("utf-8")
-            content, cksum = message.strip("$\r\n").split("*", 1)
-            nmea_fields = content.split(",")
-            cls._posision.time = str(nmea_fields[1])
-            cls._posision.lat = str(nmea_fields[2])
-            cls._posision.lon = str(nmea_fields[4])
-            cls._posision.elev = str(nmea_fields[9])
-            cls._posision.fixType = int(nmea_fields[6])
-        except Exception as err:
-            print("Badly formed message {}".format(message))
\ No newline at end of file
+        if cls._gga_time is None:
+            return None
+        return utime.ticks_diff(utime.ticks_ms(), cls._gga_time)
@@ -0,0 +1,230 @@
+"""
+UbxDispatcher class.
+
+Correlates UBX requests sent to the GNSS receiver with their responses.
+A request waits either for the response message with the same class / id
+(polls, e.g. CFG-RATE, CFG-VALGET, NAV-PVT) or for the ACK-ACK / ACK-NAK
+whose clsID / msgID fields name the request (settings, e.g. CFG-VALSET).
+Pending requests are kept per key in the order they were sent, which is the
+order the receiver answers them, so any number of callers can have requests
+in flight without taking each other's responses.
+The receiver acknowledges a CFG poll after its response as well, that
+ACK-ACK is expected and consumed instead of being reported as unsolicited.
+Every send of a request stays pending until it is answered or twice the
+timeout has passed, so the late answer to a send that timed out and was
+retried is taken by its own request and not by the next one with the same key.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import uasyncio
+import utime
+
+import utils.queue
+from gnss.ubx_message import UBXMessage
+
+ACK_CLS = 0x05
+ACK_ACK = 0x01
+ACK_NAK = 0x00
+CFG_CLS = 0x06
+_ACK_KEY = 0x10000  # marks keys of requests waiting for an acknowledge
+
+
+class UbxTransaction:
+    """
+    UbxTransaction class.
+    Future of a single request.
+    """
+
+    __slots__ = ("key", "result", "_event")
+
+    def __init__(self, key: int):
+        """Constructor.
+
+        :param int key: key of the expected response
+        """
+
+        self.key = key
+        self.result = None
+        self._event = uasyncio.Event()
+
+    def resolve(self, msg: UBXMessage):
+        """
+        Complete the transaction with the received message.
+        :param UBXMessage msg: the response, ACK-ACK or ACK-NAK
+        """
+        self.result = msg
+        self._event.set()
+
+    async def wait(self):
+        """
+        ASYNC: Wait for the response
+        """
+        await self._event.wait()
+
+
+class UbxDispatcher:
+    """
+    UbxDispatcher class.
+    """
+
+    _app = None
+    _msg_q = None
+    _pending = None  # key -> list of (UbxTransaction, ticks_ms the answer is overdue) per send, oldest first
+    _trailing = None  # ack key -> number of ACK-ACKs still due for answered CFG polls
+    _timeout = None
+    _retries = None
+    timeouts = 0  # number of requests without response after all retries
+
+    @classmethod
+    def initialize(cls, app: object, msg_q: utils.queue.Queue, timeout: int = 1000, retries: int = 2):
+        """Initialize class variables.
+
+        :param object app: The calling app
+        :param primitives.queue.Queue msg_q: queue for outgoing ubx messages (UartWriter)
+        :param int timeout: default time in ms to wait for a response before the request is sent again
+        :param int retries: default number of times a request is sent again
+        """
+
+        cls._app = app
+        cls._msg_q = msg_q
+        cls._pending = {}
+        cls._trailing = {}
+        cls._timeout = timeout
+        cls._retries = retries
+        cls.timeouts = 0
+
+    @staticmethod
+    def _key(msg_cls: int, msg_id: int, ack: bool) -> int:
+        """
+        :param int msg_cls: message class of the request
+        :param int msg_id: message id of the request
+        :param bool ack: the request waits for an acknowledge
+        :return: key of the expected response
+        :rtype: int
+        """
+        key = (msg_cls << 8) | msg_id
+        if ack:
+            key |= _ACK_KEY
+        return key
+
+    @classmethod
+    async def request(cls, msg: UBXMessage, ack: bool = False, timeout: int = None, retries: int = None) -> UBXMessage:
+        """
+        ASYNC: Send a request to the receiver and wait for the corresponding response.
+
+        :param UBXMessage msg: the request
+        :param bool ack: wait for ACK-ACK / ACK-NAK instead of a response with the class / id of the request
+        :param int timeout: time in ms to wait for a response before the request is sent again
+        :param int retries: number of times a request is sent again
+        :return: the response (or ACK-ACK / ACK-NAK), None if the receiver didn't answer
+        :rtype: UBXMessage
+        """
+        if timeout is None:
+            timeout = cls._timeout
+        if retries is None:
+            retries = cls._retries
+        raw = msg.serialize()
+        key = cls._key(msg.msg_cls[0], msg.msg_id[0], ack)
+        trans = UbxTransaction(key)
+        for _ in range(retries + 1):
+            await cls._msg_q.put(raw)
+            # kept after a timeout or a cancel, the answer to this send may still come
+            overdue = utime.ticks_add(utime.ticks_ms(), 2 * timeout)
+            cls._pending.setdefault(key, []).append((trans, overdue))
+            try:
+                await uasyncio.wait_for_ms(trans.wait(), timeout)
+                return trans.result
+            except uasyncio.TimeoutError:
+                pass
+        cls.timeouts += 1
+        return None
+
+    @classmethod
+    async def send(cls, msg: UBXMessage):
+        """
+        ASYNC: Send a message to the receiver without waiting for a response.
+
+        :param UBXMessage msg: the message
+        """
+        await cls._msg_q.put(msg.serialize())
+
+    @classmethod
+    def _resolve(cls, key: int, msg: UBXMessage) -> bool:
+        """
+        Complete the transaction of the oldest pending send with the given key.
+        Sends whose answer is overdue are dropped, their answer was lost.
+        The transaction may be completed already, when the message answers
+        a retried send, the message is consumed by it all the same.
+        :return: True if a send was waiting for the message
+        :rtype: bool
+        """
+        waiting = cls._pending.get(key)
+        if not waiting:
+            return False
+        now = utime.ticks_ms()
+        trans = None
+        while waiting and trans is None:
+            trans, overdue = waiting.pop(0)
+            if utime.ticks_diff(overdue, now) <= 0:
+                trans = None
+        if not waiting:
+            del cls._pending[key]
+        if trans is None:
+            return False
+        trans.resolve(msg)
+        return True
+
+    @classmethod
+    def dispatch(cls, msg: UBXMessage) -> bool:
+        """
+        Pass a received message to the request waiting for it.
+
+        :param UBXMessage msg: message received from the GNSS receiver
+        :return: True if a request was waiting for the message, False if unsolicited
+        :rtype: bool
+        """
+        msg_cls = msg.msg_cls[0]
+        msg_id = msg.msg_id[0]
+        if msg_cls == ACK_CLS:
+            if msg_id not in (ACK_ACK, ACK_NAK):
+                return False
+            key = cls._key(msg.clsID, msg.msgID, True)
+            if msg_id == ACK_ACK and cls._trailing.get(key):  # follows a CFG poll response, comes first
+                cls._trailing[key] -= 1
+                return True
+            if cls._resolve(key, msg):
+                return True
+            if msg_id == ACK_NAK:  # a rejected poll never gets its response
+                return cls._resolve(cls._key(msg.clsID, msg.msgID, False), msg)
+            return False
+        if not cls._resolve(cls._key(msg_cls, msg_id, False), msg):
+            return False
+        if msg_cls == CFG_CLS:  # e.g. CFG-VALGET, the receiver sends an ACK-ACK after the response
+            key = cls._key(msg_cls, msg_id, True)
+            cls._trailing[key] = cls._trailing.get(key, 0) + 1
+        return True
+
+    @classmethod
+    def waiting(cls, msg_cls: int, msg_id: int) -> bool:
+        """
+        Check if a request waits for a message, so periodic messages only need
+        to be parsed into a UBXMessage if somebody polled them.
+
+        :param int msg_cls: message class
+        :param int msg_id: message id
+        :return: True if a request waits for the message
+        :rtype: bool
+        """
+        return cls._key(msg_cls, msg_id, False) in cls._pending
+
+    @classmethod
+    def pending(cls) -> int:
+        """
+        :return: number of sends waiting for a response, including timed out sends whose answer is not overdue yet
+        :rtype: int
+        """
+        now = utime.ticks_ms()
+        return sum(
+            1 for waiting in cls._pending.values() for _, overdue in waiting if utime.ticks_diff(overdue, now) > 0
+        )
@@ -4,20 +4,24 @@ import uasyncio
 from machine import UART, Pin
 from uasyncio import Event, Lock
 from utils.wifi_manager import WiFiManager
-from utils.globals import WIFI_SSID, WIFI_PW, BAUD_UART1, BAUD_UART2
+from utils.globals import WIFI_SSID, WIFI_PW, BAUD_UART1, BAUD_UART2, UBX_INGEST, RECEIVER_PROFILE
+from utils.globals import RATE_AUTO, RATE_MIN, RATE_MAX
+from utils.globals import RTCM_ALLOW, RTCM_DENY, RTCM_INTERVALS
 from utils.mem_debug import debug_gc
 from gnss.gnss_handler import GnssHandler
 from serial_communication.uart_writer import UartWriter
 from utils.queue import Queue
+from utils.broadcast import Broadcast
 from serial_communication.uart_reader import UartReader
+from serial_communication.ubx_dispatcher import UbxDispatcher
 from gnss.gnss_ntripclient import GNSSNTRIPClient
+from gnss.rtcm_filter import RTCMFilter
 from web_api.request_handler import RequestHandler
 gc.collect()
 
 
 async def init():
     ntrip_stop_event = Event()
-    ggaevent = Event()
 
     masterTx = Pin(0)
     masterRx = Pin(1)
@@ -31,12 +35,9 @@ async def init():
     led = Pin("LED", Pin.OUT)
 
 
-    gga_q = Queue(maxsize=1)
-    cfg_q = Queue(maxsize=5)
-    nav_q = Queue(maxsize=5)
-    ack_q = Queue(maxsize=20)
     msg_q = Queue(maxsize=5)
-    pos_q = Queue(maxsize=1)
+    pos_bus = Broadcast()
+    nav_bus = Broadcast()
 
     uart_rtcm = UART(1, BAUD_UART2, timeout=500)
     uart_rtcm.init(bits=8, parity=None, stop=1, tx=rtcmTx, rx=rtcmRx, rxbuf=4096, txbuf=4096)
@@ -51,42 +52,45 @@ async def init():
     UartWriter.initialize(app=test,
                           swriter=swriter,
                           queue=msg_q)
+    UbxDispatcher.initialize(app=test,
+                             msg_q=msg_q)
     UartReader.initialize(app=test,
                           sreader=sreader,
-                          gga_q=gga_q,
-                          cfg_resp_q=cfg_q,
-                          nav_pvt_q=nav_q,
-                          ack_nack_q=ack_q,
-                          ggaevent=ggaevent,
-                          position_q=pos_q)
+                          position_bus=pos_bus,
+                          nav_bus=nav_bus)
 
+    RTCMFilter.initialize(allow=RTCM_ALLOW,
+                          deny=RTCM_DENY,
+                          intervals=RTCM_INTERVALS,
+                          baud=BAUD_UART2)
     GnssHandler.initialize(app=test,
-                           ack_nack_q=ack_q,
-                           nav_pvt_q=nav_q,
-                           cfg_resp_q=cfg_q,
-                           msg_q=msg_q,
-                           gga_q=gga_q,
-                           pos_q=pos_q,
+                           pos_bus=pos_bus,
+                           nav_bus=nav_bus,
                            ntrip_lock=rtcm_lock,
                            stop_event=ntrip_stop_event)
 
     writertask = uasyncio.create_task(UartWriter.run())
     readertask = uasyncio.create_task(UartReader.run())
 
-    await GnssHandler.set_minimum_nmea_msgs()
+    await GnssHandler.load_config()
+    configured = await GnssHandler.apply_profile(RECEIVER_PROFILE)
+    print("main -> receiver configured: " + str(configured))
     wifi = WiFiManager(WIFI_SSID, WIFI_PW)
     await wifi.connect()
     debug_gc()
     # await GnssHandler.set_update_rate(2000)
-    enabled = await GnssHandler.set_high_precision_mode(1)
-    print("main -> high precision mode enabled: " + str(enabled))
+    if UBX_INGEST:
+        enabled = await GnssHandler.set_ubx_ingest(True)
+        print("main -> ubx ingest enabled: " + str(enabled))
+    GnssHandler.set_rate_control(RATE_AUTO, RATE_MIN, RATE_MAX)
+    ratetask = uasyncio.create_task(GnssHandler.run_rate_control())
     gc.collect()
 
-    ntripclient = GNSSNTRIPClient(uart_rtcm, test, gga_q, ggaevent)
+    ntripclient = GNSSNTRIPClient(uart_rtcm, test)
     ntriptask = uasyncio.create_task(ntripclient.run(rtcm_lock, ntrip_stop_event))
     gc.collect()
     gccount = 0
-    webserver = uasyncio.create_task(RequestHandler.initialize(test, pos_q, ntrip_stop_event, rtcm_lock))
+    webserver = uasyncio.create_task(RequestHandler.initialize(test, ntrip_stop_event, rtcm_lock, ntripclient))
     while wifi.wifi.isconnected():
         led.toggle()
         # accuracy = await GnssHandler.get_precision(False)
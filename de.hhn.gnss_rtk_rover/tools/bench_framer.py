@@ -0,0 +1,144 @@
+"""
+Replay benchmark of the UART1 framing (user-001).
+
+Replays a 20 Hz NAV-PVT + GGA capture through the original byte-wise
+read(1) / concatenation loop of UartReader and through StreamFramer fed
+with readinto() in UART sized chunks, and reports frames/s and the
+heap the framing needs. CPython has no allocation counter, the heap figure
+is the tracemalloc peak above the live heap while 18 epochs are framed, so
+it shows what a frame allocates and drops again. On CPython the legacy
+slicing runs in C and validates nothing, the framer checks every checksum
+in Python; on the Pico the awaits per byte and the garbage of the legacy
+loop are what costs.
+
+Run from the project root: python tools/bench_framer.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import time
+import tracemalloc
+
+import uasyncio
+
+from gnss.msg_dictionaries import ubxtypes_core as ubt
+from gnss.ubx_message import UBXMessage
+from serial_communication.stream_framer import StreamFramer
+
+NAV_PVT = UBXMessage(b"\x01", b"\x07", 0, payload=bytes(range(92))).serialize()
+EPOCH = NAV_PVT + hostenv.GGA
+EPOCHS = 2000  # 100 s at 20 Hz
+CHUNK = 64  # bytes the UART stream hands out per read
+
+
+class ReplayStream:
+    """
+    In-memory stand-in of the UART1 StreamReader.
+    """
+
+    def __init__(self, data: bytes, chunk: int = CHUNK):
+        self._data = memoryview(data)
+        self._pos = 0
+        self._chunk = chunk
+
+    async def read(self, n: int) -> bytes:
+        data = bytes(self._data[self._pos:self._pos + n])
+        self._pos += len(data)
+        return data
+
+    async def readline(self) -> bytes:
+        end = bytes(self._data[self._pos:self._pos + 256]).find(b"\n") + 1
+        return await self.read(end if end else 256)
+
+    async def readinto(self, buf) -> int:
+        n = min(len(buf), self._chunk, len(self._data) - self._pos)
+        buf[0:n] = self._data[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+
+async def legacy_frames(sreader: ReplayStream, count: int) -> int:
+    """
+    The framing of the original UartReader.run / _parse_ubx, without the queues.
+
+    :param ReplayStream sreader: stream to read from
+    :param int count: number of frames to read
+    :return: number of frames
+    :rtype: int
+    """
+    n = 0
+    while n < count:
+        byte1 = await sreader.read(1)
+        if byte1 not in (b"\xb5", b"\x24", b"\xd3"):
+            continue
+        byte2 = await sreader.read(1)
+        bytehdr = byte1 + byte2
+        if bytehdr in ubt.NMEA_HDR:
+            byten = await sreader.readline()
+            if "GGA" not in str(byten):
+                continue
+            raw_data = bytehdr + byten  # noqa: F841
+        elif bytehdr in ubt.UBX_HDR:
+            byten = await sreader.read(4)
+            clsid = byten[0:1]
+            msgid = byten[1:2]
+            lenb = byten[2:4]
+            leni = int.from_bytes(lenb, "little")
+            byten = await sreader.read(leni + 2)
+            plb = byten[0:leni]
+            cksum = byten[leni: leni + 2]
+            raw_data = bytehdr + clsid + msgid + lenb + plb + cksum  # noqa: F841
+        n += 1
+    return n
+
+
+async def framer_frames(sreader: ReplayStream, count: int, framer: StreamFramer) -> int:
+    """
+    The framing of UartReader.run since user-001.
+
+    :param ReplayStream sreader: stream to read from
+    :param int count: number of frames to read
+    :param StreamFramer framer: framer with the receive buffer
+    :return: number of frames
+    :rtype: int
+    """
+    n = 0
+    while n < count:
+        if not await framer.fill(sreader):
+            break
+        while framer.next_span():
+            n += 1
+    return n
+
+
+async def _measure(run) -> tuple:
+    """
+    :param run: coroutine function (sreader, count) framing count frames
+    :return: tuple of (frames, frames/s, heap peak per epoch in bytes)
+    :rtype: tuple
+    """
+    t = time.perf_counter()
+    frames = await run(ReplayStream(EPOCH * EPOCHS), 2 * EPOCHS)
+    rate = frames / (time.perf_counter() - t)
+    sreader = ReplayStream(EPOCH * 20)
+    await run(sreader, 2)  # warm up
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    await run(sreader, 36)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return frames, rate, peak
+
+
+def main():
+    out = hostenv.mute()
+    framer = StreamFramer(8192)
+    for name, run in (("legacy", legacy_frames),
+                      ("framer", lambda sreader, count: framer_frames(sreader, count, framer))):
+        out("%-8s %6d frames  %8.0f frames/s  heap peak %5d B" % ((name,) + uasyncio.run(_measure(run))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+HTTP load generator for MicroWebSrv (user-022).
+
+Runs MicroWebSrv on 127.0.0.1 in a thread with its own event loop and
+polls a JSON route from one client like the Android app does, once with
+a new TCP connection per request (Connection: close) and once over one
+keep-alive connection. Reports requests/s, p50 / p99 latency and the
+number of TCP connections opened. On the Pico W every saved connection
+also saves a handshake over the CYW43 WiFi stack, which loopback doesn't
+show.
+
+Run from the project root: python tools/bench_http.py [requests]
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # must come first
+
+import socket
+import sys
+import threading
+import time
+
+import uasyncio
+
+from web_api.microWebSrv import MicroWebSrv
+
+COUNT = 2000
+REQUEST = b"GET /status HTTP/1.1\r\nHost: rover\r\n%s\r\n"
+
+
+async def _status(client, response):
+    await response.WriteResponseJSONOk({"state": "STREAMING", "connects": 3, "lat": 49.1223, "lon": 9.2064})
+
+
+def _free_port() -> int:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def start_server(webPath: str = "/flash/www") -> MicroWebSrv:
+    """
+    Start MicroWebSrv with the /status route in a daemon thread.
+
+    :param str webPath: directory of the static files
+    :return: started server
+    :rtype: MicroWebSrv
+    """
+    srv = MicroWebSrv(routeHandlers=[("/status", "GET", _status)], port=_free_port(), bindIP="127.0.0.1",
+                      webPath=webPath)
+    started = threading.Event()
+
+    async def serve():
+        await srv.Start()
+        started.set()
+        while True:
+            await uasyncio.sleep(3600)
+
+    threading.Thread(target=uasyncio.run, args=(serve(),), daemon=True).start()
+    started.wait()
+    return srv
+
+
+def _response(rfile) -> dict:
+    """
+    Read one response.
+
+    :return: response headers, lower case names
+    :rtype: dict
+    """
+    if not rfile.readline():
+        raise ConnectionError("connection closed by the server")
+    headers = {}
+    while True:
+        line = rfile.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, value = line.decode().split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+    rfile.read(int(headers.get("content-length", 0)))
+    return headers
+
+
+def run(srv: MicroWebSrv, count: int, keepalive: bool) -> tuple:
+    """
+    Send count requests one after the other.
+
+    :return: tuple of (requests/s, p50 ms, p99 ms, TCP connections opened)
+    :rtype: tuple
+    """
+    request = REQUEST % (b"" if keepalive else b"Connection: close\r\n")
+    latencies = []
+    connections = 0
+    sock = rfile = None
+    start = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        if sock is None:
+            sock = socket.create_connection(srv._srvAddr)
+            rfile = sock.makefile("rb")
+            connections += 1
+        sock.sendall(request)
+        if _response(rfile).get("connection") != "keep-alive":
+            rfile.close()
+            sock.close()
+            sock = None
+        latencies.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - start
+    if sock is not None:
+        rfile.close()
+        sock.close()
+    latencies.sort()
+    return count / elapsed, latencies[len(latencies) // 2], latencies[len(latencies) * 99 // 100], connections
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    out = hostenv.mute()
+    srv = start_server()
+    for name, keepalive in (("Connection: close", False), ("keep-alive", True)):
+        out("%-18s %6.0f requests/s  p50 %5.2f ms  p99 %5.2f ms  %4d connections"
+            % ((name,) + run(srv, count, keepalive)))
+
+
+if __name__ == "__main__":
+    main()
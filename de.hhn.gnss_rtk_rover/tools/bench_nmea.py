@@ -0,0 +1,100 @@
+"""
+Benchmark of the GGA handling of UartReader (user-007).
+
+Compares the original path (readline, str() search for 'GGA', decode,
+split, checksum over the str, print of every sentence) with
+UartReader._handle_nmea on the framed sentence, with and without the
+bytes() copy + print it had until this change. Reports sentences/s and
+the bytes allocated per sentence (tracemalloc peak). print() is muted,
+the message string is still built like on the Pico. On CPython the str
+methods of the original path run in C while NMEAParser walks the bytes in
+Python, so the rate favours the original there.
+
+Run from the project root: python tools/bench_nmea.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import time
+import tracemalloc
+
+import uasyncio
+
+from gnss.message_types import PositionData
+from serial_communication.uart_reader import UartReader
+from utils.broadcast import Broadcast
+
+COUNT = 20000
+
+
+def legacy_gga(line: bytes, posision: PositionData):
+    """
+    The GGA path of the original UartReader.run, _isvalid_cksum and _get_position_dict.
+    """
+    bytehdr = line[0:2]
+    byten = line[2:]
+    if "GGA" not in str(byten):
+        return
+    raw_data = bytehdr + byten
+    message = raw_data.decode("utf-8")
+    content, cksum = message.strip("$\r\n").split("*", 1)
+    hdr, payload = content.split(",", 1)
+    payload.split(",")
+    check = 0
+    for sub in message.strip("$\r\n").split("*", 1)[0]:
+        check ^= ord(sub)
+    if cksum != hex(check)[2:].upper().zfill(2):
+        return
+    print("uart_reader -> nmea received: " + str(raw_data))
+    message = raw_data.decode("utf-8")
+    content, cksum = message.strip("$\r\n").split("*", 1)
+    nmea_fields = content.split(",")
+    posision.time = str(nmea_fields[1])
+    posision.lat = str(nmea_fields[2])
+    posision.lon = str(nmea_fields[4])
+    posision.elev = str(nmea_fields[9])
+    posision.fixType = int(nmea_fields[6])
+
+
+async def copy_and_print(frame: memoryview):
+    """
+    _handle_nmea with the copy and print removed by user-007.
+    """
+    await UartReader._handle_nmea(frame)
+    raw_data = bytes(frame)
+    print("uart_reader -> nmea received: " + str(raw_data))
+
+
+async def _measure(run, arg) -> tuple:
+    t = time.perf_counter()
+    for _ in range(COUNT):
+        await run(arg)
+    rate = COUNT / (time.perf_counter() - t)
+    tracemalloc.start()
+    await run(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rate, peak
+
+
+def main():
+    out = hostenv.mute()
+    UartReader.initialize(None, None, Broadcast(), Broadcast())
+    posision = PositionData()
+
+    async def legacy(line):
+        legacy_gga(line, posision)
+
+    frame = memoryview(bytearray(hostenv.GGA))
+    for name, run, arg in (
+        ("original path", legacy, hostenv.GGA),
+        ("_handle_nmea with copy + print", copy_and_print, frame),
+        ("_handle_nmea", UartReader._handle_nmea, frame),
+    ):
+        out("%-32s %8.0f sentences/s  %5d B allocated" % ((name,) + uasyncio.run(_measure(run, arg))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Host environment for the tools: runs the rover modules on CPython.
+
+Import it before any rover module. It puts the MicroPython stand-ins of
+tools/stubs and the project root on sys.path, gives CPython's time module
+the ticks functions of MicroPython's time and lets int.to_bytes /
+int.from_bytes take the signed flag positionally like MicroPython does.
+Also holds helpers that build NMEA, UBX and RTCM3 test frames.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import builtins
+import os
+import sys
+import time
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TOOLS)
+for _path in (ROOT, os.path.join(TOOLS, "stubs")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import utime  # noqa: E402
+
+for _name in ("ticks_ms", "ticks_us", "ticks_add", "ticks_diff", "sleep_ms"):
+    setattr(time, _name, getattr(utime, _name))
+
+_int = builtins.int
+
+
+class _IntMeta(type):
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, _int)
+
+
+class MPInt(_int, metaclass=_IntMeta):
+    """
+    int with MicroPython's to_bytes / from_bytes signatures (signed is positional).
+    """
+
+    def to_bytes(self, length, byteorder="big", signed=False):
+        return _int.to_bytes(self, length, byteorder, signed=signed)
+
+    @classmethod
+    def from_bytes(cls, data, byteorder="big", signed=False):
+        return _int.from_bytes(bytes(data), byteorder, signed=signed)
+
+
+import gnss.msg_dictionaries.ubxhelpers as _ubxhelpers  # noqa: E402
+import gnss.ubx_message as _ubx_message  # noqa: E402
+
+for _module in (_ubxhelpers, _ubx_message):
+    _module.int = MPInt
+
+_print = builtins.print
+
+
+def mute() -> object:
+    """
+    Silence the print() calls of the rover modules.
+
+    :return: the original print function, for the output of the tool
+    """
+    builtins.print = lambda *args, **kwargs: None
+    return _print
+
+
+def nmea(body: str) -> bytes:
+    """
+    :param str body: sentence without '$' and checksum e.g. 'GNGGA,...'
+    :return: sentence with checksum and CRLF
+    :rtype: bytes
+    """
+    cksum = 0
+    for char in body.encode():
+        cksum ^= char
+    return ("$%s*%02X\r\n" % (body, cksum)).encode()
+
+
+def rtcm3(num: int, length: int) -> bytes:
+    """
+    :param int num: RTCM3 message number
+    :param int length: payload length
+    :return: RTCM3 frame with valid CRC-24Q and a zero filled payload
+    :rtype: bytes
+    """
+    from gnss.msg_dictionaries.ubxhelpers import calc_crc24q
+
+    payload = bytearray(length)
+    payload[0] = num >> 4
+    payload[1] = (num & 0x0F) << 4
+    frame = bytes((0xD3, length >> 8, length & 0xFF)) + payload
+    crc = calc_crc24q(frame)
+    return frame + bytes((crc >> 16, (crc >> 8) & 0xFF, crc & 0xFF))
+
+
+GGA = nmea("GNGGA,123519.00,5037.7604409,N,00912.3456789,E,4,12,0.9,545.4231,M,46.9,M,1.0,0000")
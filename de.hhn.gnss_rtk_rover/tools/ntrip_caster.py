@@ -0,0 +1,142 @@
+"""
+Stand-in NTRIP caster for the host tools.
+
+Serves one scripted behaviour per connection on 127.0.0.1 and records the
+requests and GGA sentences it receives. Also starts a GNSSNTRIPClient
+against it with short timeouts.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # must come first
+
+import asyncio
+import time
+
+from machine import UART
+
+import gnss.gnss_ntripclient as ntripclient
+from gnss.gnss_ntripclient import GNSSNTRIPClient
+
+ICY = b"ICY 200 OK\r\n"
+EPOCH = hostenv.rtcm3(1077, 300) + hostenv.rtcm3(1005, 19)
+
+
+class Caster:
+    """
+    Caster class.
+    """
+
+    def __init__(self, *script):
+        """
+        Constructor.
+
+        :param script: one coroutine function (caster, reader, writer) per connection, the last one repeats
+        """
+        self.script = script
+        self.connections = 0
+        self.sent = 0  # RTCM3 bytes sent
+        self.gga = []  # (time.monotonic(), sentence) of the GGA sentences received
+        self.port = None
+        self._server = None
+        self._tasks = set()
+
+    async def start(self) -> int:
+        """
+        :return: port the caster listens on
+        :rtype: int
+        """
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    def close(self):
+        self._server.close()
+        for task in self._tasks:
+            task.cancel()
+
+    async def _serve(self, reader, writer):
+        self._tasks.add(asyncio.current_task())
+        handler = self.script[min(self.connections, len(self.script) - 1)]
+        self.connections += 1
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            reading = asyncio.ensure_future(self._read_gga(reader))
+            try:
+                await handler(self, reader, writer)
+            finally:
+                reading.cancel()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:  # close(), end the task normally, asyncio reports cancelled handlers
+            pass
+        finally:
+            writer.close()
+            self._tasks.discard(asyncio.current_task())
+
+    async def _read_gga(self, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            self.gga.append((time.monotonic(), line))
+
+    async def send_epochs(self, writer, seconds: float, interval: float = 0.1):
+        """
+        ASYNC: Send an RTCM3 epoch every interval seconds.
+        """
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            writer.write(EPOCH)
+            self.sent += len(EPOCH)
+            await writer.drain()
+            await asyncio.sleep(interval)
+
+
+def streaming(seconds: float = 3600, header: bytes = ICY):
+    """
+    :return: handler answering with header and sending epochs for seconds, then closing the connection
+    """
+    async def handler(caster, reader, writer):
+        writer.write(header)
+        await caster.send_epochs(writer, seconds)
+
+    return handler
+
+
+def silent_after(seconds: float):
+    """
+    :return: handler sending epochs for seconds, then keeping the connection open without data
+    """
+    async def handler(caster, reader, writer):
+        writer.write(ICY)
+        await caster.send_epochs(writer, seconds)
+        await asyncio.sleep(3600)
+
+    return handler
+
+
+async def start_client(caster: Caster, stall: float = 0.5) -> tuple:
+    """
+    ASYNC: Start a GNSSNTRIPClient against the caster.
+
+    :param Caster caster: started caster
+    :param float stall: NTRIP_STALL_TIMEOUT in seconds
+    :return: tuple of (client, UART stub receiving the corrections, task running the client)
+    :rtype: tuple
+    """
+    ntripclient.NTRIP_SERVER = "127.0.0.1"
+    ntripclient.OUTPORT_NTRIP = caster.port
+    ntripclient.MOUNTPOINT = "TEST"
+    ntripclient.NTRIP_STALL_TIMEOUT = stall
+    ntripclient.BACKOFF_MIN = 100
+    ntripclient.BACKOFF_MAX = 200
+    ntripclient.CONNECT_TIMEOUT = 1000
+    ntripclient.HEADER_TIMEOUT = 500
+    uart = UART()
+    client = GNSSNTRIPClient(uart, None)
+    stop = asyncio.Event()
+    task = asyncio.ensure_future(client.run(asyncio.Lock(), stop))
+    await asyncio.sleep(0)
+    stop.clear()  # run() starts stopped and polls the stop event once a second
+    return client, uart, task
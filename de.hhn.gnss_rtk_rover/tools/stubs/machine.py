@@ -0,0 +1,23 @@
+"""
+machine for the host tools. UART records what is written to it.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+
+
+class UART:
+    def __init__(self, *args, **kwargs):
+        self.written = []  # chunks in the order they were written
+
+    def write(self, buf):
+        self.written.append(bytes(buf))
+        return len(buf)
+
+    def readinto(self, buf):
+        return None
+
+
+class Pin:
+    def __init__(self, *args, **kwargs):
+        pass
@@ -0,0 +1,24 @@
+"""
+micropython for the host tools. The viper emitter doesn't exist on the
+host, decorating raises like on a port without it, so the rover falls back
+to its pure Python implementations.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+
+
+def const(value):
+    return value
+
+
+def native(func):
+    return func
+
+
+def viper(func):
+    raise RuntimeError("no viper emitter on the host")
+
+
+def mem_info(*args):
+    pass
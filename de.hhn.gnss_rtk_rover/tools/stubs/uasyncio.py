@@ -0,0 +1,155 @@
+"""
+uasyncio for the host tools, on top of CPython's asyncio.
+
+Only what the rover uses. Streams behave like MicroPython's Stream: they
+wrap a non-blocking socket or a device with write() / readinto() such as
+the machine.UART stub, and write() only buffers until drain(). Closing a
+socket with wait_closed() wakes the tasks waiting for it, which then fail
+on the closed socket, as MicroPython's poller reports closed sockets.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+from asyncio import *
+import asyncio as _asyncio
+import socket as _socket
+
+
+async def sleep_ms(ms):
+    await _asyncio.sleep(ms / 1000)
+
+
+async def wait_for_ms(aw, ms):
+    return await _asyncio.wait_for(aw, ms / 1000)
+
+
+_waiting = {}  # socket -> futures of the tasks waiting for it
+
+
+async def _ready(sock, write):
+    loop = _asyncio.get_running_loop()
+    fut = loop.create_future()
+    fd = sock.fileno()
+    _waiting.setdefault(sock, set()).add(fut)
+    if write:
+        loop.add_writer(fd, lambda: fut.done() or fut.set_result(None))
+    else:
+        loop.add_reader(fd, lambda: fut.done() or fut.set_result(None))
+    try:
+        await fut
+    finally:
+        _waiting.get(sock, set()).discard(fut)
+        if write:
+            loop.remove_writer(fd)
+        else:
+            loop.remove_reader(fd)
+
+
+class Stream:
+    def __init__(self, s, e=None):
+        self.s = s
+        self.e = e or {}
+        self.out_buf = b""
+        self._sock = isinstance(s, _socket.socket)
+
+    def get_extra_info(self, v):
+        return self.e[v]
+
+    def write(self, buf):
+        self.out_buf += bytes(buf)
+
+    async def drain(self):
+        while self.out_buf:
+            if self._sock:
+                await _ready(self.s, True)
+                err = self.s.getsockopt(_socket.SOL_SOCKET, _socket.SO_ERROR)
+                if err:
+                    raise OSError(err, "connect failed")
+                n = self.s.send(self.out_buf)
+            else:
+                n = self.s.write(self.out_buf)
+                if n is None:
+                    await _asyncio.sleep(0)
+                    continue
+            self.out_buf = self.out_buf[n:]
+
+    async def readinto(self, buf):
+        if self._sock:
+            await _ready(self.s, False)
+            return self.s.recv_into(buf)
+        while True:
+            n = self.s.readinto(buf)
+            if n:
+                return n
+            await _asyncio.sleep(0.001)
+
+    async def read(self, n=-1):
+        buf = bytearray(n if n > 0 else 4096)
+        k = await self.readinto(buf)
+        return bytes(buf[:k])
+
+    async def readexactly(self, n):
+        data = b""
+        while len(data) < n:
+            part = await self.read(n - len(data))
+            if not part:
+                raise EOFError
+            data += part
+        return data
+
+    async def readline(self):
+        line = b""
+        while True:
+            await _ready(self.s, False)
+            data = self.s.recv(256, _socket.MSG_PEEK)
+            if not data:
+                return line
+            i = data.find(b"\n")
+            line += self.s.recv(i + 1 if i >= 0 else len(data))
+            if line.endswith(b"\n"):
+                return line
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        self.s.close()
+        for fut in _waiting.pop(self.s, ()):
+            fut.done() or fut.set_result(None)
+
+
+StreamReader = StreamWriter = Stream
+
+
+class Server:
+    def __init__(self, sock, cb):
+        self._sock = sock
+        self._cb = cb
+        self._task = _asyncio.get_running_loop().create_task(self._serve())
+
+    async def _serve(self):
+        while True:
+            await _ready(self._sock, False)
+            try:
+                s, addr = self._sock.accept()
+            except BlockingIOError:
+                continue
+            s.setblocking(False)
+            _asyncio.get_running_loop().create_task(self._cb(Stream(s, {"peername": addr}),
+                                                             Stream(s, {"peername": addr})))
+
+    def close(self):
+        self._task.cancel()
+        self._sock.close()
+
+    async def wait_closed(self):
+        pass
+
+
+async def start_server(cb, host, port, backlog=5):
+    sock = _socket.socket()
+    sock.setsockopt(_socket.SOL_SOCKET, _socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return Server(sock, cb)
@@ -0,0 +1,7 @@
+"""
+uerrno for the host tools.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+from errno import *
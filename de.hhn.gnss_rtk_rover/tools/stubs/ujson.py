@@ -0,0 +1,7 @@
+"""
+ujson for the host tools.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+from json import *
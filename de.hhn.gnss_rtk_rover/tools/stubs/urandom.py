@@ -0,0 +1,7 @@
+"""
+urandom for the host tools.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+from random import *
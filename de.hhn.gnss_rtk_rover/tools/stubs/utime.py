@@ -0,0 +1,28 @@
+"""
+utime for the host tools.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+from time import *
+import time as _time
+
+
+def ticks_ms():
+    return int(_time.monotonic() * 1000)
+
+
+def ticks_us():
+    return int(_time.monotonic() * 1000000)
+
+
+def ticks_add(ticks, delta):
+    return ticks + delta
+
+
+def ticks_diff(new, old):
+    return new - old
+
+
+def sleep_ms(ms):
+    _time.sleep(ms / 1000)
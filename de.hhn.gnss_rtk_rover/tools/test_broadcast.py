@@ -0,0 +1,159 @@
+"""
+Position bus (user-010).
+
+Checks that every subscriber gets every value it keeps up with, that a
+slow subscriber gets the latest value and the skipped ones are counted,
+and the "newer than N" semantics of Subscriber.next().
+
+Run with pytest, or directly for the fan-out cost with 1, 4 and 16
+subscribers, against the single position queue of size 1 the consumers
+shared before:
+python tools/test_broadcast.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import time
+
+import uasyncio
+
+from utils.broadcast import Broadcast
+from utils.queue import Queue
+
+EPOCHS = 2000
+
+
+def test_latest_waits_for_the_first_value():
+    async def run():
+        bus = Broadcast()
+        task = uasyncio.create_task(bus.latest())
+        await uasyncio.sleep(0)
+        assert not task.done()
+        bus.publish("a")
+        await uasyncio.sleep(0)
+        assert task.result() == "a"
+        assert bus.subscribers == 0
+        assert await bus.latest() == "a"
+
+    uasyncio.run(run())
+
+
+def test_slow_subscriber_gets_the_latest_value():
+    async def run():
+        bus = Broadcast()
+        sub = bus.subscribe()
+        bus.publish("a")
+        assert await sub.next() == "a"
+        bus.publish("b")
+        bus.publish("c")
+        assert await sub.next() == "c" and sub.seq == 3
+        assert bus.skipped == 1
+        assert await sub.next(1) == "c"  # newer than 1 is already there
+        task = uasyncio.create_task(sub.next())
+        await uasyncio.sleep(0)
+        assert not task.done()
+        bus.publish("d")
+        await uasyncio.sleep(0)
+        assert task.result() == "d"
+        sub.close()
+        assert bus.subscribers == 0
+
+    uasyncio.run(run())
+
+
+def test_every_subscriber_gets_every_epoch():
+    async def run():
+        bus = Broadcast()
+        got = [[] for _ in range(4)]
+
+        async def consume(sub, values):
+            while True:
+                values.append(await sub.next())
+
+        tasks = [uasyncio.create_task(consume(bus.subscribe(), values)) for values in got]
+        await uasyncio.sleep(0)
+        for i in range(20):
+            bus.publish(i)
+            await uasyncio.sleep(0)
+        for task in tasks:
+            task.cancel()
+        assert got == [list(range(20))] * 4
+        assert bus.skipped == 0
+
+    uasyncio.run(run())
+
+
+async def _fanout(subscribers: int) -> tuple:
+    """
+    :return: tuple of (values delivered per epoch, µs per publish, µs per epoch including the wake-ups)
+    :rtype: tuple
+    """
+    bus = Broadcast()
+    got = 0
+
+    async def consume(sub):
+        nonlocal got
+        while True:
+            await sub.next()
+            got += 1
+
+    tasks = [uasyncio.create_task(consume(bus.subscribe())) for _ in range(subscribers)]
+    await uasyncio.sleep(0)
+    t = time.perf_counter()
+    for i in range(EPOCHS):
+        bus.publish(i)
+        await uasyncio.sleep(0)
+    epoch = (time.perf_counter() - t) / EPOCHS * 1e6
+    t = time.perf_counter()
+    for i in range(EPOCHS):
+        bus.publish(i)
+    publish = (time.perf_counter() - t) / EPOCHS * 1e6
+    for task in tasks:
+        task.cancel()
+    return got / EPOCHS, publish, epoch
+
+
+async def _shared_queue(subscribers: int) -> float:
+    """
+    :return: values delivered per epoch with the consumers sharing one queue of size 1
+    :rtype: float
+    """
+    queue = Queue(maxsize=1)
+    got = 0
+
+    async def consume():
+        nonlocal got
+        while True:
+            await queue.get()
+            got += 1
+
+    tasks = [uasyncio.create_task(consume()) for _ in range(subscribers)]
+    await uasyncio.sleep(0)
+    for i in range(EPOCHS):
+        if queue.empty():
+            queue.put_nowait(i)
+        await uasyncio.sleep(0)
+    for task in tasks:
+        task.cancel()
+    return got / EPOCHS
+
+
+async def _bench(out):
+    for subscribers in (1, 4, 16):
+        shared = await _shared_queue(subscribers)
+        delivered, publish, epoch = await _fanout(subscribers)
+        out(
+            "%2d subscribers  shared queue %.2f values/epoch  bus %5.2f values/epoch, publish %5.1f µs, epoch %6.1f µs"
+            % (subscribers, shared, delivered, publish, epoch)
+        )
+
+
+def main():
+    out = hostenv.mute()
+    uasyncio.run(_bench(out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+keyID -> name index of the configuration database (user-006).
+
+cfgkey2name must give the same result with the dict index, the compact
+sorted index and the original linear walk of UBX_CONFIG_DATABASE, also
+after keys are added to the database.
+
+Run with pytest, or directly for the lookup time and the size of the
+index containers with up to 5000 keys (names and keyIDs are shared with
+the database):
+python tools/test_cfgkey_index.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import random
+import sys
+import time
+
+import gnss.msg_dictionaries.ubxtypes_configdb as ubcdb
+from gnss.msg_dictionaries import ubxhelpers
+
+DATABASE = dict(ubcdb.UBX_CONFIG_DATABASE)
+
+
+def legacy_lookup(keyID: int) -> tuple:
+    """
+    The linear walk of the original cfgkey2name.
+    """
+    for key, (kid, typ) in ubcdb.UBX_CONFIG_DATABASE.items():
+        if kid == keyID:
+            return (key, typ)
+    return None
+
+
+def _scale(size: int):
+    """
+    Fill the configuration database with made up keys up to size keys.
+    """
+    cdb = ubcdb.UBX_CONFIG_DATABASE
+    cdb.clear()
+    cdb.update(DATABASE)
+    i = 0
+    while len(cdb) < size:
+        cdb[f"CFG_X{i}"] = (0x10000000 + i * 7 + 3, "L")
+        i += 1
+
+
+def test_index_equals_linear_walk():
+    try:
+        for compact in (False, True):
+            ubxhelpers.use_compact_cfgkey_index(compact)
+            for size in (len(DATABASE), 500):  # growing the database rebuilds the index
+                _scale(size)
+                for kid, _ in ubcdb.UBX_CONFIG_DATABASE.values():
+                    assert ubxhelpers.cfgkey2name(kid) == legacy_lookup(kid)
+            assert ubxhelpers.cfgkey2name(0x10310099) == ("CFG_0x10310099", "X001")
+            assert ubxhelpers.cfgkey2name(0x40530099) == ("CFG_0x40530099", "X004")
+    finally:
+        _scale(0)
+        ubxhelpers.use_compact_cfgkey_index(False)
+
+
+def main():
+    out = hostenv.mute()
+    rnd = random.Random(6)
+    for size in (10, 100, 1000, 5000):
+        _scale(size)
+        keys = [rnd.choice(list(ubcdb.UBX_CONFIG_DATABASE.values()))[0] for _ in range(2000)]
+        usec = []
+        heap = []
+        for lookup, compact in ((legacy_lookup, None), (ubxhelpers.cfgkey2name, False), (ubxhelpers.cfgkey2name, True)):
+            if compact is not None:
+                ubxhelpers.use_compact_cfgkey_index(compact)
+                lookup(keys[0])  # build the index
+                heap.append(sum(sys.getsizeof(part) for part in ubxhelpers._CFGKEY_INDEX[1:]))
+            t = time.perf_counter()
+            for kid in keys:
+                lookup(kid)
+            usec.append((time.perf_counter() - t) / len(keys) * 1e6)
+        out(
+            "%5d keys  linear %6.1f µs  dict %5.2f µs %7d B  compact %5.2f µs %7d B"
+            % (len(ubcdb.UBX_CONFIG_DATABASE), usec[0], usec[1], heap[0], usec[2], heap[1])
+        )
+    _scale(0)
+
+
+if __name__ == "__main__":
+    main()
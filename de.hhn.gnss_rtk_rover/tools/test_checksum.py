@@ -0,0 +1,67 @@
+"""
+UBX Fletcher checksum (user-005).
+
+calc_checksum / calc_fletcher8 must match the original per byte loop over
+whole buffers, over a range of a larger buffer and when chained with init.
+
+Run with pytest, or directly for the time per call over 100 B and 1 KB.
+CPython has no viper emitter, so this measures the pure Python fallback
+_fletcher8_py against the original loop; on the Pico calc_fletcher8 runs
+_fletcher8_viper.
+python tools/test_checksum.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import random
+import time
+
+from gnss.msg_dictionaries import ubxhelpers
+
+
+def legacy_checksum(content: bytes) -> bytes:
+    """
+    The original calc_checksum.
+    """
+    check_a = 0
+    check_b = 0
+    for char in content:
+        check_a += char
+        check_a &= 0xFF
+        check_b += check_a
+        check_b &= 0xFF
+    return bytes((check_a, check_b))
+
+
+def test_checksum_equals_legacy():
+    rnd = random.Random(5)
+    for size in (0, 1, 5, 100, 1024, 5000, 70000):
+        data = rnd.randbytes(size)
+        assert ubxhelpers.calc_checksum(data) == legacy_checksum(data)
+        framed = bytearray(b"xx" + data + b"yy")
+        assert ubxhelpers.calc_checksum(framed, 2, 2 + size) == legacy_checksum(data)
+        assert ubxhelpers.calc_checksum(memoryview(framed), 2, 2 + size) == legacy_checksum(data)
+        split = rnd.randint(0, size)
+        init = ubxhelpers.calc_fletcher8(data, 0, split)
+        assert ubxhelpers.calc_fletcher8(data, split, -1, init) == ubxhelpers.calc_fletcher8(data)
+
+
+def main():
+    out = hostenv.mute()
+    out("calc_fletcher8 uses %s" % ubxhelpers._fletcher8.__name__)
+    for size in (100, 1024):
+        data = bytearray(random.Random(size).randbytes(size))
+        count = 5000
+        usec = []
+        for func in (legacy_checksum, ubxhelpers.calc_checksum):
+            t = time.perf_counter()
+            for _ in range(count):
+                func(data)
+            usec.append((time.perf_counter() - t) / count * 1e6)
+        out("%5d B  legacy %6.1f µs  calc_checksum %6.1f µs" % ((size,) + tuple(usec)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Precompressed static files of MicroWebSrv (user-025).
+
+"<file>.gz" goes to clients accepting gzip. A client without gzip gets
+"<file>" if it is there and a 406 if there is only the ".gz", never a
+404 for a file that exists.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import gzip
+import socket
+
+from bench_http import start_server
+
+PAGE = b"<html><body>rover</body></html>"
+
+
+def _get(srv, path: str, gz: bool) -> tuple:
+    """
+    :return: tuple of (status code, response headers, body)
+    :rtype: tuple
+    """
+    sock = socket.create_connection(srv._srvAddr)
+    rfile = sock.makefile("rb")
+    sock.sendall(b"GET %s HTTP/1.1\r\n%sConnection: close\r\n\r\n"
+                 % (path.encode(), b"Accept-Encoding: gzip, deflate\r\n" if gz else b""))
+    line = rfile.readline()
+    headers = {}
+    while True:
+        header = rfile.readline()
+        if header in (b"\r\n", b""):
+            break
+        name, value = header.decode().split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+    body = rfile.read(int(headers.get("content-length", 0)))
+    sock.close()
+    return int(line.split()[1]), headers, body
+
+
+def test_gzip_variants(tmp_path):
+    (tmp_path / "both.html").write_bytes(PAGE)
+    (tmp_path / "both.html.gz").write_bytes(gzip.compress(PAGE))
+    (tmp_path / "only.html.gz").write_bytes(gzip.compress(PAGE))
+    srv = start_server(str(tmp_path))
+
+    code, headers, body = _get(srv, "/both.html", gz=True)
+    assert code == 200 and headers["content-encoding"] == "gzip" and gzip.decompress(body) == PAGE
+    code, headers, body = _get(srv, "/both.html", gz=False)
+    assert code == 200 and "content-encoding" not in headers and body == PAGE
+    assert headers["vary"] == "Accept-Encoding"
+
+    code, headers, body = _get(srv, "/only.html", gz=True)
+    assert code == 200 and gzip.decompress(body) == PAGE
+    code, _, _ = _get(srv, "/only.html", gz=False)
+    assert code == 406
+
+    code, _, _ = _get(srv, "/missing.html", gz=False)
+    assert code == 404
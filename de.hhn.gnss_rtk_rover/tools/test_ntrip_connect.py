@@ -0,0 +1,152 @@
+"""
+Connect of GNSSNTRIPClient (user-020).
+
+Every failed connect attempt counts towards DNS_RETRIES, also a socket
+error of connect() itself (e.g. EHOSTUNREACH) and a caster that never
+sends the response header, so a stale caster address is resolved again.
+The latency probe measures how late a 5 ms ticker task wakes up while the
+client connects to a host that never answers the SYN, the UART reader
+gets the same share of the event loop.
+
+Run with pytest, or directly for the latency probe:
+python tools/test_ntrip_connect.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import asyncio
+import errno
+import socket
+import time
+import types
+
+import gnss.gnss_ntripclient as ntripclient
+from ntrip_caster import Caster, start_client
+
+
+class Lookups:
+    """
+    usocket stand-in counting getaddrinfo() calls, optionally failing every connect().
+    """
+
+    def __init__(self, unreachable: bool = False):
+        self.count = 0
+        self.module = types.SimpleNamespace(**vars(socket))
+        self.module.getaddrinfo = self._getaddrinfo
+        if unreachable:
+            self.module.socket = self._socket
+
+    def _getaddrinfo(self, host, port):
+        self.count += 1
+        return socket.getaddrinfo(host, port)
+
+    @staticmethod
+    def _socket(*args):
+        sock = socket.socket(*args)
+
+        def connect(addr):
+            sock.close()
+            raise OSError(errno.EHOSTUNREACH, "host unreachable")
+
+        return types.SimpleNamespace(setblocking=sock.setblocking, connect=connect, close=sock.close)
+
+
+async def _attempts(caster: Caster, lookups: Lookups, seconds: float) -> dict:
+    """
+    :return: client status after seconds
+    :rtype: dict
+    """
+    await caster.start()
+    ntripclient.usocket = lookups.module
+    try:
+        client, _, task = await start_client(caster)
+        ntripclient.HEADER_TIMEOUT = 100
+        await asyncio.sleep(1 + seconds)
+        task.cancel()
+    finally:
+        ntripclient.usocket = socket
+        caster.close()
+    await asyncio.sleep(0)
+    return client.status
+
+
+async def _no_header(caster, reader, writer):
+    await asyncio.sleep(3600)
+
+
+def _assert_resolved_again(lookups: Lookups, status: dict):
+    # resolved on the first attempt and after every DNS_RETRIES failures,
+    # the attempt after the last failure may have been started already
+    failures = status["reconnects"]
+    assert 1 + (failures - 1) // ntripclient.DNS_RETRIES <= lookups.count <= 1 + failures // ntripclient.DNS_RETRIES
+
+
+def test_unreachable_host_is_resolved_again():
+    lookups = Lookups(unreachable=True)
+    status = asyncio.run(_attempts(Caster(_no_header), lookups, 1.5))
+    assert status["connects"] == 0 and status["reconnects"] >= 6
+    assert "EHOSTUNREACH" in status["lastError"] or "113" in status["lastError"]
+    _assert_resolved_again(lookups, status)
+
+
+def test_header_timeout_is_resolved_again():
+    lookups = Lookups()
+    status = asyncio.run(_attempts(Caster(_no_header), lookups, 1.5))
+    assert status["connects"] >= 4 and status["lastError"] == "timeout"
+    _assert_resolved_again(lookups, status)
+
+
+async def _probe(seconds: float) -> tuple:
+    """
+    Connect to a listener whose accept queue is full, the SYN is never answered.
+
+    :return: tuple of (ticker delays in ms, client status)
+    :rtype: tuple
+    """
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)
+    port = listener.getsockname()[1]
+    backlog = []
+    for _ in range(4):
+        sock = socket.socket()
+        sock.setblocking(False)
+        try:
+            sock.connect(("127.0.0.1", port))
+        except BlockingIOError:
+            pass
+        backlog.append(sock)
+    await asyncio.sleep(0.2)
+    caster = types.SimpleNamespace(port=port)
+    client, _, task = await start_client(caster)
+    delays = []
+    end = time.monotonic() + 1 + seconds
+    while time.monotonic() < end:
+        t = time.monotonic()
+        await asyncio.sleep(0.005)
+        delays.append((time.monotonic() - t - 0.005) * 1000)
+    task.cancel()
+    for sock in backlog + [listener]:
+        sock.close()
+    delays.sort()
+    return delays, client.status
+
+
+def test_loop_keeps_running_while_connecting():
+    delays, status = asyncio.run(_probe(1.5))
+    assert status["connects"] == 0 and status["lastError"] == "timeout"
+    assert delays[-1] < 50
+
+
+def main():
+    out = hostenv.mute()
+    delays, status = asyncio.run(_probe(3))
+    out("connect to a host not answering the SYN: %d ticks of 5 ms, late by max %.1f ms, p99 %.1f ms, "
+        "connects %d, lastError %s"
+        % (len(delays), delays[-1], delays[len(delays) * 99 // 100], status["connects"], status["lastError"]))
+
+
+if __name__ == "__main__":
+    main()
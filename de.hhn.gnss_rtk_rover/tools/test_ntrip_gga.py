@@ -0,0 +1,119 @@
+"""
+GGA task of GNSSNTRIPClient against a stand-in caster (user-021).
+
+The GGA sentences go to the caster from their own task: the RTCM3
+forwarding must show no gaps while they are sent, and a failed GGA send
+must end the connection at once instead of after the stall timeout.
+
+Run with pytest, or directly for the forwarding gaps and the reconnect time:
+python tools/test_ntrip_gga.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # must come first
+
+import asyncio
+import errno
+import time
+
+import gnss.gnss_ntripclient as ntripclient
+from gnss.rtcm_filter import RTCMFilter
+from ntrip_caster import Caster, silent_after, start_client, streaming
+from serial_communication.uart_reader import UartReader
+from utils.broadcast import Broadcast
+
+
+class WriteTimes:
+    """
+    machine.UART stand-in recording when corrections are written.
+    """
+
+    def __init__(self):
+        self.times = []
+
+    def write(self, buf):
+        self.times.append(time.monotonic())
+        return len(buf)
+
+
+async def _position():
+    UartReader.initialize(None, None, Broadcast(), Broadcast())
+    await UartReader._handle_nmea(memoryview(bytearray(hostenv.GGA)))
+
+
+async def _gaps(seconds: float) -> tuple:
+    """
+    :return: tuple of (gaps between correction writes in ms, GGA sentences received by the caster)
+    :rtype: tuple
+    """
+    RTCMFilter.initialize()
+    await _position()
+    ntripclient.GGA_INTERVAL = 0.2
+    caster = Caster(streaming())
+    await caster.start()
+    client, _, task = await start_client(caster, stall=5)
+    uart = WriteTimes()
+    client._output.s = uart
+    await asyncio.sleep(1 + seconds)
+    task.cancel()
+    caster.close()
+    await asyncio.sleep(0)
+    times = uart.times[2:]
+    return [(b - a) * 1000 for a, b in zip(times, times[1:])], len(caster.gga)
+
+
+def test_gga_leaves_no_forwarding_gaps():
+    gaps, gga = asyncio.run(_gaps(2))
+    assert max(gaps) < 150  # epochs every 100 ms
+    assert gga >= 8
+
+
+async def _failed_gga() -> tuple:
+    """
+    The GGA send fails while the caster is silent.
+
+    :return: tuple of (connects, stalls, ms from the failure to the next connect)
+    :rtype: tuple
+    """
+    RTCMFilter.initialize()
+    await _position()
+    ntripclient.GGA_INTERVAL = 0.2
+    caster = Caster(silent_after(0.2), streaming())
+    await caster.start()
+    client, _, task = await start_client(caster, stall=5)
+    await asyncio.sleep(1.5)
+
+    async def reset():
+        raise OSError(errno.ECONNRESET, "connection reset")
+
+    client._swriter.drain = reset
+    failed = time.monotonic()
+    while client.status["connects"] < 2 and time.monotonic() - failed < 6:
+        await asyncio.sleep(0.01)
+    reconnect = (time.monotonic() - failed) * 1000
+    status = client.status
+    task.cancel()
+    caster.close()
+    await asyncio.sleep(0)
+    return status["connects"], status["stalls"], reconnect
+
+
+def test_failed_gga_reconnects_at_once():
+    connects, stalls, reconnect = asyncio.run(_failed_gga())
+    assert connects == 2 and stalls == 0
+    assert reconnect < 1000  # GGA interval + backoff, not the stall timeout
+
+
+def main():
+    out = hostenv.mute()
+    gaps, gga = asyncio.run(_gaps(5))
+    gaps.sort()
+    out("epochs every 100 ms, GGA every 200 ms: %d GGA sent, forwarding gap p50 %.0f ms, max %.0f ms"
+        % (gga, gaps[len(gaps) // 2], gaps[-1]))
+    _, _, reconnect = asyncio.run(_failed_gga())
+    out("failed GGA send on a silent stream: reconnected after %.0f ms (stall timeout 5000 ms)" % reconnect)
+
+
+if __name__ == "__main__":
+    main()
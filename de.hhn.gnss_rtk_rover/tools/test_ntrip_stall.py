@@ -0,0 +1,73 @@
+"""
+Stall detection of GNSSNTRIPClient against a stand-in caster (user-019).
+
+A stream whose frames are all dropped by the RTCM filter is alive and must
+not stall, a caster that goes silent must, and a dropped connection must
+be re-established. The stall timeout is shortened to 0.5 s.
+
+Run with pytest, or directly for the counters of each scenario:
+python tools/test_ntrip_stall.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import asyncio
+
+from gnss.rtcm_filter import RTCMFilter
+from ntrip_caster import Caster, EPOCH, silent_after, start_client, streaming
+
+
+async def _scenario(caster: Caster, seconds: float, deny: list = None) -> tuple:
+    """
+    :return: tuple of (client status, rtcm stats, bytes forwarded to the receiver)
+    :rtype: tuple
+    """
+    RTCMFilter.initialize(deny=deny)
+    await caster.start()
+    client, uart, task = await start_client(caster)
+    await asyncio.sleep(1 + seconds)  # run() starts after one poll of the stop event
+    task.cancel()
+    caster.close()
+    await asyncio.sleep(0)
+    return client.status, client.rtcm_stats, b"".join(uart.written)
+
+
+def test_filtered_stream_does_not_stall():
+    status, stats, forwarded = asyncio.run(_scenario(Caster(streaming()), 1.5, deny=[1077, 1005]))
+    assert status["stalls"] == 0 and status["connects"] == 1
+    assert stats["received"] > 20 and stats["frames"] == 0
+    assert forwarded == b""
+
+
+def test_silent_caster_stalls():
+    caster = Caster(silent_after(0.3), streaming())
+    status, stats, forwarded = asyncio.run(_scenario(caster, 1.5))
+    assert status["stalls"] == 1 and status["connects"] == 2
+    assert status["state"] == "streaming"
+    assert forwarded and len(forwarded) % len(EPOCH) == 0
+
+
+def test_dropped_connection_reconnects():
+    caster = Caster(streaming(0.3))
+    status, stats, forwarded = asyncio.run(_scenario(caster, 1.5))
+    assert status["stalls"] == 0 and status["connects"] >= 3
+    assert status["lastError"] == "closed"
+    assert forwarded == EPOCH * (len(forwarded) // len(EPOCH))
+
+
+def main():
+    out = hostenv.mute()
+    for name, caster, deny in (
+        ("all frames filtered", Caster(streaming()), [1077, 1005]),
+        ("silent after 0.3 s", Caster(silent_after(0.3)), None),
+        ("closed after 0.3 s", Caster(streaming(0.3)), None),
+    ):
+        status, stats, forwarded = asyncio.run(_scenario(caster, 2, deny))
+        out("%-20s connects %d  stalls %d  lastError %-8s  received %3d frames  forwarded %5d B"
+            % (name, status["connects"], status["stalls"], status["lastError"], stats["received"], len(forwarded)))
+
+
+if __name__ == "__main__":
+    main()
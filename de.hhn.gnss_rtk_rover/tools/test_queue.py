@@ -0,0 +1,168 @@
+"""
+Ring buffer Queue (user-009).
+
+Checks FIFO order, overwrite-oldest, blocking put on a full queue and that
+a wake-up meant for a cancelled waiter is passed on to the next one.
+
+Run with pytest, or directly for put/get pairs per second and task
+wake-ups per item of the original list based queue and the ring buffer,
+with 1..4 producers and 1..16 consumers. Every Event.wait() allocates a
+Future on CPython, the wake-ups are the figure that carries over to the Pico:
+python tools/test_queue.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import time
+
+import uasyncio
+
+from utils.queue import Queue, QueueEmpty, QueueFull
+
+
+class LegacyQueue:
+    """
+    The original utils.queue.Queue (list, pop(0), Event set/clear per item).
+    """
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self._queue = []
+        self._evput = uasyncio.Event()
+        self._evget = uasyncio.Event()
+        self.wakeups = 0
+
+    async def get(self):
+        while not self._queue:
+            await self._evput.wait()
+            self.wakeups += 1
+        self._evget.set()
+        self._evget.clear()
+        return self._queue.pop(0)
+
+    async def put(self, val):
+        while 0 < self.maxsize <= len(self._queue):
+            await self._evget.wait()
+            self.wakeups += 1
+        self._evput.set()
+        self._evput.clear()
+        self._queue.append(val)
+
+
+class CountingQueue(Queue):
+    """
+    Queue counting the wake-ups of waiting tasks.
+    """
+
+    wakeups = 0
+
+    async def _wait(self, waiters):
+        await super()._wait(waiters)
+        self.wakeups += 1
+
+
+def test_fifo_and_growth():
+    async def run():
+        queue = Queue()
+        for i in range(100):
+            await queue.put(i)
+        assert [queue.get_nowait() for _ in range(100)] == list(range(100))
+        try:
+            queue.get_nowait()
+            assert False
+        except QueueEmpty:
+            pass
+
+    uasyncio.run(run())
+
+
+def test_overwrite_keeps_latest():
+    queue = Queue(maxsize=2, overwrite=True)
+    for i in range(5):
+        queue.put_nowait(i)
+    assert [queue.get_nowait(), queue.get_nowait()] == [3, 4]
+    assert queue.dropped == 3
+
+
+def test_put_blocks_when_full():
+    async def run():
+        queue = Queue(maxsize=1)
+        queue.put_nowait(1)
+        try:
+            queue.put_nowait(2)
+            assert False
+        except QueueFull:
+            pass
+        task = uasyncio.create_task(queue.put(2))
+        await uasyncio.sleep(0)
+        assert not task.done()
+        assert queue.get_nowait() == 1
+        await uasyncio.sleep(0)
+        assert task.done() and queue.get_nowait() == 2
+
+    uasyncio.run(run())
+
+
+def test_wake_up_of_cancelled_waiter_is_passed_on():
+    async def run():
+        queue = Queue(maxsize=1)
+        first = uasyncio.create_task(queue.get())
+        second = uasyncio.create_task(queue.get())
+        await uasyncio.sleep(0)
+        queue.put_nowait("x")  # wakes first
+        first.cancel()
+        await uasyncio.sleep(0)
+        await uasyncio.sleep(0)
+        assert second.done() and second.result() == "x"
+
+    uasyncio.run(run())
+
+
+async def _pairs(queue, producers: int, consumers: int, count: int = 20000) -> tuple:
+    """
+    :return: tuple of (put/get pairs per second, wake-ups per item)
+    :rtype: tuple
+    """
+    got = 0
+    per_producer = count // producers
+
+    async def produce():
+        for i in range(per_producer):
+            await queue.put(i)
+
+    async def consume():
+        nonlocal got
+        while True:
+            await queue.get()
+            got += 1
+
+    tasks = [uasyncio.create_task(consume()) for _ in range(consumers)]
+    t = time.perf_counter()
+    await uasyncio.gather(*[produce() for _ in range(producers)])
+    while got < per_producer * producers:
+        await uasyncio.sleep(0)
+    rate = got / (time.perf_counter() - t)
+    for task in tasks:
+        task.cancel()
+    return rate, queue.wakeups / got
+
+
+async def _bench(out):
+    for producers, consumers in ((1, 1), (1, 4), (4, 4), (4, 16)):
+        legacy = await _pairs(LegacyQueue(5), producers, consumers)
+        ring = await _pairs(CountingQueue(5), producers, consumers)
+        out(
+            "%d producers %2d consumers  list %7.0f pairs/s %5.2f wake-ups/item  ring %7.0f pairs/s %5.2f wake-ups/item"
+            % ((producers, consumers) + legacy + ring)
+        )
+
+
+def main():
+    out = hostenv.mute()
+    uasyncio.run(_bench(out))
+
+
+if __name__ == "__main__":
+    main()
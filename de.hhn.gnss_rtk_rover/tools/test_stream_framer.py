@@ -0,0 +1,128 @@
+"""
+Fuzz and resync tests of StreamFramer (user-002).
+
+A capture of UBX, NMEA and RTCM3 frames is corrupted (flipped bytes,
+truncated frames, bogus lengths) and fed in random chunk sizes. Every
+intact frame must come out at its offset in the capture, and a run of
+corrupt frames must be counted once.
+
+Run with pytest, or directly for resync delay and throughput:
+python tools/test_stream_framer.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import random
+import time
+
+from gnss.ubx_message import UBXMessage
+from serial_communication.stream_framer import StreamFramer
+
+FRAMES = (
+    hostenv.GGA,
+    hostenv.nmea("GNRMC,123519.00,A,5037.7604409,N,00912.3456789,E,0.004,,171026,,,R,V"),
+    UBXMessage("CFG", "CFG-RATE", 1, measRate=100, navRate=1, timeRef=1).serialize(),
+    UBXMessage(b"\x01", b"\x07", 0, payload=bytes(range(92))).serialize(),
+    hostenv.rtcm3(1005, 19),
+    hostenv.rtcm3(1077, 300),
+)
+TAIL = 20  # intact frames at the end of a capture, more than any corrupt length claims
+
+
+def capture(seed: int, count: int, corrupt: float = 0.15) -> tuple:
+    """
+    Build a fuzzed capture.
+
+    :param int seed: random seed
+    :param int count: number of frames
+    :param float corrupt: share of flipped or truncated frames
+    :return: tuple of (capture, [(offset, frame) of the intact frames], number of corrupt runs)
+    :rtype: tuple
+    """
+    rnd = random.Random(seed)
+    data = bytearray()
+    intact = []
+    runs = 0
+    broken = False
+    for i in range(count):
+        frame = bytearray(rnd.choice(FRAMES))
+        # errors count from the first valid frame on, the tail is left intact so
+        # that the length a cut frame claims is always completed by later data
+        if 0 < i < count - TAIL and rnd.random() < corrupt:
+            if rnd.random() < 0.5:  # flipped byte, not the sync byte: detected at the frame start
+                frame[rnd.randrange(1, len(frame))] ^= 0xFF
+            else:
+                frame = frame[:rnd.randrange(1, len(frame))]
+            runs += not broken
+            broken = True
+        else:
+            intact.append((len(data), bytes(frame)))
+            broken = False
+        data += frame
+    return bytes(data), intact, runs
+
+
+def frame_all(data: bytes, seed: int, size: int = 4096) -> tuple:
+    """
+    Feed data in random chunks of 1..300 bytes.
+
+    :return: tuple of (framer, [(offset, frame, bytes fed after the frame end when it was emitted)])
+    :rtype: tuple
+    """
+    rnd = random.Random(seed)
+    framer = StreamFramer(size)
+    out = []
+    pos = 0
+    while pos < len(data):
+        pos += framer.feed(data[pos:pos + rnd.randint(1, 300)])
+        while True:
+            frame = framer.next_frame()
+            if frame is None:
+                break
+            end = pos - framer.pending
+            out.append((end - len(frame[1]), bytes(frame[1]), pos - end))
+    return framer, out
+
+
+def test_mixed_frames_in_random_chunks():
+    data, intact, _ = capture(1, 2000, corrupt=0)
+    framer, out = frame_all(b"\x00garbage" + data, 2)
+    assert [(o - 8, f) for o, f, _ in out] == intact
+    assert framer.errors == 0
+
+
+def test_fuzzed_capture_recovers_every_intact_frame():
+    for seed in range(5):
+        data, intact, runs = capture(seed, 3000)
+        framer, out = frame_all(data, seed)
+        assert [(o, f) for o, f, _ in out] == intact
+        assert framer.errors == runs
+
+
+def test_bogus_length_delays_but_loses_nothing():
+    bogus = b"\xb5\x62\x01\x07\xb8\x0b"  # NAV-PVT header claiming 3000 bytes
+    data = hostenv.GGA + bogus + hostenv.GGA * 60
+    framer, out = frame_all(data, 3)
+    assert len(out) == 61
+    assert max(delay for _, _, delay in out) < 3000
+    assert framer.errors == 1
+
+
+def main():
+    out = hostenv.mute()
+    data, intact, runs = capture(7, 20000)
+    t = time.perf_counter()
+    framer, frames = frame_all(data, 7)
+    dt = time.perf_counter() - t
+    delays = sorted(d for _, _, d in frames)
+    out("%d bytes, %d frames, %d intact recovered, %d corrupt runs, %d counted"
+        % (len(data), 20000, len(frames), runs, framer.errors))
+    out("resync: intact frames lost %d, emitted after the frame end: median %d B, max %d B"
+        % (len(intact) - len(frames), delays[len(delays) // 2], delays[-1]))
+    out("throughput %.0f kB/s, %.0f frames/s" % (len(data) / dt / 1000, len(frames) / dt))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+UbxDispatcher against a simulated receiver (user-011).
+
+The receiver takes the requests from the UART writer queue one at a time
+and answers each after a service time, in order like the real one: CFG
+polls with the response and a trailing ACK-ACK, NAV polls with the
+response, settings with ACK-ACK or ACK-NAK. Answers can be delayed past
+the request timeout or lost.
+
+Run with pytest, or directly for the request latency with 1, 4 and 8
+concurrent callers:
+python tools/test_ubx_dispatcher.py
+The gc.collect() of every UBXMessage is left out, on CPython it would
+add milliseconds per message of the simulation to the latency.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import time
+import types
+
+import uasyncio
+
+import gnss.ubx_message
+from gnss.msg_dictionaries.ubxtypes_core import GET, SET
+from gnss.ubx_message import UBXMessage
+from serial_communication.ubx_dispatcher import UbxDispatcher
+from utils.queue import Queue
+
+gnss.ubx_message.gc = types.SimpleNamespace(collect=lambda: None)
+SERVICE = 5  # ms the receiver needs per request
+TIMEOUT = 100
+
+
+class Receiver:
+    """
+    Simulated GNSS receiver.
+    """
+
+    def __init__(self, msg_q: Queue):
+        self.msg_q = msg_q
+        self.delays = {}  # number of the request -> service time in ms, default SERVICE
+        self.lost = set()  # numbers of the requests that get no answer
+        self.nak = set()  # raw settings the receiver rejects
+        self.received = 0
+        self._task = uasyncio.create_task(self._run())
+
+    @staticmethod
+    def _ack(raw: bytes, msg_id: bytes) -> UBXMessage:
+        return UBXMessage(b"\x05", msg_id, GET, clsID=raw[2], msgID=raw[3])
+
+    def _answers(self, raw: bytes) -> list:
+        msg_cls, msg_id, length = raw[2], raw[3], raw[4] | raw[5] << 8
+        if msg_cls == 0x06 and msg_id == 0x08 and length == 0:  # CFG-RATE poll
+            return [UBXMessage(b"\x06", b"\x08", GET, measRate=1000, navRate=1, timeRef=1), self._ack(raw, b"\x01")]
+        if msg_cls == 0x01:  # NAV poll
+            return [UBXMessage(b"\x01", bytes((msg_id,)), GET)]
+        return [self._ack(raw, b"\x00" if raw in self.nak else b"\x01")]
+
+    async def _run(self):
+        while True:
+            raw = await self.msg_q.get()
+            self.received += 1
+            await uasyncio.sleep_ms(self.delays.get(self.received, SERVICE))
+            if self.received in self.lost:
+                continue
+            for msg in self._answers(raw):
+                UbxDispatcher.dispatch(msg)
+
+    def stop(self):
+        self._task.cancel()
+
+
+def _start() -> Receiver:
+    msg_q = Queue(5)
+    UbxDispatcher.initialize(None, msg_q, timeout=TIMEOUT, retries=2)
+    return Receiver(msg_q)
+
+
+def _rate(measrate: int) -> UBXMessage:
+    return UBXMessage("CFG", "CFG-RATE", SET, measRate=measrate, navRate=1, timeRef=1)
+
+
+def _identity(msg: UBXMessage) -> tuple:
+    return (msg.msg_cls[0], msg.msg_id[0])
+
+
+REQUESTS = (  # request, wait for an acknowledge, class / id of the answer
+    (lambda: UBXMessage("CFG", "CFG-RATE", GET), False, (0x06, 0x08)),
+    (lambda: UBXMessage("NAV", "NAV-PVT", GET), False, (0x01, 0x07)),
+    (lambda: UBXMessage("NAV", "NAV-STATUS", GET), False, (0x01, 0x03)),
+    (lambda: _rate(1000), True, (0x05, 0x01)),
+)
+
+
+async def _callers(callers: int, count: int) -> tuple:
+    """
+    :return: tuple of (sorted latencies in ms, number of wrong answers, requests/s)
+    :rtype: tuple
+    """
+    latencies = []
+    wrong = 0
+
+    async def caller(k):
+        nonlocal wrong
+        for j in range(count):
+            request, ack, expected = REQUESTS[(k + j) % len(REQUESTS)]
+            t = time.perf_counter()
+            res = await UbxDispatcher.request(request(), ack=ack)
+            latencies.append((time.perf_counter() - t) * 1000)
+            if res is None or _identity(res) != expected:
+                wrong += 1
+
+    t = time.perf_counter()
+    await uasyncio.gather(*[caller(k) for k in range(callers)])
+    rate = len(latencies) / (time.perf_counter() - t)
+    latencies.sort()
+    return latencies, wrong, rate
+
+
+def test_concurrent_callers_get_their_answers():
+    async def run():
+        receiver = _start()
+        for callers in (1, 4, 8):
+            _, wrong, _ = await _callers(callers, 8)
+            assert wrong == 0, callers
+        receiver.stop()
+        assert UbxDispatcher.timeouts == 0
+        await uasyncio.sleep_ms(2 * TIMEOUT)  # sends retried under load are overdue now
+        assert UbxDispatcher.pending() == 0
+
+    uasyncio.run(run())
+
+
+def test_late_ack_is_not_taken_by_the_next_valset():
+    async def run():
+        receiver = _start()
+        receiver.delays[1] = 150  # first send of the first VALSET, timeout is 100 ms
+        second = _rate(200)
+        receiver.nak.add(second.serialize())
+        first = await UbxDispatcher.request(_rate(1000), ack=True)
+        assert _identity(first) == (0x05, 0x01)  # late ACK of the first send
+        res = await UbxDispatcher.request(second, ack=True)
+        assert _identity(res) == (0x05, 0x00)  # not the ACK of the retried first VALSET
+        assert receiver.received == 3
+        receiver.stop()
+
+    uasyncio.run(run())
+
+
+def test_lost_answer_expires():
+    async def run():
+        receiver = _start()
+        receiver.lost.add(1)
+        res = await UbxDispatcher.request(_rate(1000), ack=True)
+        assert _identity(res) == (0x05, 0x01)  # answer to the retry
+        await uasyncio.sleep_ms(2 * TIMEOUT)  # the lost answer is overdue now
+        second = _rate(200)
+        receiver.nak.add(second.serialize())
+        t = time.perf_counter()
+        res = await UbxDispatcher.request(second, ack=True)
+        assert _identity(res) == (0x05, 0x00)
+        assert time.perf_counter() - t < TIMEOUT / 1000  # answered by the first send
+        receiver.stop()
+
+    uasyncio.run(run())
+
+
+async def _bench(out):
+    for callers in (1, 4, 8):
+        receiver = _start()
+        latencies, wrong, rate = await _callers(callers, 30)
+        receiver.stop()
+        out(
+            "%d callers  %3d requests  %3d sends  wrong %d  mean %5.1f ms  p95 %5.1f ms  %4.0f requests/s  timeouts %d"
+            % (
+                callers,
+                len(latencies),
+                receiver.received,
+                wrong,
+                sum(latencies) / len(latencies),
+                latencies[len(latencies) * 95 // 100],
+                rate,
+                UbxDispatcher.timeouts,
+            )
+        )
+
+
+def main():
+    out = hostenv.mute()
+    uasyncio.run(_bench(out))
+
+
+if __name__ == "__main__":
+    main()
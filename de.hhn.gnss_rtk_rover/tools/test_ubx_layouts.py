@@ -0,0 +1,106 @@
+"""
+Precompiled struct layouts vs attribute by attribute parsing (user-004).
+
+Every output message of ubxtypes_get is parsed from random payloads with
+the struct layout (UBXMessage._do_unpack) and with the original parsing
+(UBXMessage._do_attributes); both must set the same attributes.
+
+Run with pytest, or directly for the speedup per message:
+python tools/test_ubx_layouts.py
+The gc.collect() each message runs is left out, it costs both paths the
+same and dominates the time on CPython.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import math
+import random
+import struct
+import time
+import types
+
+import gnss.msg_dictionaries.ubxtypes_core as ubt
+import gnss.msg_dictionaries.ubxtypes_get as ubg
+from gnss.msg_dictionaries.ubxlayouts import get_layout
+import gnss.ubx_message
+from gnss.ubx_message import UBXMessage
+
+gnss.ubx_message.gc = types.SimpleNamespace(collect=lambda: None)
+_unpack = UBXMessage._do_unpack
+
+
+def _legacy(self, payload: bytes):
+    self._do_attributes(payload=payload)
+
+
+def _parse(cls, mid, payload, parsebf: bool, legacy: bool) -> UBXMessage:
+    UBXMessage._do_unpack = _legacy if legacy else _unpack
+    try:
+        return UBXMessage(cls, mid, 0, payload=payload, parsebitfield=parsebf)
+    finally:
+        UBXMessage._do_unpack = _unpack
+
+
+def _attributes(msg: UBXMessage) -> dict:
+    # NaN != NaN, compare the float bits instead
+    return {
+        name: struct.pack("<d", val) if isinstance(val, float) and math.isnan(val) else val
+        for name, val in ((name, getattr(msg, name)) for name in msg._attribute_names())
+    }
+
+
+def _payloads(pdict: dict, parsebf: bool, rnd: random.Random):
+    layout = get_layout(pdict, parsebf)
+    for _ in range(3):
+        if layout is None or layout[2] is None:
+            yield rnd.randbytes(rnd.randint(0, 60))
+            continue
+        payload = rnd.randbytes(struct.calcsize(layout[2]))
+        if layout[1] is not None:
+            payload += rnd.randbytes(layout[1][2] * rnd.randint(0, 5))
+        yield payload
+
+
+def test_layouts_equal_legacy_parsing():
+    rnd = random.Random(1)
+    msgids = {name: key for key, name in ubt.UBX_MSGIDS.items()}
+    checked = 0
+    for name, pdict in ubg.UBX_PAYLOADS_GET.items():
+        if name not in msgids or name == "CFG-VALGET":  # CFG-VALGET: test_ubx_lazy.py
+            continue
+        cls, mid = msgids[name][0:1], msgids[name][1:2]
+        for parsebf in (True, False):
+            for payload in _payloads(pdict, parsebf, rnd):
+                try:
+                    legacy = _parse(cls, mid, payload, parsebf, True)
+                except Exception:  # the legacy parser rejects the random payload
+                    continue
+                msg = _parse(cls, mid, payload, parsebf, False)
+                assert _attributes(msg) == _attributes(legacy), (name, parsebf)
+                assert msg.serialize() == legacy.serialize(), name
+                checked += 1
+    assert checked > 50
+
+
+def main():
+    out = hostenv.mute()
+    rnd = random.Random(2)
+    for name, cls, mid, payload, count in (
+        ("NAV-PVT", b"\x01", b"\x07", rnd.randbytes(92), 2000),
+        ("NAV-STATUS", b"\x01", b"\x03", rnd.randbytes(16), 2000),
+        ("ACK-ACK", b"\x05", b"\x01", b"\x06\x08", 2000),
+        ("NAV-SAT 42", b"\x01", b"\x35", bytes((1, 2, 3, 4, 1, 42, 0, 0)) + rnd.randbytes(12 * 42), 300),
+    ):
+        usec = []
+        for legacy in (True, False):
+            t = time.perf_counter()
+            for _ in range(count):
+                _parse(cls, mid, payload, True, legacy)
+            usec.append((time.perf_counter() - t) / count * 1e6)
+        out("%-10s legacy %7.1f µs  struct %7.1f µs  x%.1f" % (name, usec[0], usec[1], usec[0] / usec[1]))
+
+
+if __name__ == "__main__":
+    main()
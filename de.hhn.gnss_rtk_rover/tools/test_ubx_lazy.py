@@ -0,0 +1,96 @@
+"""
+Lazy vs eager UBXMessage (user-003).
+
+A lazy message decodes attributes on access from the raw payload. It must
+show the same attributes, str() and serialisation as an eager one for
+NAV-PVT, NAV-SAT, CFG-VALGET and the small CFG / ACK frames.
+
+Run with pytest, or directly for the time and heap per message:
+python tools/test_ubx_lazy.py
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+import hostenv  # noqa: F401, must come first
+
+import random
+import struct
+import time
+import tracemalloc
+
+from gnss.ubx_message import UBXMessage
+
+_rnd = random.Random(3)
+NAV_SAT_SVS = 42
+FRAMES = {
+    "NAV-PVT": (b"\x01", b"\x07", _rnd.randbytes(92)),
+    "NAV-SAT": (b"\x01", b"\x35", bytes((1, 2, 3, 4, 1, NAV_SAT_SVS, 0, 0)) + _rnd.randbytes(12 * NAV_SAT_SVS)),
+    "CFG-VALGET": (
+        b"\x06",
+        b"\x8b",
+        bytes((1, 0, 0, 0))
+        + struct.pack("<IB", 0x1031001F, 1)  # CFG_SIGNAL_GPS_ENA
+        + struct.pack("<IB", 0x10310021, 0)  # CFG_SIGNAL_GAL_ENA
+        + struct.pack("<II", 0x40530001, 38400)  # CFG_UART2_BAUDRATE
+        + struct.pack("<IB", 0x10310099, 1),  # unknown key
+    ),
+    "ACK-ACK": (b"\x05", b"\x01", b"\x06\x8a"),
+    "CFG-RATE": (b"\x06", b"\x08", b"\x64\x00\x01\x00\x01\x00"),
+    "CFG-NMEA": (b"\x06", b"\x17", _rnd.randbytes(20)),
+}
+
+
+def _attributes(msg: UBXMessage) -> dict:
+    return {name: getattr(msg, name) for name in msg._attribute_names()}
+
+
+def test_lazy_equals_eager():
+    for name, (cls, mid, payload) in FRAMES.items():
+        eager = UBXMessage(cls, mid, 0, payload=payload)
+        lazy = UBXMessage(cls, mid, 0, payload=payload, lazy=True)
+        assert _attributes(lazy) == _attributes(eager), name
+        assert str(lazy) == str(eager), name
+        assert lazy.serialize() == eager.serialize(), name
+
+
+def test_lazy_decodes_on_access():
+    cls, mid, payload = FRAMES["NAV-SAT"]
+    msg = UBXMessage(cls, mid, 0, payload=payload, lazy=True)
+    assert "numSvs" not in msg.__dict__
+    assert msg.numSvs == NAV_SAT_SVS
+    assert msg.svId_42 == payload[8 + 41 * 12 + 1]
+    cls, mid, payload = FRAMES["CFG-VALGET"]
+    msg = UBXMessage(cls, mid, 0, payload=payload, lazy=True)
+    assert (msg.CFG_SIGNAL_GPS_ENA, msg.CFG_SIGNAL_GAL_ENA, msg.CFG_UART2_BAUDRATE) == (1, 0, 38400)
+
+
+def _measure(cls, mid, payload, lazy: bool, field: str) -> tuple:
+    """
+    :return: tuple of (µs per message with one attribute read, heap peak in bytes)
+    :rtype: tuple
+    """
+    count = 500
+    t = time.perf_counter()
+    for _ in range(count):
+        getattr(UBXMessage(cls, mid, 0, payload=payload, lazy=lazy), field)
+    usec = (time.perf_counter() - t) / count * 1e6
+    tracemalloc.start()
+    msg = UBXMessage(cls, mid, 0, payload=payload, lazy=lazy)
+    getattr(msg, field)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return usec, peak
+
+
+def main():
+    out = hostenv.mute()
+    out("eager runs gc.collect() per message as on the Pico, which dominates its time on CPython")
+    for name, field in (("NAV-PVT", "hAcc"), ("NAV-SAT", "cno_01"), ("CFG-VALGET", "CFG_SIGNAL_GPS_ENA")):
+        cls, mid, payload = FRAMES[name]
+        eager = _measure(cls, mid, payload, False, field)
+        lazy = _measure(cls, mid, payload, True, field)
+        out("%-10s read %-18s eager %8.1f µs %6d B   lazy %6.1f µs %6d B" % ((name, field) + eager + lazy))
+
+
+if __name__ == "__main__":
+    main()
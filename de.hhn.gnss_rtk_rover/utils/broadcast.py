@@ -0,0 +1,133 @@
+"""
+Broadcast class.
+
+Publish/subscribe bus for values where only the latest one matters
+(e.g. the position of the current navigation epoch).
+Every subscriber has its own latest value slot and sequence number, so any
+number of consumers can follow the same producer without taking values
+away from each other. A slow subscriber skips values instead of queueing them.
+
+Created on 17 Oct 2026
+:author: vdueck
+"""
+
+import uasyncio as asyncio
+
+
+class Subscriber:
+    """
+    Subscriber class.
+    """
+
+    __slots__ = ("value", "seq", "_read", "_event", "_bus")
+
+    def __init__(self, bus):
+        """Constructor.
+
+        :param Broadcast bus: the bus to subscribe to
+        """
+
+        self.value = bus.value  # latest value
+        self.seq = bus.seq  # sequence number of the latest value, 0 = none yet
+        self._read = 0  # sequence number of the last value returned by next()
+        self._event = asyncio.Event()
+        self._bus = bus
+
+    def _deliver(self, value, seq: int):
+        """
+        Put a new value into the slot and wake the subscriber.
+        """
+        self.value = value
+        self.seq = seq
+        self._event.set()
+
+    async def next(self, after: int = -1):
+        """
+        ASYNC: Wait for a value newer than a sequence number.
+
+        :param int after: sequence number, -1 for the last value returned by next()
+        :return: the latest value
+        :rtype: object
+        """
+        if after < 0:
+            after = self._read
+        while self.seq <= after:
+            self._event.clear()
+            await self._event.wait()
+        if self._read and self.seq > self._read + 1:  # values published while the subscriber was busy
+            self._bus.skipped += self.seq - self._read - 1
+        self._read = self.seq
+        return self.value
+
+    def close(self):
+        """
+        Stop receiving values.
+        """
+        self._bus.unsubscribe(self)
+
+
+class Broadcast:
+    """
+    Broadcast class.
+    """
+
+    def __init__(self):
+        """Constructor."""
+
+        self.value = None
+        self.seq = 0
+        self.skipped = 0  # number of values not seen by a subscriber, summed over all subscribers
+        self._subscribers = []
+
+    def subscribe(self) -> Subscriber:
+        """
+        Subscribe to the bus, call close() on the subscriber when done.
+
+        :return: subscriber, holding the latest value (if any) as already published
+        :rtype: Subscriber
+        """
+        sub = Subscriber(self)
+        self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        """
+        :param Subscriber sub: the subscriber to remove
+        """
+        if sub in self._subscribers:
+            self._subscribers.remove(sub)
+
+    def publish(self, value):
+        """
+        Publish a value to all subscribers. Never blocks.
+
+        :param object value: the new value
+        """
+        self.seq += 1
+        self.value = value
+        seq = self.seq
+        for sub in self._subscribers:
+            sub._deliver(value, seq)
+
+    async def latest(self):
+        """
+        ASYNC: Get the latest value, wait for the first one if nothing was published yet.
+
+        :return: the latest value
+        :rtype: object
+        """
+        if self.seq:
+            return self.value
+        sub = self.subscribe()
+        try:
+            return await sub.next(0)
+        finally:
+            sub.close()
+
+    @property
+    def subscribers(self) -> int:
+        """
+        :return: number of subscribers
+        :rtype: int
+        """
+        return len(self._subscribers)
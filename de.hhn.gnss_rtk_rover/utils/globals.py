@@ -13,6 +13,27 @@ UART1_RX = 1
 BAUD_UART1 = 115200
 BAUD_UART2 = 38400
 
+# position source: True = UBX NAV-PVT / NAV-HPPOSLLH, False = NMEA-GGA
+UBX_INGEST = False
+
+# adaptive update rate: on/off, fastest and slowest rate in ms
+# off by default, the receiver stays at measRate of RECEIVER_PROFILE
+# RATE_MIN must be a rate the profile supports, 200 ms leaves a margin for RTK on 4 constellations
+RATE_AUTO = False
+RATE_MIN = 200
+RATE_MAX = 1000
+
+# receiver configuration applied at startup, see GnssHandler.apply_profile()
+RECEIVER_PROFILE = {
+    "measRate": 1000,
+    "navRate": 1,
+    "signals": {"GPS": 1, "GAL": 1, "GLO": 1, "BDS": 1},
+    "nmea": {"GGA": 1},
+    "ubx": {"NAV-PVT": 1},
+    "highprec": 1,
+    "uart2Baud": BAUD_UART2,
+}
+
 # WiFi
 WIFI_SSID = "gnss_rover_ap"
 WIFI_PW = "ai_hhn_2022"
@@ -26,3 +47,18 @@ NTRIP_SERVER = ""
 OUTPORT_NTRIP = 2101
 MOUNTPOINT = ""
 GGA_INTERVAL = 5
+NTRIP_STALL_TIMEOUT = 10  # reconnect after this many seconds without RTCM3 frames
+
+# RTCM3 forwarding to UART2, see RTCMFilter
+RTCM_ALLOW = None  # message numbers to forward, None = all
+RTCM_DENY = ()  # message numbers to drop
+RTCM_INTERVALS = {  # message number -> minimum interval in ms
+    1005: 5000,  # station coordinates
+    1006: 5000,
+    1230: 5000,  # GLONASS code-phase biases
+    1019: 60000,  # ephemerides, the receiver decodes them from the sky as well
+    1020: 60000,
+    1042: 60000,
+    1045: 60000,
+    1046: 60000,
+}
@@ -6,6 +6,11 @@
 # Code is based on Paul Sokolovsky's work.
 # This is a temporary solution until uasyncio V3 gets an efficient official version
 
+# Items are kept in a fixed size ring buffer (head index + item count), so put and
+# get are O(1) and don't allocate. A bounded queue can overwrite its oldest item
+# instead of blocking ("latest value wins"). Blocked tasks wait on an Event of
+# their own and are woken one at a time in FIFO order.
+
 import uasyncio as asyncio
 
 
@@ -20,54 +25,97 @@ class QueueFull(Exception):
 
 class Queue:
 
-    def __init__(self, maxsize=0):
+    def __init__(self, maxsize=0, overwrite=False):
+        # maxsize <= 0: unbounded, the ring buffer grows when it is full
+        # overwrite: a put to a full queue drops the oldest item instead of blocking
         self.maxsize = maxsize
-        self._queue = []
-        self._evput = asyncio.Event()  # Triggered by put, tested by get
-        self._evget = asyncio.Event()  # Triggered by get, tested by put
+        self.overwrite = overwrite and maxsize > 0
+        self.dropped = 0  # Number of items dropped by overwrite
+        self._ring = [None] * (maxsize if maxsize > 0 else 8)
+        self._head = 0  # Index of the oldest item
+        self._count = 0  # Number of items in the ring
+        self._getters = []  # Events of tasks waiting on get, oldest first
+        self._putters = []  # Events of tasks waiting on put, oldest first
+        self._events = []  # Unused Events
+
+    @staticmethod
+    def _wake(waiters):  # Schedule the task waiting longest, if any
+        if waiters:
+            waiters.pop(0).set()
+
+    async def _wait(self, waiters):  # Suspend the current task until _wake() picks it
+        ev = self._events.pop() if self._events else asyncio.Event()
+        waiters.append(ev)
+        try:
+            await ev.wait()
+        except BaseException:  # Cancelled: don't swallow a wake-up meant for this task
+            if ev in waiters:
+                waiters.remove(ev)
+            elif ev.is_set():
+                self._wake(waiters)
+            raise
+        finally:
+            ev.clear()
+            self._events.append(ev)  # Reuse the Event for the next wait
+
+    def _grow(self):  # Double the capacity of an unbounded queue, oldest item first
+        size = len(self._ring)
+        self._ring = [self._ring[(self._head + i) % size] for i in range(size)] + [None] * size
+        self._head = 0
 
     def _get(self):
-        self._evget.set()  # Schedule all tasks waiting on get
-        self._evget.clear()
-        return self._queue.pop(0)
+        ring = self._ring
+        val = ring[self._head]
+        ring[self._head] = None  # Don't keep a reference to the item
+        self._head = (self._head + 1) % len(ring)
+        self._count -= 1
+        self._wake(self._putters)
+        return val
 
     async def get(self):  #  Usage: item = await queue.get()
-        while self.empty():  # May be multiple tasks waiting on get()
+        while self._count == 0:
             # Queue is empty, suspend task until a put occurs
-            # 1st of N tasks gets, the rest loop again
-            await self._evput.wait()
+            await self._wait(self._getters)
         return self._get()
 
     def get_nowait(self):  # Remove and return an item from the queue.
         # Return an item if one is immediately available, else raise QueueEmpty.
-        if self.empty():
+        if self._count == 0:
             raise QueueEmpty()
         return self._get()
 
     def _put(self, val):
-        self._evput.set()  # Schedule tasks waiting on put
-        self._evput.clear()
-        self._queue.append(val)
+        ring = self._ring
+        if self._count == len(ring):
+            if self.overwrite:  # Drop the oldest item
+                ring[self._head] = val
+                self._head = (self._head + 1) % len(ring)
+                self.dropped += 1
+                return
+            self._grow()  # Only reached by unbounded queues
+            ring = self._ring
+        ring[(self._head + self._count) % len(ring)] = val
+        self._count += 1
+        self._wake(self._getters)
 
     async def put(self, val):  # Usage: await queue.put(item)
-        while self.full():
-            # Queue full
-            await self._evget.wait()
-            # Task(s) waiting to get from queue, schedule first Task
+        while self.full() and not self.overwrite:
+            # Queue full, suspend task until a get occurs
+            await self._wait(self._putters)
         self._put(val)
 
     def put_nowait(self, val):  # Put an item into the queue without blocking.
-        if self.full():
+        if self.full() and not self.overwrite:
             raise QueueFull()
         self._put(val)
 
     def qsize(self):  # Number of items in the queue.
-        return len(self._queue)
+        return self._count
 
     def empty(self):  # Return True if the queue is empty, False otherwise.
-        return len(self._queue) == 0
+        return self._count == 0
 
     def full(self):  # Return True if there are maxsize items in the queue.
         # Note: if the Queue was initialized with maxsize=0 (the default) or
         # any negative number, then full() is never True.
-        return self.maxsize > 0 and self.qsize() >= self.maxsize
+        return self.maxsize > 0 and self._count >= self.maxsize
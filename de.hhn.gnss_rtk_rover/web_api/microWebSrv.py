@@ -4,11 +4,23 @@ Copyright © 2018 Jean-Christophe Bos & HC² (www.hc2.fr)
 
 Modified to run asynchronous on 28 Nov 2022
 :author: vdueck
+
+HTTP/1.1 persistent connections: several (also pipelined) requests are served
+per connection until the client asks to close, the connection is idle for
+KeepAliveTimeout ms or MaxKeepAliveRequests were served. At most
+MaxConnections HTTP connections are served at once, WebSockets don't count.
+
+Static files are streamed in FileChunkSize chunks through one buffer shared by
+all connections. A precompressed "<file>.gz" is sent instead of "<file>" to
+clients accepting gzip, if there is only the ".gz" the others get a 406.
+LetCacheStaticContentLevel: 0 = no caching, 1 = ETag / Last-Modified and 304
+on unchanged files, 2 = also cacheable for StaticContentMaxAge s without asking.
 """
 
 
 from    json        import loads, dumps
 from    os          import stat
+from    time        import gmtime
 import  re
 
 import uasyncio
@@ -19,12 +31,13 @@ except :
     pass
 
 class MicroWebSrvRoute :
-    def __init__(self, route, method, func, routeArgNames, routeRegex) :
+    def __init__(self, route, method, func, routeArgNames, routeRegex, routeArgTypes=None) :
         self.route         = route        
         self.method        = method       
         self.func          = func         
         self.routeArgNames = routeArgNames
         self.routeRegex    = routeRegex   
+        self.routeArgTypes = routeArgTypes
 
 
 class MicroWebSrv :
@@ -159,25 +172,55 @@ class MicroWebSrv :
         self.WebSocketThreaded          = False
         self.AcceptWebSocketCallback    = None
         self.LetCacheStaticContentLevel = 2
+        self.StaticContentMaxAge        = 300   # s a browser may use a static file without asking, level 2
+        self.FileChunkSize              = 1460  # bytes read from a static file and sent at once
+        self.KeepAliveTimeout           = 5000  # ms a connection may be idle between requests
+        self.MaxKeepAliveRequests       = 100   # requests per connection
+        self.MaxConnections             = 4     # concurrent HTTP connections, more are answered with 503
+
+        self._connections   = 0
+        self._fileBuf       = None  # shared by all connections, a chunk is written before the next await
 
         self._routeHandlers = []
+        self._staticRoutes  = { }   # (method, path) -> func, routes without arguments
+        self._paramRoutes   = { }   # method -> [MicroWebSrvRoute], routes with arguments
         routeHandlers += self._docoratedRouteHandlers
         for route, method, func in routeHandlers :
+            method     = method.upper()
             routeParts = route.split('/')
-            # -> ['', 'users', '<uID>', 'addresses', '<addrID>', 'test', '<anotherID>']
+            # -> ['', 'users', '<int:uID>', 'addresses', '<addrID>', 'test', '<anotherID>']
             routeArgNames = []
+            routeArgTypes = []
+            routePath     = ''
             routeRegex    = ''
             for s in routeParts :
                 if s.startswith('<') and s.endswith('>') :
-                    routeArgNames.append(s[1:-1])
-                    routeRegex += '/(\\w*)'
+                    arg = s[1:-1].split(':')
+                    argName = arg[-1]
+                    argType = arg[0] if len(arg) > 1 else None
+                    if argType == 'int' :
+                        routeArgTypes.append(int)
+                        routeRegex += '/(-?\\d+)'
+                    elif not argType :
+                        routeArgTypes.append(None)
+                        routeRegex += '/(\\w*)'
+                    else :
+                        raise ValueError('Unknown type of route argument %s in %s' % (s, route))
+                    routeArgNames.append(argName)
                 elif s :
+                    routePath  += '/' + s
                     routeRegex += '/' + s
-            routeRegex += '$'
-            # -> '/users/(\w*)/addresses/(\w*)/test/(\w*)$'
-            routeRegex = re.compile(routeRegex)
-
-            self._routeHandlers.append(MicroWebSrvRoute(route, method, func, routeArgNames, routeRegex))
+            if routeArgNames :
+                routeRegex += '$'
+                # -> '/users/(-?\d+)/addresses/(\w*)/test/(\w*)$'
+                routeRegex = re.compile(routeRegex)
+                rh = MicroWebSrvRoute(route, method, func, routeArgNames, routeRegex, routeArgTypes)
+                self._paramRoutes.setdefault(method, []).append(rh)
+            else :
+                rh = MicroWebSrvRoute(route, method, func, routeArgNames, None)
+                if (method, routePath) not in self._staticRoutes :   # the first route wins
+                    self._staticRoutes[(method, routePath)] = func
+            self._routeHandlers.append(rh)
 
     # ============================================================================
     # ===( Server Process )=======================================================
@@ -185,13 +228,19 @@ class MicroWebSrv :
 
     async def _serverProcess(self, sreader: uasyncio.StreamReader, swriter: uasyncio.StreamWriter) :
         self._started = True
-        # try:
         cliAddr = sreader.get_extra_info("peername")
         print("client connected: " + str(cliAddr))
         cli = self._client(self, sreader, swriter, cliAddr)
-        await cli.processRequest()
-        # except OSError:
-        #     pass
+        if self._connections >= self.MaxConnections :
+            await cli.rejectBusy()
+            return
+        self._connections += 1
+        try :
+            await cli.processRequest()
+        except OSError :    # connection reset by the client
+            pass
+        finally :
+            cli.releaseConnection()
 
     # ============================================================================
     # ===( Functions )============================================================
@@ -231,27 +280,22 @@ class MicroWebSrv :
     # ----------------------------------------------------------------------------
     
     def GetRouteHandler(self, resUrl, method) :
-        if self._routeHandlers :
-            #resUrl = resUrl.upper()
-            if resUrl.endswith('/') :
-                resUrl = resUrl[:-1]
-            method = method.upper()
-            for rh in self._routeHandlers :
-                if rh.method == method :
-                    m = rh.routeRegex.match(resUrl)
-                    if m :   # found matching route?
-                        if rh.routeArgNames :
-                            routeArgs = {}
-                            for i, name in enumerate(rh.routeArgNames) :
-                                value = m.group(i+1)
-                                try :
-                                    value = int(value)
-                                except :
-                                    pass
-                                routeArgs[name] = value
-                            return (rh.func, routeArgs)
-                        else :
-                            return (rh.func, None)
+        if resUrl.endswith('/') :
+            resUrl = resUrl[:-1]
+        method = method.upper()
+        func = self._staticRoutes.get((method, resUrl))
+        if func :
+            return (func, None)
+        for rh in self._paramRoutes.get(method, ()) :
+            m = rh.routeRegex.match(resUrl)
+            if m :   # found matching route?
+                routeArgs = {}
+                for i, name in enumerate(rh.routeArgNames) :
+                    value = m.group(i+1)
+                    if rh.routeArgTypes[i] :
+                        value = rh.routeArgTypes[i](value)
+                    routeArgs[name] = value
+                return (rh.func, routeArgs)
         return (None, None)
 
     # ----------------------------------------------------------------------------
@@ -260,14 +304,21 @@ class MicroWebSrv :
         if urlPath == '/' :
             for idxPage in self._indexPages :
                 physPath = self._webPath + '/' + idxPage
-                if MicroWebSrv._fileExists(physPath) :
+                if MicroWebSrv._fileExists(physPath) or MicroWebSrv._fileExists(physPath + '.gz') :
                     return physPath
         else :
             physPath = self._webPath + urlPath.replace('../', '/')
-            if MicroWebSrv._fileExists(physPath) :
+            if MicroWebSrv._fileExists(physPath) or MicroWebSrv._fileExists(physPath + '.gz') :
                 return physPath
         return None
 
+    # ----------------------------------------------------------------------------
+
+    def _fileBuffer(self) :
+        if self._fileBuf is None :
+            self._fileBuf = memoryview(bytearray(self.FileChunkSize))
+        return self._fileBuf
+
     # ============================================================================
     # ===( Class Client  )========================================================
     # ============================================================================
@@ -281,6 +332,13 @@ class MicroWebSrv :
             self._sreader       = sreader
             self._swriter       = swriter
             self._addr          = addr
+            self._wstask        = None
+            self._counted       = True      # counts as HTTP connection of the server
+            self._resetRequest()
+
+        # ------------------------------------------------------------------------
+
+        def _resetRequest(self) :
             self._method        = None
             self._path          = None
             self._httpVer       = None
@@ -290,56 +348,29 @@ class MicroWebSrv :
             self._headers       = { }
             self._contentType   = None
             self._contentLength = 0
-            self._wstask        = None
+            self._contentRead   = False
+            self._keepAlive     = False
 
         # ------------------------------------------------------------------------
 
-        async def processRequest(self) :
-            # try :
-            response = MicroWebSrv._response(self)
-            if await self._parseFirstLine(response) :
-                if await self._parseHeader(response) :
-                    upg = self._getConnUpgrade()
-                    if not upg :
-                        routeHandler, routeArgs = self._microWebSrv.GetRouteHandler(self._resPath, self._method)
-                        if routeHandler :
-                            #try :
-                                if routeArgs is not None:
-                                    await routeHandler(self, response, routeArgs)
-                                else :
-                                    await routeHandler(self, response)
-                            # except Exception as ex :
-                            #     print('MicroWebSrv handler exception:\r\n  - In route %s %s\r\n  - %s' % (self._method, self._resPath, ex))
-                            #     raise ex
-                        elif self._method.upper() == "GET" :
-                            filepath = self._microWebSrv._physPathFromURLPath(self._resPath)
-                            if filepath :
-                                contentType = self._microWebSrv.GetMimeTypeFromFilename(filepath)
-                                if contentType :
-                                    result = await response.WriteResponseFile(filepath, contentType)
-                                else :
-                                    await response.WriteResponseForbidden()
-                            else :
-                                await response.WriteResponseNotFound()
-                        else :
-                            await response.WriteResponseMethodNotAllowed()
-                    elif upg == 'websocket' and 'MicroWebSocket' in globals() \
-                         and self._microWebSrv.AcceptWebSocketCallback :
-                            print("inside websrv.processrequest(): starting ws task")
-                            websocket = MicroWebSocket()
-                            await websocket.run( sreader = self._sreader,
-                                                 swriter        = self._swriter,
-                                                 httpClient     = self,
-                                                 httpResponse   = response,
-                                                 maxRecvLen     = self._microWebSrv.MaxWebSocketRecvLen,
-                                                 acceptCallback = self._microWebSrv.AcceptWebSocketCallback)
-                            return
-                    else :
-                        await response.WriteResponseNotImplemented()
-                else :
-                    await response.WriteResponseBadRequest()
-            # except :
-            #     await response.WriteResponseInternalServerError()
+        def releaseConnection(self) :
+            if self._counted :
+                self._counted = False
+                self._microWebSrv._connections -= 1
+
+        # ------------------------------------------------------------------------
+
+        async def rejectBusy(self) :
+            self._counted = False
+            try :
+                await MicroWebSrv._response(self).WriteResponseError(503)
+            except OSError :
+                pass
+            await self._close()
+
+        # ------------------------------------------------------------------------
+
+        async def _close(self) :
             try :
                 await self._sreader.wait_closed()
                 await self._swriter.wait_closed()
@@ -348,9 +379,71 @@ class MicroWebSrv :
 
         # ------------------------------------------------------------------------
 
-        async def _parseFirstLine(self, response) :
+        async def processRequest(self) :
+            srv = self._microWebSrv
+            count = 0
+            while True :
+                self._resetRequest()
+                response = MicroWebSrv._response(self)
+                first = await self._parseFirstLine(response, srv.KeepAliveTimeout)
+                if first is None :  # closed by the client or idle
+                    break
+                count += 1
+                if not first or not await self._parseHeader(response) :
+                    await response.WriteResponseBadRequest()
+                    break
+                self._keepAlive = self._wantsKeepAlive() and count < srv.MaxKeepAliveRequests
+                upg = self._getConnUpgrade()
+                if not upg :
+                    routeHandler, routeArgs = srv.GetRouteHandler(self._resPath, self._method)
+                    if routeHandler :
+                        if routeArgs is not None:
+                            await routeHandler(self, response, routeArgs)
+                        else :
+                            await routeHandler(self, response)
+                    elif self._method.upper() == "GET" :
+                        filepath = srv._physPathFromURLPath(self._resPath)
+                        if filepath :
+                            contentType = srv.GetMimeTypeFromFilename(filepath)
+                            if contentType :
+                                result = await response.WriteResponseFile(filepath, contentType)
+                            else :
+                                await response.WriteResponseForbidden()
+                        else :
+                            await response.WriteResponseNotFound()
+                    else :
+                        await response.WriteResponseMethodNotAllowed()
+                elif upg == 'websocket' and 'MicroWebSocket' in globals() \
+                     and srv.AcceptWebSocketCallback :
+                        print("inside websrv.processrequest(): starting ws task")
+                        self.releaseConnection()    # long-lived, doesn't block HTTP clients
+                        websocket = MicroWebSocket()
+                        await websocket.run( sreader = self._sreader,
+                                             swriter        = self._swriter,
+                                             httpClient     = self,
+                                             httpResponse   = response,
+                                             maxRecvLen     = srv.MaxWebSocketRecvLen,
+                                             acceptCallback = srv.AcceptWebSocketCallback)
+                        return
+                else :
+                    self._keepAlive = False
+                    await response.WriteResponseNotImplemented()
+                if not self._keepAlive :
+                    break
+                if not self._contentRead and self._contentLength > 0 :
+                    await self.ReadRequestContent()     # skip the unread body of the request
+            await self._close()
+
+        # ------------------------------------------------------------------------
+
+        async def _parseFirstLine(self, response, timeout) :
+            try :
+                line_raw = await uasyncio.wait_for_ms(self._sreader.readline(), timeout)
+            except (OSError, uasyncio.TimeoutError) :
+                return None
+            if not line_raw :
+                return None
             try :
-                line_raw = await self._sreader.readline()
                 elements = line_raw.decode().strip().split()
                 if len(elements) == 3 :
                     self._method  = elements[0].upper()
@@ -390,6 +483,19 @@ class MicroWebSrv :
 
         # ------------------------------------------------------------------------
 
+        def _wantsKeepAlive(self) :
+            conn = self._headers.get('connection', '').lower()
+            if self._httpVer == 'HTTP/1.1' :
+                return 'close' not in conn
+            return 'keep-alive' in conn
+
+        # ------------------------------------------------------------------------
+
+        def IsKeepAlive(self) :
+            return self._keepAlive
+
+        # ------------------------------------------------------------------------
+
         def _getConnUpgrade(self) :
             if 'upgrade' in self._headers.get('connection', '').lower() :
                 return self._headers.get('upgrade', '').lower()
@@ -460,12 +566,13 @@ class MicroWebSrv :
         async def ReadRequestContent(self, size=None) :
             if size is None :
                 size = self._contentLength
+            self._contentRead = True
             if size > 0 :
                 try :
-                    content = await self._sreader.read(size)
+                    content = await self._sreader.readexactly(size)
                     return content
                 except :
-                    pass
+                    self._keepAlive = False     # the stream position is unknown
             return b''
 
         # ------------------------------------------------------------------------
@@ -484,7 +591,7 @@ class MicroWebSrv :
 
         # ------------------------------------------------------------------------
 
-        def ReadRequestContentAsJSON(self) :
+        async def ReadRequestContentAsJSON(self) :
             data = await self.ReadRequestContent()
             if data :
                 try :
@@ -501,130 +608,183 @@ class MicroWebSrv :
 
         # ------------------------------------------------------------------------
 
-        def __init__(self, client) :
-            self._client = client
+        _coalesceMax   = 1460      # bodies up to one TCP segment are sent together with the headers
+        _serverHeader  = b"Server: MicroWebSrv by JC`zic\r\n"
+        _closeEnd      = b"Connection: close\r\n\r\n"
+        _firstLines    = { }       # code -> status line, filled on first use
+        _keepAliveEnds = { }       # timeout -> Connection / Keep-Alive headers and end of header
+        _weekdays      = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+        _months        = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 
         # ------------------------------------------------------------------------
 
-        async def _write(self, data, strEncoding='ISO-8859-1') :
-            if data :
-                if type(data) == str :
-                    data = data.encode(strEncoding)
-                # data = memoryview(data)
-                self._client._swriter.write(data)
-                await self._client._swriter.drain()
-                # while data :
-                #     n = self._client._socketfile.write(data)
-                #     if n is None :
-                #         return False
-                #     data = data[n:]
-                return True
-            return False
+        def __init__(self, client) :
+            self._client = client
 
         # ------------------------------------------------------------------------
 
-        async def _writeFirstLine(self, code) :
-            reason = self._responseCodes.get(code, ('Unknown reason', ))[0]
-            result = await self._write("HTTP/1.1 %s %s\r\n" % (code, reason))
-            return result
+        def _firstLine(self, code) :
+            line = self._firstLines.get(code)
+            if line is None :
+                reason = self._responseCodes.get(code, ('Unknown reason', ))[0]
+                line = self._firstLines[code] = ("HTTP/1.1 %s %s\r\n" % (code, reason)).encode()
+            return line
 
         # ------------------------------------------------------------------------
 
-        async def _writeHeader(self, name, value) :
-            result = await self._write("%s: %s\r\n" % (name, value))
-            return result
+        def _header(self, name, value) :
+            return ("%s: %s\r\n" % (name, value)).encode()
 
         # ------------------------------------------------------------------------
 
-        async def _writeContentTypeHeader(self, contentType, charset=None) :
+        def _contentTypeHeader(self, contentType, charset=None) :
             if contentType :
                 ct = contentType \
                    + (("; charset=%s" % charset) if charset else "")
             else :
                 ct = "application/octet-stream"
-            await self._writeHeader("Content-Type", ct)
+            return self._header("Content-Type", ct)
 
         # ------------------------------------------------------------------------
 
-        async def _writeServerHeader(self) :
-            await self._writeHeader("Server", "MicroWebSrv by JC`zic")
+        def _endHeader(self) :
+            if not self._client._keepAlive :
+                return self._closeEnd
+            timeout = self._client._microWebSrv.KeepAliveTimeout // 1000
+            end = self._keepAliveEnds.get(timeout)
+            if end is None :
+                end = self._keepAliveEnds[timeout] = b"Connection: keep-alive\r\nKeep-Alive: timeout=%d\r\n\r\n" % timeout
+            return end
 
         # ------------------------------------------------------------------------
 
-        async def _writeEndHeader(self) :
-            result = await self._write("\r\n")
-            return result
+        async def _flush(self, head, content=None) :
+            # status line, headers and a small body go out in one write and one drain
+            if content and len(content) <= self._coalesceMax :
+                head += content
+                content = None
+            self._client._swriter.write(head)
+            if content :
+                self._client._swriter.write(content)
+            await self._client._swriter.drain()
+            return True
 
         # ------------------------------------------------------------------------
 
-        async def _writeBeforeContent(self, code, headers, contentType, contentCharset, contentLength) :
-            await self._writeFirstLine(code)
+        async def _writeBeforeContent(self, code, headers, contentType, contentCharset, contentLength, content=None) :
+            head = bytearray(self._firstLine(code))
             if isinstance(headers, dict) :
                 for header in headers :
-                    await self._writeHeader(header, headers[header])
+                    head += self._header(header, headers[header])
             if contentLength > 0 :
-                await self._writeContentTypeHeader(contentType, contentCharset)
-                await self._writeHeader("Content-Length", contentLength)
-            await self._writeServerHeader()
-            await self._writeHeader("Connection", "close")
-            await self._writeEndHeader()
+                head += self._contentTypeHeader(contentType, contentCharset)
+            if code != 304 :
+                head += b"Content-Length: %d\r\n" % contentLength    # also 0, ends the response on a kept connection
+            head += self._serverHeader
+            head += self._endHeader()
+            return await self._flush(head, content)
 
         # ------------------------------------------------------------------------
 
         async def WriteSwitchProto(self, upgrade, headers=None) :
-            await self._writeFirstLine(101)
-            await self._writeHeader("Connection", "Upgrade")
-            await self._writeHeader("Upgrade",    upgrade)
+            head = bytearray(self._firstLine(101))
+            head += b"Connection: Upgrade\r\n"
+            head += self._header("Upgrade", upgrade)
             if isinstance(headers, dict) :
                 for header in headers :
-                    await self._writeHeader(header, headers[header])
-            await self._writeServerHeader()
-            await self._writeEndHeader()
+                    head += self._header(header, headers[header])
+            head += self._serverHeader
+            head += b"\r\n"
+            await self._flush(head)
 
         # ------------------------------------------------------------------------
 
         async def WriteResponse(self, code, headers, contentType, contentCharset, content) :
             try :
+                if code == 304 :    # the client reads no body, it would be taken for the next response
+                    content = None
                 if content :
                     if type(content) == str :
                         content = content.encode(contentCharset)
                     contentLength = len(content)
                 else :
                     contentLength = 0
-                await self._writeBeforeContent(code, headers, contentType, contentCharset, contentLength)
-                if content :
-                    result = await self._write(content)
-                    return result
-                return True
+                return await self._writeBeforeContent(code, headers, contentType, contentCharset, contentLength, content)
             except :
                 return False
 
 
         # ------------------------------------------------------------------------
 
+        def _cacheHeaders(self, st, headers) :
+            # adds the validators of the file to headers, True if the client's copy is still valid
+            srv = self._client._microWebSrv
+            etag = '"%x-%x"' % (st[8], st[6])
+            t = gmtime(st[8])
+            lastModified = "%s, %02d %s %d %02d:%02d:%02d GMT" % ( self._weekdays[t[6]], t[2],
+                                                                    self._months[t[1]-1], t[0],
+                                                                    t[3], t[4], t[5] )
+            headers["ETag"]          = etag
+            headers["Last-Modified"] = lastModified
+            if srv.LetCacheStaticContentLevel > 1 :
+                headers["Cache-Control"] = "max-age=%d" % srv.StaticContentMaxAge
+            else :
+                headers["Cache-Control"] = "no-cache"
+            reqHeaders  = self._client._headers
+            ifNoneMatch = reqHeaders.get("if-none-match")
+            if ifNoneMatch is not None :
+                return ifNoneMatch == "*" or etag in ifNoneMatch
+            return reqHeaders.get("if-modified-since") == lastModified
+
+        # ------------------------------------------------------------------------
+
         async def WriteResponseFile(self, filepath, contentType=None, headers=None) :
+            headers = dict(headers) if isinstance(headers, dict) else { }
+            st = None
+            if MicroWebSrv._fileExists(filepath + '.gz') :
+                headers["Vary"] = "Accept-Encoding"
+                if "gzip" in self._client._headers.get("accept-encoding", "") :
+                    headers["Content-Encoding"] = "gzip"
+                    filepath += '.gz'
+                elif not MicroWebSrv._fileExists(filepath) :
+                    # only the precompressed file is there, the client can't take it
+                    return await self.WriteResponseNotAcceptable()
             try :
-                size = stat(filepath)[6]
-                if size > 0 :
-                    with open(filepath, 'rb') as file :
-                        await self._writeBeforeContent(200, headers, contentType, None, size)
-                        try :
-                            buf = bytearray(1024)
-                            while size > 0 :
-                                x = file.readinto(buf)
-                                if x < len(buf) :
-                                    buf = memoryview(buf)[:x]
-                                if not await self._write(buf) :
-                                    return False
-                                size -= x
-                            return True
-                        except :
-                            await self.WriteResponseInternalServerError()
-                            return False
+                st = stat(filepath)
             except :
                 pass
-            await self.WriteResponseNotFound()
-            return False
+            if st is None :
+                await self.WriteResponseNotFound()
+                return False
+            if self._client._microWebSrv.LetCacheStaticContentLevel > 0 \
+               and self._cacheHeaders(st, headers) :
+                return await self._writeBeforeContent(304, headers, None, None, 0)
+            try :
+                file = open(filepath, 'rb')
+            except :
+                await self.WriteResponseNotFound()
+                return False
+            try :
+                size = st[6]
+                buf  = self._client._microWebSrv._fileBuffer()
+                x    = file.readinto(buf)
+                # the first chunk goes out with the headers
+                await self._writeBeforeContent(200, headers, contentType, None, size, buf[:x])
+                size -= x
+                while size > 0 :
+                    x = file.readinto(buf)
+                    if not x :
+                        raise OSError("file shrunk while sending")
+                    self._client._swriter.write(buf[:x])
+                    await self._client._swriter.drain()
+                    size -= x
+                return True
+            except OSError :
+                # the headers are gone, the client can only notice by the closed connection
+                self._client._keepAlive = False
+                return False
+            finally :
+                file.close()
 
         # ------------------------------------------------------------------------
 
@@ -677,7 +837,7 @@ class MicroWebSrv :
         # ------------------------------------------------------------------------
 
         async def WriteResponseNotModified(self) :
-            return await self.WriteResponseError(304)
+            return await self._writeBeforeContent(304, None, None, None, 0)    # a 304 has no body
 
         # ------------------------------------------------------------------------
 
@@ -704,6 +864,11 @@ class MicroWebSrv :
 
         # ------------------------------------------------------------------------
 
+        async def WriteResponseNotAcceptable(self) :
+            return await self.WriteResponseError(406)
+
+        # ------------------------------------------------------------------------
+
         async def WriteResponseInternalServerError(self) :
             return await self.WriteResponseError(500)
 
@@ -11,8 +11,8 @@ import utime
 
 from gnss.message_types import PositionData, Accuracy, RealTimeMessage
 from gnss.gnss_handler import GnssHandler
+from gnss.rtcm_filter import RTCMFilter
 from web_api.microWebSrv import MicroWebSrv
-from utils.queue import Queue
 
 
 class RequestHandler:
@@ -21,40 +21,38 @@ class RequestHandler:
     """
 
     _app = None
-    _position_q = None
     _route_handlers = None
     _srv = None
     _ntrip_stop_event = None
     _rtcm_lock = None
+    _ntrip_client = None
     _last_pos = None
     _acc_interval = None
-    _send_position_task = None
-
-    # data cache to save on UART reads/writes
-    _position_data = None
+    _send_position_tasks = None  # position sending task of each websocket
 
     @classmethod
     async def initialize(cls,
                          app: object,
-                         queue: Queue,
                          ntrip_stop_event: uasyncio.Event,
-                         rtcm_lock: uasyncio.Lock):
+                         rtcm_lock: uasyncio.Lock,
+                         ntrip_client: object = None):
         """Initializes the RequestHandler
-        Sets the necessary queues and starts the webserver
+        Sets the necessary events and starts the webserver
+        Position data is taken from the position bus of the GnssHandler
 
         :param object app: The calling app
-        :param Queue queue: the queue with the incoming postion messages
         :param ntrip_stop_event: used to control the start/stop of ntrip-client
         :param Lock rtcm_lock: used to get/set the rtcm flag
+        :param GNSSNTRIPClient ntrip_client: the ntrip client, reports its connection state
         """
 
         cls._app = app
-        cls._position_q = queue
+        cls._ntrip_client = ntrip_client
         cls._ntrip_stop_event = ntrip_stop_event
         cls._rtcm_lock = rtcm_lock
 
-        cls._position_data = GnssHandler.get_position()
         cls._last_pos = utime.ticks_ms()
+        cls._send_position_tasks = {}
 
         _route_handlers = [("/rate", "GET", cls._getUpdateRate),
                            ("/rate", "POST", cls._setUpdateRate),
@@ -64,7 +62,9 @@ class RequestHandler:
                            ("/ntrip", "POST", cls._enableNTRIP),
                            ("/ntrip", "GET", cls._getNtripStatus),
                            ("/satsystems", "GET", cls._getSatSystems),
-                           ("/satsystems", "POST", cls._setSatSystems)]
+                           ("/satsystems", "POST", cls._setSatSystems),
+                           ("/rtcm", "GET", cls._getRtcmFilter),
+                           ("/rtcm", "POST", cls._setRtcmFilter)]
 
         srv = MicroWebSrv(routeHandlers=_route_handlers, webPath='/web_api/www/')
         srv.MaxWebSocketRecvLen = 256
@@ -75,13 +75,18 @@ class RequestHandler:
     async def _getUpdateRate(cls, http_client, http_response):
         """
         ASYNC: Handles get update rate requests from the web
+        Answers with the rate, the bounds of the adaptive rate control and the reason for the rate
 
         :param MicroWebSrv._client http client: holds the client_connection
         :param MicroWebSrv._response http_response: holds the answer to the client
         """
         try:
             rate = await GnssHandler.get_update_rate()
-            response = {"updateRate": rate}
+            if rate is None:  # receiver didn't answer
+                await http_response.WriteResponseJSONError(504)
+                return
+            response = GnssHandler.get_rate_state()
+            response["updateRate"] = rate
             await http_response.WriteResponseJSONOk(response)
         except Exception as ex:
             await http_response.WriteResponseJSONError(400)
@@ -90,16 +95,22 @@ class RequestHandler:
     async def _setUpdateRate(cls, http_client, http_response):
         """
         ASYNC: Handles set update rate requests from the web
-        Gets the rate from request body and forwards it to the GnssHandler
+        Gets the rate from request body and forwards it to the GnssHandler.
+        {"updateRate": 200} sets a fixed rate, {"auto": true, "minRate": 100, "maxRate": 1000}
+        lets the GnssHandler adapt the rate to the load (bounds are optional)
 
         :param MicroWebSrv._client http client: holds the client_connection
         :param MicroWebSrv._response http_response: holds the answer to the client
         """
         payload = await http_client.ReadRequestContentAsJSON()
         try:
-            rate = payload["updateRate"]
-            print("set update rate triggered, rate: " + str(rate))
-            result = await GnssHandler.set_update_rate(rate)
+            if payload.get("auto", False):
+                GnssHandler.set_rate_control(True, payload.get("minRate"), payload.get("maxRate"))
+            else:
+                rate = payload["updateRate"]
+                print("set update rate triggered, rate: " + str(rate))
+                GnssHandler.set_rate_control(False)
+                result = await GnssHandler.set_update_rate(rate)
             await http_response.WriteResponseOk()
         except Exception as ex:
             await http_response.WriteResponseJSONError(400)
@@ -131,8 +142,7 @@ class RequestHandler:
         """
         try:
             precision = await GnssHandler.get_precision(False)
-            data = ujson.dumps(precision.__dict__)
-            await http_response.WriteResponseJSONOk(data)
+            await http_response.WriteResponse(200, None, "application/json", "UTF-8", precision.to_json())
         except Exception as ex:
             await http_response.WriteResponseJSONError(400)
 
@@ -169,10 +179,45 @@ class RequestHandler:
         """
         try:
             sat_systems = await GnssHandler.get_satellite_systems()
+            if sat_systems is None:  # receiver didn't answer
+                await http_response.WriteResponseJSONError(504)
+                return
             await http_response.WriteResponseJSONOk(sat_systems)
         except Exception as ex:
             await http_response.WriteResponseJSONError(400)
 
+    @classmethod
+    async def _getRtcmFilter(cls, http_client, http_response):
+        """
+        ASYNC: Handles requests for the RTCM3 message filter from the web
+        Answers with the filter settings and the forwarding counters incl. the UART2 utilisation
+
+        :param MicroWebSrv._client http client: holds the client_connection
+        :param MicroWebSrv._response http_response: holds the answer to the client
+        """
+        try:
+            response = RTCMFilter.get_filter()
+            response.update(RTCMFilter.get_stats())
+            await http_response.WriteResponseJSONOk(response)
+        except Exception as ex:
+            await http_response.WriteResponseJSONError(400)
+
+    @classmethod
+    async def _setRtcmFilter(cls, http_client, http_response):
+        """
+        ASYNC: Handles config requests for the RTCM3 message filter from the web
+        e.g. {"allow": null, "deny": [1087], "intervals": {"1230": 5000}}, missing entries are cleared
+
+        :param MicroWebSrv._client http client: holds the client_connection
+        :param MicroWebSrv._response http_response: holds the answer to the client
+        """
+        payload = await http_client.ReadRequestContentAsJSON()
+        try:
+            RTCMFilter.set_filter(payload.get("allow"), payload.get("deny"), payload.get("intervals"))
+            await http_response.WriteResponseOk()
+        except Exception as ex:
+            await http_response.WriteResponseJSONError(400)
+
     @classmethod
     async def _setSatSystems(cls, http_client, http_response):
         """
@@ -203,7 +248,9 @@ class RequestHandler:
     async def _getNtripStatus(cls, http_client, http_response):
         """
         ASYNC: Handles requests for rtcm correction from the web
-        Gets the rtcm flag from GnssHandler and sends it to client
+        Gets the rtcm flag from GnssHandler and sends it to client, together with
+        the connection state and counters of the ntrip client, e.g.:
+        {"enabled": true, "state": "streaming", "response": "ICY 200 OK", "reconnects": 2, ..., "rtcm": {...}}
 
         :param MicroWebSrv._client http client: holds the client_connection
         :param MicroWebSrv._response http_response: holds the answer to the client
@@ -216,6 +263,9 @@ class RequestHandler:
                 else:
                     enabled = False
             response = {"enabled": enabled}
+            if cls._ntrip_client is not None:
+                response.update(cls._ntrip_client.status)
+                response["rtcm"] = cls._ntrip_client.rtcm_stats
             await http_response.WriteResponseJSONOk(response)
         except Exception as ex:
             await http_response.WriteResponseJSONError(400)
@@ -235,7 +285,7 @@ class RequestHandler:
         """
         try:
             position = await GnssHandler.get_position()
-            await http_response.WriteResponseJSONOk(position)
+            await http_response.WriteResponse(200, None, "application/json", "UTF-8", position.to_json())
         except Exception as ex:
             await http_response.WriteResponseJSONError(400)
 
@@ -274,7 +324,9 @@ class RequestHandler:
         :param bytes msg: message received over the webSocket
         """
         print("WS CLOSED")
-        cls._send_position_task.cancel()
+        task = cls._send_position_tasks.pop(id(webSocket), None)
+        if task is not None:
+            task.cancel()
         await uasyncio.sleep(1)
 
     @classmethod
@@ -282,27 +334,34 @@ class RequestHandler:
         """
         ASYNC: This function runs as task and send the real time
         position data over the webSocket
+        Every websocket has its own subscription to the position bus,
+        so each client gets every position
 
         :param MicroWebSocket webSocket: the webSocket object
         :param bytes msg: message received over the webSocket
         """
         position: PositionData
         accuracy: Accuracy
-        realtime_message: RealTimeMessage
         rtcm: bool
-        while not websocket.IsClosed():
-            try:
-                print("Sending Live Data")
-                position = await GnssHandler.get_position() # Store data in dict
-                accuracy = await GnssHandler.get_precision(False)
-                rtcm = await GnssHandler.get_ntrip_status()
-                realtime_message = RealTimeMessage(position, accuracy, rtcm)
-                await websocket.SendText(str(ujson.dumps(realtime_message.__dict__)))  # Convert data to JSON and send
-                print("Sended Live Data over Websocket")
-            except Exception as ex:
-                print(str(ex))
-                websocket.Close()
-
+        realtime_message = RealTimeMessage(PositionData(), Accuracy(), False)
+        subscriber = GnssHandler.subscribe_position()
+        try:
+            while not websocket.IsClosed():
+                try:
+                    print("Sending Live Data")
+                    position = await subscriber.next()
+                    accuracy = await GnssHandler.get_precision(False)
+                    rtcm = await GnssHandler.get_ntrip_status()
+                    realtime_message.update(position, accuracy, rtcm)
+                    start = utime.ticks_ms()
+                    await websocket.SendText(realtime_message.to_json())
+                    GnssHandler.report_send_latency(utime.ticks_diff(utime.ticks_ms(), start))
+                    print("Sended Live Data over Websocket")
+                except Exception as ex:
+                    print(str(ex))
+                    websocket.Close()
+        finally:  # also when the task is cancelled
+            subscriber.close()
         gc.collect()
 
     @classmethod
@@ -319,4 +378,4 @@ class RequestHandler:
         webSocket.RecvTextCallback = cls.cb_receive_text
         webSocket.RecvBinaryCallback = cls.cb_receive_binary
         webSocket.ClosedCallback = cls.cb_closed
-        cls._send_position_task = uasyncio.create_task(cls.send_position(webSocket))
+        cls._send_position_tasks[id(webSocket)] = uasyncio.create_task(cls.send_position(webSocket))